@@ -1,8 +1,12 @@
+import json
+import asyncio
 import aiohttp
 import logging
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from typing import List, Dict, Optional
 from config import Config
+from db import get_db_connection, get_placeholder
+from soil_health_store import soil_health_store
 
 logger = logging.getLogger(__name__)
 
@@ -221,17 +225,25 @@ class AgricultureAPIService:
     
     async def get_weather_forecast(
         self, 
-        latitude: float, 
-        longitude: float,
-        days: int = 7
+        latitude: float = None, 
+        longitude: float = None,
+        days: int = 7,
+        city: str = None,
+        cache_location: str = None
     ) -> Dict:
         """
         Get weather forecast using OpenWeather API
         
+        Successful forecasts are also written to weather_cache (under
+        cache_location, or the city OpenWeather reports) for the pest risk
+        batch to read.
+        
         Args:
             latitude: Location latitude
             longitude: Location longitude
             days: Number of days for forecast
+            city: City / district name (used when no coordinates are given)
+            cache_location: Location name to cache the forecast under
             
         Returns:
             Weather forecast data
@@ -240,18 +252,28 @@ class AgricultureAPIService:
             url = "https://api.openweathermap.org/data/2.5/forecast"
             
             params = {
-                "lat": latitude,
-                "lon": longitude,
                 "appid": self.openweather_api_key,
                 "units": "metric",
                 "cnt": days * 8  # 3-hour intervals
             }
             
+            if latitude and longitude:
+                params["lat"] = latitude
+                params["lon"] = longitude
+            elif city:
+                params["q"] = city
+            else:
+                return {}
+            
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
-                        return self._process_weather_data(data)
+                        weather = self._process_weather_data(data)
+                        location = cache_location or weather.get("city")
+                        if weather.get("forecasts") and location:
+                            await asyncio.to_thread(self._cache_forecast, location, latitude, longitude, weather)
+                        return weather
                     else:
                         logger.error(f"Weather API error: {response.status}")
                         return {}
@@ -282,6 +304,39 @@ class AgricultureAPIService:
             logger.error(f"Error processing weather data: {str(e)}")
             return {}
     
+    def _cache_forecast(self, location: str, latitude: Optional[float], longitude: Optional[float], weather: Dict):
+        """Replace the cached forecast for a location in weather_cache"""
+        conn = None
+        cur = None
+        try:
+            ph = get_placeholder()
+            first = weather["forecasts"][0]
+            conn = get_db_connection()
+            cur = conn.cursor()
+            cur.execute(f"DELETE FROM weather_cache WHERE LOWER(location) = {ph}", (location.strip().lower(),))
+            cur.execute(f"""
+                INSERT INTO weather_cache
+                (location, latitude, longitude, temperature, humidity, rainfall, wind_speed,
+                 weather_condition, forecast_data, fetched_at, valid_until)
+                VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+            """, (
+                location.strip(), latitude, longitude,
+                first.get("temperature"), first.get("humidity"), first.get("rain", 0),
+                first.get("wind_speed"), first.get("weather"),
+                json.dumps(weather, ensure_ascii=False),
+                datetime.now(), datetime.now() + timedelta(hours=Config.WEATHER_CACHE_TTL_HOURS)
+            ))
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Error caching weather forecast: {str(e)}")
+            if conn:
+                conn.rollback()
+        finally:
+            if cur:
+                cur.close()
+            if conn:
+                conn.close()
+    
     async def get_current_weather(
         self, 
         city: str = None,
@@ -420,21 +475,23 @@ class AgricultureAPIService:
     
     async def get_soil_health_info(self, district: str, state: str) -> Dict:
         """
-        Get soil health information (placeholder for future API integration)
+        Get district soil health card aggregates from the local soil health store
         
         Args:
             district: District name
             state: State name
             
         Returns:
-            Soil health data
+            Soil health data (per-parameter median, quartiles and rating)
         """
-        # Placeholder for soil health card data API
-        # This would integrate with actual soil health API when available
+        summary = soil_health_store.get_district_summary(district, state)
+        if summary:
+            return summary
+        
         return {
             "district": district,
             "state": state,
-            "message": "Soil health data integration pending"
+            "message": "Soil health data not available for this district"
         }
     
     async def get_rainfall_data(
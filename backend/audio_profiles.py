@@ -0,0 +1,175 @@
+"""
+Response Audio Profiles
+Negotiable output encodings for TTS audio, so clients on 2G/3G links can
+receive a fraction of the bytes:
+
+    native    provider output unchanged (MP3)
+    opus-12k  Ogg/Opus 16 kHz mono, ~12 kbps
+    mp3-32k   MP3 16 kHz mono, 32 kbps
+    mp3-64k   MP3 24 kHz mono, 64 kbps
+
+A profile is picked from an explicit client choice, the session's stored
+profile, or network client hints (Save-Data, ECT, Downlink). Transcoded
+variants are kept in an LRU cache keyed by the original audio's hash, next
+to the original, so repeated prompts (greetings, retries) are encoded once.
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config import Config
+from audio_transcoder import AudioTranscoder, audio_transcoder
+
+logger = logging.getLogger(__name__)
+
+NATIVE_PROFILE = "native"
+
+AUDIO_PROFILES = {
+    NATIVE_PROFILE: {
+        "media_type": "audio/mpeg",
+        "azure_format": "Audio16Khz32KBitRateMonoMp3",
+    },
+    "opus-12k": {
+        "media_type": "audio/ogg; codecs=opus",
+        "ffmpeg_args": ["-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "12k",
+                        "-application", "voip", "-f", "ogg"],
+        # Azure's 16 kHz Ogg/Opus output is the closest native format
+        "azure_format": "Ogg16Khz16BitMonoOpus",
+    },
+    "mp3-32k": {
+        "media_type": "audio/mpeg",
+        "ffmpeg_args": ["-ac", "1", "-ar", "16000", "-c:a", "libmp3lame", "-b:a", "32k", "-f", "mp3"],
+        "azure_format": "Audio16Khz32KBitRateMonoMp3",
+    },
+    "mp3-64k": {
+        "media_type": "audio/mpeg",
+        "ffmpeg_args": ["-ac", "1", "-ar", "24000", "-c:a", "libmp3lame", "-b:a", "64k", "-f", "mp3"],
+        "azure_format": "Audio16Khz64KBitRateMonoMp3",
+    },
+}
+
+# Client Hints effective connection type -> profile
+ECT_PROFILES = {
+    "slow-2g": "opus-12k",
+    "2g": "opus-12k",
+    "3g": "mp3-32k",
+    "4g": NATIVE_PROFILE,
+}
+
+
+def select_profile(
+    requested: Optional[str] = None,
+    session_profile: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Pick the response audio profile
+
+    Priority: explicit request, then the session's profile, then network
+    hints (Save-Data / ECT / Downlink headers), then the configured default.
+
+    Args:
+        requested: Profile asked for by the client on this request
+        session_profile: Profile stored on the session
+        headers: Request headers (lower-case names)
+
+    Returns:
+        A key of AUDIO_PROFILES
+    """
+    for name in (requested, session_profile):
+        if name in AUDIO_PROFILES:
+            return name
+
+    headers = headers or {}
+    if headers.get("save-data", "").lower() == "on":
+        return "opus-12k"
+    ect = headers.get("ect", "").lower()
+    if ect in ECT_PROFILES:
+        return ECT_PROFILES[ect]
+    try:
+        downlink = float(headers.get("downlink", ""))
+        if downlink < 0.4:
+            return "opus-12k"
+        if downlink < 2:
+            return "mp3-32k"
+    except ValueError:
+        pass
+
+    return Config.DEFAULT_AUDIO_PROFILE if Config.DEFAULT_AUDIO_PROFILE in AUDIO_PROFILES else NATIVE_PROFILE
+
+
+class AudioVariantCache:
+    """LRU cache of transcoded audio variants keyed by (original hash, profile)"""
+
+    def __init__(
+        self,
+        max_bytes: int = Config.AUDIO_VARIANT_CACHE_MB * 1024 * 1024,
+        transcoder: AudioTranscoder = audio_transcoder
+    ):
+        self.max_bytes = max_bytes
+        self.transcoder = transcoder
+        self.total_bytes = 0
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def _put(self, key: Tuple[str, str], data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        if key in self._entries:
+            self.total_bytes -= len(self._entries.pop(key))
+        self._entries[key] = data
+        self.total_bytes += len(data)
+        while self.total_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= len(evicted)
+
+    async def get_variant(
+        self,
+        audio: bytes,
+        profile: str,
+        media_type: str = AUDIO_PROFILES[NATIVE_PROFILE]["media_type"]
+    ) -> Tuple[bytes, str]:
+        """
+        Get audio in a profile, transcoding (once) on a cache miss
+
+        Args:
+            audio: Original (native) TTS audio
+            profile: Key of AUDIO_PROFILES
+            media_type: Media type of the original audio
+
+        Returns:
+            (audio bytes, media type); the original audio if the profile is
+            native or transcoding is unavailable
+        """
+        spec = AUDIO_PROFILES.get(profile)
+        if not audio or not spec or not spec.get("ffmpeg_args") or not self.transcoder.ffmpeg_available:
+            return audio, media_type
+
+        key = (hashlib.sha1(audio).hexdigest(), profile)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return cached, spec["media_type"]
+
+        self.stats["misses"] += 1
+        variant, _, run_ms = await self.transcoder.submit(["-i", "pipe:0", *spec["ffmpeg_args"], "pipe:1"], audio)
+        if not variant:
+            logger.warning(f"⚠️ Audio transcoding to {profile} failed, sending original")
+            return audio, media_type
+
+        self.stats["bytes_in"] += len(audio)
+        self.stats["bytes_out"] += len(variant)
+        self._put(key, variant)
+        logger.info(f"Audio {profile}: {len(audio)} -> {len(variant)} bytes ({run_ms:.0f} ms)")
+        return variant, spec["media_type"]
+
+    def get_stats(self) -> Dict:
+        """Cache statistics"""
+        return {**self.stats, "entries": len(self._entries), "bytes": self.total_bytes}
+
+
+# Global audio variant cache instance
+audio_variant_cache = AudioVariantCache()
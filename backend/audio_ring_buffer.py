@@ -0,0 +1,227 @@
+"""
+Per-connection Audio Buffering for /ws/voice
+The receive loop used to hand every client frame straight to the
+transcriber, so a slow upstream held up reading the WebSocket. Now the loop
+only copies frames into an AudioSender - a fixed-size ring buffer over a
+preallocated bytearray (REALTIME_AUDIO_BUFFER_MS of 16 kHz 16-bit PCM) - and
+a sender task drains it upstream in chunks of up to REALTIME_AUDIO_CHUNK_MS,
+waiting while the SDK still has REALTIME_AUDIO_MAX_PENDING chunks to write.
+
+Backpressure:
+    buffer above HIGH_WATER -> {"type": "flow", "action": "pause", "buffered_ms": n}
+    back below LOW_WATER    -> {"type": "flow", "action": "resume", "buffered_ms": n}
+    buffer full             -> incoming silence is dropped; speech overwrites
+                               the oldest buffered audio
+Occupancy is sampled on every frame and reported per worker.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import numpy as np
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_MS = 16000 * 2 // 1000  # 16 kHz, 16-bit mono PCM
+HIGH_WATER = 0.75  # Ask the client to pause above this fill level
+LOW_WATER = 0.25  # ... and to resume below this one
+
+# Buffer counters of all connections in this worker
+buffer_totals = {
+    "bytes_in": 0, "bytes_sent": 0, "dropped_silence_bytes": 0, "overwritten_bytes": 0,
+    "pauses": 0, "upstream_waits": 0
+}
+_occupancy: Deque[float] = deque(maxlen=2000)
+_peak_occupancy = 0.0
+
+
+class AudioRingBuffer:
+    """Fixed-capacity FIFO of bytes over one preallocated bytearray"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self._start = 0
+        self.size = 0
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.size
+
+    def write(self, data: bytes) -> int:
+        """
+        Append as much of data as fits
+
+        Returns:
+            Number of bytes written
+        """
+        n = min(len(data), self.free)
+        end = (self._start + self.size) % self.capacity
+        first = min(n, self.capacity - end)
+        self._buf[end:end + first] = data[:first]
+        self._buf[:n - first] = data[first:n]
+        self.size += n
+        return n
+
+    def read(self, n: int) -> bytes:
+        """Remove and return up to n of the oldest bytes"""
+        n = min(n, self.size)
+        first = min(n, self.capacity - self._start)
+        data = bytes(self._buf[self._start:self._start + first]) + bytes(self._buf[:n - first])
+        self.discard(n)
+        return data
+
+    def discard(self, n: int) -> int:
+        """Drop up to n of the oldest bytes; returns the number dropped"""
+        n = min(n, self.size)
+        self._start = (self._start + n) % self.capacity
+        self.size -= n
+        return n
+
+
+def is_silence(pcm: bytes, threshold: float = Config.REALTIME_AUDIO_SILENCE_RMS) -> bool:
+    """True if a 16-bit PCM frame's RMS level is below the threshold"""
+    samples = np.frombuffer(pcm[:len(pcm) // 2 * 2], dtype=np.int16)
+    if len(samples) == 0:
+        return True
+    rms = np.sqrt(np.mean((samples.astype(np.float32) / 32768.0) ** 2))
+    return bool(rms < threshold)
+
+
+class AudioSender:
+    """Buffers one connection's audio and streams it upstream from its own task"""
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[None]],
+        pending: Callable[[], int] = lambda: 0,
+        notify: Optional[Callable[[Dict], Awaitable[None]]] = None,
+        buffer_ms: int = Config.REALTIME_AUDIO_BUFFER_MS,
+        chunk_ms: int = Config.REALTIME_AUDIO_CHUNK_MS,
+        max_pending: int = Config.REALTIME_AUDIO_MAX_PENDING
+    ):
+        """
+        Args:
+            send: Sends one chunk upstream (RealtimeVoiceService.send_audio)
+            pending: Chunks the upstream has not written yet (pending_writes)
+            notify: Sends a flow-control frame to the client
+        """
+        self.send = send
+        self.pending = pending
+        self.notify = notify
+        self.ring = AudioRingBuffer(buffer_ms * BYTES_PER_MS)
+        self.chunk_bytes = max(2, chunk_ms * BYTES_PER_MS)
+        self.max_pending = max_pending
+        self.paused = False
+        self.peak = 0.0
+        self.stats = dict.fromkeys(buffer_totals, 0)
+
+        self._ready = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._task = asyncio.create_task(self._drain())
+
+    @property
+    def occupancy(self) -> float:
+        return self.ring.size / self.ring.capacity
+
+    def _buffered_ms(self) -> int:
+        return self.ring.size // BYTES_PER_MS
+
+    async def feed(self, pcm: bytes):
+        """Buffer one client frame; never waits on the upstream"""
+        self.stats["bytes_in"] += len(pcm)
+        if len(pcm) > self.ring.free:
+            if is_silence(pcm):
+                # Silence is the cheapest audio to lose
+                self.stats["dropped_silence_bytes"] += len(pcm)
+                self._sample()
+                return
+            # Keep the newest speech; whole samples only
+            overflow = len(pcm) - self.ring.free
+            self.stats["overwritten_bytes"] += self.ring.discard(overflow + overflow % 2)
+            if len(pcm) > self.ring.capacity:
+                self.stats["overwritten_bytes"] += len(pcm) - self.ring.capacity
+                pcm = pcm[-self.ring.capacity:]
+
+        self.ring.write(pcm)
+        self._drained.clear()
+        self._ready.set()
+        self._sample()
+
+        if not self.paused and self.occupancy >= HIGH_WATER:
+            self.paused = True
+            self.stats["pauses"] += 1
+            logger.info(f"⏸️ Audio buffer at {self.occupancy:.0%}, asking client to pause")
+            await self._flow("pause")
+
+    def _sample(self):
+        occupancy = self.occupancy
+        _occupancy.append(occupancy)
+        self.peak = max(self.peak, occupancy)
+
+    async def _flow(self, action: str):
+        if not self.notify:
+            return
+        try:
+            await self.notify({"type": "flow", "action": action, "buffered_ms": self._buffered_ms()})
+        except Exception as e:
+            logger.warning(f"Could not send flow control: {str(e)}")
+
+    async def _drain(self):
+        """Sender task: stream buffered audio at the upstream's pace"""
+        wait = self.chunk_bytes / BYTES_PER_MS / 1000 / 2
+        while True:
+            if not self.ring.size:
+                self._drained.set()
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            if self.pending() >= self.max_pending:
+                # Upstream is behind: let the buffer absorb the burst
+                self.stats["upstream_waits"] += 1
+                while self.pending() >= self.max_pending:
+                    await asyncio.sleep(wait)
+
+            chunk = self.ring.read(self.chunk_bytes)
+            try:
+                await self.send(chunk)
+                self.stats["bytes_sent"] += len(chunk)
+            except Exception as e:
+                logger.error(f"Error streaming buffered audio: {str(e)}")
+
+            if self.paused and self.occupancy <= LOW_WATER:
+                self.paused = False
+                await self._flow("resume")
+
+    async def flush(self, timeout: float = 1.0):
+        """Wait (bounded) until the buffered audio has been sent upstream"""
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Audio buffer not drained, {self._buffered_ms()} ms left")
+
+    def close(self):
+        """Stop the sender task and add this connection's counters to buffer_totals"""
+        global _peak_occupancy
+        self._task.cancel()
+        for key, value in self.stats.items():
+            buffer_totals[key] += value
+        self.stats = dict.fromkeys(buffer_totals, 0)
+        _peak_occupancy = max(_peak_occupancy, self.peak)
+
+
+def get_buffer_stats() -> Dict:
+    """Buffer occupancy and drops across connections in this worker"""
+    occupancy = sorted(_occupancy)
+    return {
+        **buffer_totals,
+        "occupancy_p50": round(occupancy[len(occupancy) // 2], 3) if occupancy else None,
+        "occupancy_p95": round(occupancy[int(len(occupancy) * 0.95)], 3) if occupancy else None,
+        "occupancy_peak": round(_peak_occupancy, 3)
+    }
@@ -0,0 +1,234 @@
+"""
+Audio Transcoder
+Decodes uploads to 16 kHz mono PCM and re-encodes speech as low-bitrate Opus
+before the STT upload, where upload size dominates latency on slow links.
+
+ffmpeg jobs run on a fixed pool of asyncio workers fed by a bounded queue, so
+a burst of uploads queues (with backpressure) instead of spawning one
+process per request. Every job reports its queue wait and run time.
+Without ffmpeg, WAV uploads are still decoded, downmixed and resampled
+in-process and sent as 16 kHz mono WAV.
+"""
+
+import io
+import os
+import time
+import wave
+import shutil
+import asyncio
+import logging
+from typing import Optional, Dict, List, Tuple
+
+import numpy as np
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+def pcm_to_wav(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Wrap int16 mono PCM in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def wav_to_pcm(audio_data: bytes) -> Optional[np.ndarray]:
+    """Decode 16-bit PCM WAV to 16 kHz mono without ffmpeg (None if not usable)"""
+    try:
+        with wave.open(io.BytesIO(audio_data), "rb") as wav:
+            if wav.getsampwidth() != 2:
+                return None
+            channels = wav.getnchannels()
+            rate = wav.getframerate()
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    except (wave.Error, EOFError):
+        return None
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != SAMPLE_RATE and len(samples):
+        # Linear resample to 16 kHz
+        positions = np.arange(0, len(samples), rate / SAMPLE_RATE)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+    return samples
+
+
+class AudioTranscoder:
+    """Bounded-queue ffmpeg worker pool for decode / Opus encode jobs"""
+
+    def __init__(
+        self,
+        workers: int = Config.TRANSCODE_WORKERS,
+        queue_size: int = Config.TRANSCODE_QUEUE_SIZE,
+        bitrate: str = Config.STT_OPUS_BITRATE,
+        timeout_seconds: float = Config.TRANSCODE_TIMEOUT_SECONDS
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.bitrate = bitrate
+        self.timeout_seconds = timeout_seconds
+        self.ffmpeg_available = shutil.which(Config.FFMPEG_PATH) is not None
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop = None
+
+        self.stats = {"jobs": 0, "failed": 0, "timeouts": 0, "queue_ms_total": 0.0, "run_ms_total": 0.0}
+
+        if not self.ffmpeg_available:
+            logger.warning("⚠️ ffmpeg not found: only WAV uploads are decoded, no Opus encoding")
+
+    def _ensure_workers(self):
+        """Start the worker tasks on the running loop (once per loop)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [loop.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"✅ Audio transcoder started: {self.workers} workers, queue {self.queue_size}")
+
+    async def _worker(self, worker_id: int):
+        while True:
+            args, input_data, future, enqueued = await self._queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                started = time.perf_counter()
+                output = await self._run_ffmpeg(args, input_data)
+                if not future.cancelled():
+                    future.set_result((output, (started - enqueued) * 1000, (time.perf_counter() - started) * 1000))
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def _run_ffmpeg(self, args: List[str], input_data: bytes) -> Optional[bytes]:
+        """Run ffmpeg with stdin/stdout pipes (killed after timeout_seconds)"""
+        process = await asyncio.create_subprocess_exec(
+            Config.FFMPEG_PATH, "-hide_banner", "-loglevel", "error", *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(input_data), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            # A hung job would hold its worker forever
+            process.kill()
+            await process.wait()
+            self.stats["timeouts"] += 1
+            logger.error(f"ffmpeg killed after {self.timeout_seconds}s")
+            return None
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+        if process.returncode != 0:
+            logger.error(f"ffmpeg error: {stderr.decode(errors='ignore').strip()}")
+            return None
+        return stdout
+
+    async def submit(self, args: List[str], input_data: bytes) -> Tuple[Optional[bytes], float, float]:
+        """
+        Queue one ffmpeg job and wait for it
+
+        Waits for queue space when the pool is saturated (backpressure).
+
+        Returns:
+            (output bytes or None, queue wait ms, run ms)
+        """
+        self._ensure_workers()
+        future = self._loop.create_future()
+        await self._queue.put((args, input_data, future, time.perf_counter()))
+
+        output, queue_ms, run_ms = await future
+        self.stats["jobs"] += 1
+        self.stats["queue_ms_total"] += queue_ms
+        self.stats["run_ms_total"] += run_ms
+        if output is None:
+            self.stats["failed"] += 1
+        return output, queue_ms, run_ms
+
+    async def decode(self, audio_data: bytes, metrics: Optional[Dict] = None) -> Optional[np.ndarray]:
+        """
+        Decode an upload once to 16 kHz mono int16 PCM
+
+        WAV is decoded in-process; other containers (webm, ogg, mp3) go
+        through the ffmpeg pool.
+
+        Returns:
+            PCM samples, or None if the audio cannot be decoded here
+        """
+        metrics = metrics if metrics is not None else {}
+        if audio_data[:4] == b"RIFF":
+            started = time.perf_counter()
+            samples = wav_to_pcm(audio_data)
+            if samples is not None:
+                metrics["decode_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                return samples
+
+        if not self.ffmpeg_available:
+            return None
+
+        # Downmix + resample happen inside ffmpeg
+        pcm, queue_ms, run_ms = await self.submit(
+            ["-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"],
+            audio_data
+        )
+        metrics["decode_queue_ms"] = round(queue_ms, 1)
+        metrics["decode_ms"] = round(run_ms, 1)
+        return np.frombuffer(pcm, dtype=np.int16) if pcm else None
+
+    async def encode(self, samples: np.ndarray, metrics: Optional[Dict] = None) -> Tuple[bytes, str]:
+        """
+        Encode 16 kHz mono PCM compactly for upload
+
+        Returns:
+            (audio bytes, format) - Ogg/Opus at the speech bitrate with
+            ffmpeg, otherwise 16 kHz mono WAV
+        """
+        metrics = metrics if metrics is not None else {}
+        if self.ffmpeg_available:
+            opus, queue_ms, run_ms = await self.submit(
+                ["-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", "1", "-i", "pipe:0",
+                 "-c:a", "libopus", "-b:a", self.bitrate, "-application", "voip", "-f", "ogg", "pipe:1"],
+                samples.astype(np.int16).tobytes()
+            )
+            metrics["encode_queue_ms"] = round(queue_ms, 1)
+            metrics["encode_ms"] = round(run_ms, 1)
+            if opus:
+                return opus, "opus"
+
+        started = time.perf_counter()
+        wav_data = pcm_to_wav(samples)
+        metrics["encode_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return wav_data, "wav"
+
+    def get_stats(self) -> Dict:
+        """Pool statistics (jobs, failures, timeouts, average queue / run ms, depth)"""
+        jobs = self.stats["jobs"] or 1
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "jobs": self.stats["jobs"],
+            "failed": self.stats["failed"],
+            "timeouts": self.stats["timeouts"],
+            "avg_queue_ms": round(self.stats["queue_ms_total"] / jobs, 1),
+            "avg_run_ms": round(self.stats["run_ms_total"] / jobs, 1),
+        }
+
+
+# Global audio transcoder instance
+audio_transcoder = AudioTranscoder()
@@ -0,0 +1,248 @@
+"""
+Azure Speech Synthesizer Pool
+Keeps pre-connected SpeechSynthesizer instances per (voice, output format)
+so each utterance reuses an open connection instead of building a new
+SpeechConfig / SpeechSynthesizer and handshaking with the service.
+
+Synthesizers are checked out per request and returned afterwards; one that
+hit a connection error is discarded and replaced on demand. The SDK's
+blocking ResultFuture.get() runs in a worker thread so the event loop never
+stalls on synthesis. stream_ssml yields audio chunks from the synthesizing
+event as Azure produces them, so playback can start before synthesis ends.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator, Callable, Dict, Deque, List, Optional, Tuple
+
+import azure.cognitiveservices.speech as speechsdk
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, str]
+
+
+def create_synthesizer(voice_name: str, output_format: str):
+    """Build a synthesizer for one voice / output format and open its connection"""
+    speech_config = speechsdk.SpeechConfig(
+        subscription=Config.AZURE_SPEECH_KEY,
+        region=Config.AZURE_SPEECH_REGION
+    )
+    speech_config.speech_synthesis_voice_name = voice_name
+    speech_config.set_speech_synthesis_output_format(getattr(speechsdk.SpeechSynthesisOutputFormat, output_format))
+
+    # Memory output (audio_config=None); pre-connect so the first request skips the handshake
+    synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+    connection = speechsdk.Connection.from_speech_synthesizer(synthesizer)
+    connection.open(True)
+    synthesizer._pool_connection = connection
+    return synthesizer
+
+
+class AzureSynthesizerPool:
+    """Per-voice pools of reusable Azure speech synthesizers"""
+
+    def __init__(
+        self,
+        size_per_voice: int = Config.AZURE_TTS_POOL_SIZE,
+        factory: Callable[[str, str], object] = create_synthesizer
+    ):
+        self.size_per_voice = size_per_voice
+        self.factory = factory
+
+        self._idle: Dict[PoolKey, Deque] = {}
+        self._total: Dict[PoolKey, int] = {}
+        self._available: Dict[PoolKey, asyncio.Condition] = {}
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "waits": 0}
+
+    def _condition(self, key: PoolKey) -> asyncio.Condition:
+        if key not in self._available:
+            self._available[key] = asyncio.Condition()
+        return self._available[key]
+
+    async def _create(self, key: PoolKey):
+        loop = asyncio.get_running_loop()
+        synthesizer = await loop.run_in_executor(None, self.factory, *key)
+        self.stats["created"] += 1
+        return synthesizer
+
+    async def checkout(self, voice_name: str, output_format: str):
+        """
+        Get an idle synthesizer for a voice, creating one if the pool has
+        room, otherwise wait for one to be returned
+        """
+        key = (voice_name, output_format)
+        condition = self._condition(key)
+        async with condition:
+            while True:
+                idle = self._idle.setdefault(key, deque())
+                if idle:
+                    self.stats["reused"] += 1
+                    return idle.popleft()
+                if self._total.get(key, 0) < self.size_per_voice:
+                    # Reserve the slot before the (slow) creation
+                    self._total[key] = self._total.get(key, 0) + 1
+                    break
+                self.stats["waits"] += 1
+                await condition.wait()
+
+        try:
+            return await self._create(key)
+        except Exception:
+            await self._release_slot(key)
+            raise
+
+    async def _release_slot(self, key: PoolKey):
+        condition = self._condition(key)
+        async with condition:
+            self._total[key] -= 1
+            condition.notify()
+
+    async def checkin(self, voice_name: str, output_format: str, synthesizer, healthy: bool = True):
+        """Return a synthesizer to its pool, or drop it if its connection failed"""
+        key = (voice_name, output_format)
+        if not healthy:
+            self.stats["discarded"] += 1
+            await self._release_slot(key)
+            return
+
+        condition = self._condition(key)
+        async with condition:
+            self._idle.setdefault(key, deque()).append(synthesizer)
+            condition.notify()
+
+    async def speak_ssml(self, voice_name: str, output_format: str, ssml: str):
+        """
+        Synthesize SSML on a pooled synthesizer
+
+        Returns:
+            The SDK SpeechSynthesisResult
+        """
+        synthesizer = await self.checkout(voice_name, output_format)
+        healthy = True
+        done = None
+        try:
+            future = synthesizer.speak_ssml_async(ssml)
+            loop = asyncio.get_running_loop()
+            done = loop.run_in_executor(None, future.get)
+            # Shielded: a cancelled caller (e.g. the hedge loser) must not
+            # abandon the executor call still holding the synthesizer
+            result = await asyncio.shield(done)
+            if result.reason == speechsdk.ResultReason.Canceled:
+                # Connection-level failures leave the synthesizer unusable
+                details = result.cancellation_details
+                healthy = details.reason != speechsdk.CancellationReason.Error
+            return result
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            if done is not None and not done.done():
+                healthy = await self._stop_speaking(synthesizer, done) and healthy
+            await self.checkin(voice_name, output_format, synthesizer, healthy)
+
+    @staticmethod
+    async def _stop_speaking(synthesizer, done: asyncio.Future) -> bool:
+        """
+        Stop a synthesis whose caller went away (cancelled / barge-in) and let
+        it wind down before the synthesizer is reused
+
+        Returns:
+            Whether the synthesizer can go back to the pool
+        """
+        healthy = True
+        stop_speaking = getattr(synthesizer, "stop_speaking_async", None)
+        if stop_speaking:
+            try:
+                stop_speaking()
+            except Exception:
+                healthy = False
+        try:
+            await done
+        except Exception:
+            healthy = False
+        return healthy
+
+    async def stream_ssml(self, voice_name: str, output_format: str, ssml: str) -> AsyncIterator[bytes]:
+        """
+        Synthesize SSML on a pooled synthesizer, yielding audio chunks as they arrive
+
+        Chunks come from the synthesizer's synthesizing event (SDK thread) and
+        are handed to the loop through a queue. Anything the events missed is
+        taken from the final result, so the concatenated chunks always equal
+        the complete audio.
+        """
+        synthesizer = await self.checkout(voice_name, output_format)
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+
+        def on_synthesizing(evt):
+            loop.call_soon_threadsafe(chunks.put_nowait, evt.result.audio_data)
+
+        synthesizer.synthesizing.connect(on_synthesizing)
+        healthy = True
+        done = None
+        try:
+            future = synthesizer.speak_ssml_async(ssml)
+            done = loop.run_in_executor(None, future.get)
+            done.add_done_callback(lambda _: chunks.put_nowait(None))
+
+            sent = 0
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                if chunk:
+                    sent += len(chunk)
+                    yield chunk
+
+            result = done.result()
+            if result.reason == speechsdk.ResultReason.Canceled:
+                details = result.cancellation_details
+                healthy = details.reason != speechsdk.CancellationReason.Error
+                logger.error(f"Azure Speech streaming canceled: {details.reason} {details.error_details or ''}")
+            elif len(result.audio_data) > sent:
+                yield result.audio_data[sent:]
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            synthesizer.synthesizing.disconnect_all()
+            if done is not None and not done.done():
+                # Consumer went away mid-stream (e.g. barge-in)
+                healthy = await self._stop_speaking(synthesizer, done) and healthy
+            await self.checkin(voice_name, output_format, synthesizer, healthy)
+
+    async def warm_up(self, voices: List[Tuple[str, str]], per_voice: Optional[int] = None):
+        """
+        Pre-create and connect synthesizers at startup
+
+        Args:
+            voices: (voice_name, output_format) pairs
+            per_voice: Synthesizers to open per voice (default: pool size)
+        """
+        per_voice = min(per_voice or self.size_per_voice, self.size_per_voice)
+        for voice_name, output_format in voices:
+            try:
+                synthesizers = [await self.checkout(voice_name, output_format) for _ in range(per_voice)]
+                for synthesizer in synthesizers:
+                    await self.checkin(voice_name, output_format, synthesizer)
+                logger.info(f"✅ Azure synthesizers warmed: {voice_name} ({output_format}) x{per_voice}")
+            except Exception as e:
+                logger.warning(f"⚠️ Azure synthesizer warm-up failed for {voice_name}: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        """Pool statistics"""
+        return {
+            **self.stats,
+            "voices": {f"{voice}|{fmt}": {"total": self._total.get((voice, fmt), 0),
+                                          "idle": len(self._idle.get((voice, fmt), ()))}
+                       for voice, fmt in self._total}
+        }
+
+
+# Global Azure synthesizer pool instance
+azure_synthesizer_pool = AzureSynthesizerPool()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+TTS provider benchmark: latency and output size per provider and language
+
+Usage:
+    python benchmark_tts.py --providers local,gtts,azure --languages hindi,english --runs 5
+
+Each provider is called directly (no routing, hedging or fallback) with the
+greeting message of each language.
+"""
+
+import time
+import asyncio
+import argparse
+
+import numpy as np
+
+from voice_service import voice_service
+
+
+async def benchmark(providers, languages, runs, profile):
+    rows = []
+    for provider in providers:
+        call = voice_service.tts_router.providers.get(provider)
+        if call is None:
+            print(f"⚠️ Unknown provider: {provider}")
+            continue
+        for language in languages:
+            text = voice_service.get_greeting_message(language)
+            latencies, sizes, failures = [], [], 0
+            media_type = ""
+            for _ in range(runs):
+                start = time.monotonic()
+                try:
+                    audio, media_type = await call(text, language, profile)
+                except Exception:
+                    audio = b""
+                elapsed_ms = (time.monotonic() - start) * 1000
+                if audio:
+                    latencies.append(elapsed_ms)
+                    sizes.append(len(audio))
+                else:
+                    failures += 1
+            rows.append((provider, language, latencies, sizes, failures, media_type))
+    return rows
+
+
+def print_report(rows, runs):
+    print(f"\n{'provider':<11}{'language':<10}{'p50 ms':>9}{'p95 ms':>9}{'bytes':>9}{'fail':>6}  media type")
+    print("-" * 72)
+    for provider, language, latencies, sizes, failures, media_type in rows:
+        if latencies:
+            p50, p95 = np.percentile(latencies, 50), np.percentile(latencies, 95)
+            print(f"{provider:<11}{language:<10}{p50:>9.0f}{p95:>9.0f}{int(np.mean(sizes)):>9}"
+                  f"{failures:>4}/{runs}  {media_type}")
+        else:
+            print(f"{provider:<11}{language:<10}{'-':>9}{'-':>9}{'-':>9}{failures:>4}/{runs}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark TTS providers")
+    parser.add_argument("--providers", default="local,gtts,azure,elevenlabs")
+    parser.add_argument("--languages", default="hindi,english")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--profile", default="native")
+    args = parser.parse_args()
+
+    providers = [p.strip() for p in args.providers.split(",") if p.strip()]
+    languages = [l.strip() for l in args.languages.split(",") if l.strip()]
+
+    await voice_service.warm_up()
+    rows = await benchmark(providers, languages, args.runs, args.profile)
+    print_report(rows, args.runs)
+    await voice_service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
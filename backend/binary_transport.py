@@ -0,0 +1,168 @@
+"""
+Binary Audio Transport (protocol v2)
+Helpers for carrying audio as raw bytes instead of base64 inside JSON.
+
+REST  /v2/voice/query
+    Request:  application/octet-stream (or audio/*) raw body with
+              session_id / language / audio_profile as query parameters or
+              X-Session-Id / X-Language / X-Audio-Profile headers, or
+              multipart/form-data with an "audio" file part and the same
+              fields
+    Response: multipart/mixed - a JSON metadata part followed by the audio
+              part (clients sending Accept: application/json get the v1
+              style JSON with base64 audio). With stream=1 (X-Stream: 1)
+              the response is chunked and the audio part, sent without a
+              Content-Length, is written as the TTS provider produces it
+
+WebSocket /ws/voice with {"type": "start", "protocol": 2}
+    Client -> server: binary frames of PCM s16le 16 kHz mono
+    Server -> client: JSON "response" message carrying audio_format and
+                      audio_size, followed by one binary frame of audio
+    With "stream_audio": true in the start message the response message
+    carries "audio_streaming": true, audio follows as one binary frame per
+    TTS chunk, and {"type": "audio_end", "audio_size": n} closes it
+"""
+
+import json
+import uuid
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_V1 = 1
+PROTOCOL_V2 = 2
+
+# Request fields carried as query parameters / X- headers / form fields
+VOICE_FIELDS = ("session_id", "language", "audio_profile", "stream")
+
+
+async def read_audio_body(request: Request, max_bytes: int = Config.MAX_AUDIO_UPLOAD_BYTES) -> bytes:
+    """
+    Read a raw audio request body chunk by chunk
+
+    The body is streamed into a single buffer (no base64 / JSON decode) and
+    rejected as soon as it exceeds max_bytes rather than after buffering it.
+
+    Raises:
+        HTTPException 413 if the body is too large
+    """
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise HTTPException(status_code=413, detail="Audio upload too large")
+
+    buffer = bytearray()
+    async for chunk in request.stream():
+        if len(buffer) + len(chunk) > max_bytes:
+            raise HTTPException(status_code=413, detail="Audio upload too large")
+        buffer += chunk
+    return bytes(buffer)
+
+
+async def parse_voice_upload(request: Request) -> Tuple[bytes, Dict[str, Optional[str]]]:
+    """
+    Extract audio and request fields from a v2 voice request
+
+    Returns:
+        (audio bytes, {"session_id", "language", "audio_profile"})
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        # Starlette's parser streams parts and spools large files to disk
+        form = await request.form()
+        upload = form.get("audio")
+        if upload is None or not hasattr(upload, "read"):
+            raise HTTPException(status_code=400, detail="Missing 'audio' file part")
+        audio_data = await upload.read()
+        if len(audio_data) > Config.MAX_AUDIO_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Audio upload too large")
+        return audio_data, {field: form.get(field) for field in VOICE_FIELDS}
+
+    audio_data = await read_audio_body(request)
+    fields = {
+        field: request.query_params.get(field) or request.headers.get(f"x-{field.replace('_', '-')}")
+        for field in VOICE_FIELDS
+    }
+    return audio_data, fields
+
+
+def multipart_mixed_response(metadata: Dict, audio: bytes, audio_type: str) -> Response:
+    """
+    Build a multipart/mixed response: JSON metadata part, then the audio part
+
+    Args:
+        metadata: JSON-serializable response fields
+        audio: Raw audio bytes (may be empty)
+        audio_type: Audio media type (e.g. audio/mpeg)
+    """
+    boundary = uuid.uuid4().hex
+    metadata_part = json.dumps(metadata, ensure_ascii=False, default=str).encode("utf-8")
+
+    body = b"".join([
+        f"--{boundary}\r\nContent-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(metadata_part)}\r\n\r\n".encode("ascii"),
+        metadata_part,
+        f"\r\n--{boundary}\r\nContent-Type: {audio_type}\r\n"
+        f"Content-Length: {len(audio)}\r\n\r\n".encode("ascii"),
+        audio,
+        f"\r\n--{boundary}--\r\n".encode("ascii"),
+    ])
+    return Response(content=body, media_type=f"multipart/mixed; boundary={boundary}")
+
+
+def multipart_mixed_stream(metadata: Dict, audio_chunks: AsyncIterator[bytes], audio_type: str) -> StreamingResponse:
+    """
+    Chunked multipart/mixed response: the JSON metadata part goes out
+    immediately, then audio chunks are written as they are produced
+
+    The audio part has no Content-Length; readers find its end at the
+    closing boundary.
+    """
+    boundary = uuid.uuid4().hex
+    metadata_part = json.dumps(metadata, ensure_ascii=False, default=str).encode("utf-8")
+
+    async def body():
+        yield (f"--{boundary}\r\nContent-Type: application/json; charset=utf-8\r\n"
+               f"Content-Length: {len(metadata_part)}\r\n\r\n".encode("ascii") + metadata_part +
+               f"\r\n--{boundary}\r\nContent-Type: {audio_type}\r\n\r\n".encode("ascii"))
+        async for chunk in audio_chunks:
+            yield chunk
+        yield f"\r\n--{boundary}--\r\n".encode("ascii")
+
+    return StreamingResponse(body(), media_type=f"multipart/mixed; boundary={boundary}")
+
+
+def parse_multipart_mixed(body: bytes, content_type: str) -> List[Tuple[Dict[str, str], bytes]]:
+    """
+    Split a multipart/mixed body into (headers, payload) parts
+
+    Used by Python clients and tests; payloads are sliced by Content-Length
+    so binary audio never needs scanning for the boundary.
+    """
+    boundary = content_type.split("boundary=", 1)[1].strip().strip('"').encode("ascii")
+    delimiter = b"--" + boundary
+    parts = []
+    position = body.index(delimiter) + len(delimiter)
+
+    while not body.startswith(b"--", position):
+        header_end = body.index(b"\r\n\r\n", position)
+        headers = {}
+        for line in body[position:header_end].decode("ascii").strip().split("\r\n"):
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        start = header_end + 4
+        if "content-length" in headers:
+            end = start + int(headers["content-length"])
+        else:
+            end = body.index(b"\r\n" + delimiter, start)
+        parts.append((headers, body[start:end]))
+        position = body.index(delimiter, end) + len(delimiter)
+
+    return parts
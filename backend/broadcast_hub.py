@@ -0,0 +1,306 @@
+"""
+District / State Broadcast Hub
+Pushes weather and pest emergencies (and advisories) to connected /ws/voice
+clients instead of waiting for each farmer to ask. Connections subscribe with
+their session's location and are indexed by state and district; a broadcast
+is rendered once per language - text plus one pre-synthesized audio clip -
+and the same frames are queued for every matching connection. Each
+connection has its own bounded send queue and writer task, so a slow client
+drops its own broadcasts instead of holding up the fan-out.
+
+Frames (protocol 1 carries the audio as base64 in "audio"; protocol 2 sends
+the JSON with "audio_size" followed by one binary frame):
+
+    {"type": "broadcast", "id": "...", "kind": "emergency", "severity": "high",
+     "title": "...", "text": "...", "language": "hindi", "audio_format": "mp3"}
+
+Multi-worker: broadcasts go through a broker (publish / subscribe on
+BROADCAST_TOPIC) and every worker's hub delivers to its own connections.
+LocalBroker is the in-process stand-in; a Redis pub/sub client with the same
+two methods fans out across uvicorn workers.
+"""
+
+import json
+import time
+import uuid
+import base64
+import asyncio
+import logging
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from config import Config
+from audio_profiles import select_profile
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ("district", "state", "all")
+
+
+def _key(name: Optional[str]) -> str:
+    return " ".join((name or "").casefold().split())
+
+
+class LocalBroker:
+    """In-process stand-in for a pub/sub broker (Redis PUBLISH / SUBSCRIBE)"""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[bytes], Awaitable[None]]]] = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: Callable[[bytes], Awaitable[None]]):
+        self._handlers[topic].append(handler)
+
+    async def publish(self, topic: str, payload: bytes) -> int:
+        """Deliver payload to every subscriber of topic; returns the number reached"""
+        handlers = list(self._handlers.get(topic, []))
+        for handler in handlers:
+            try:
+                await handler(payload)
+            except Exception as e:
+                logger.error(f"Broker subscriber failed: {str(e)}")
+        return len(handlers)
+
+
+class Subscriber:
+    """One connection's broadcast queue and writer task"""
+
+    def __init__(
+        self,
+        session_id: str,
+        send_json: Callable[[Dict], Awaitable[None]],
+        send_bytes: Optional[Callable[[bytes], Awaitable[None]]],
+        language: str,
+        binary_audio: bool,
+        queue_size: int
+    ):
+        self.session_id = session_id
+        self.send_json = send_json
+        self.send_bytes = send_bytes
+        self.language = language
+        self.binary_audio = binary_audio and send_bytes is not None
+        self.state = ""
+        self.district = ""
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task = asyncio.create_task(self._write())
+
+    async def _write(self):
+        while True:
+            message, audio = await self.queue.get()
+            try:
+                await self.send_json(message)
+                if audio:
+                    await self.send_bytes(audio)
+            except Exception as e:
+                logger.warning(f"Broadcast to {self.session_id} failed: {str(e)}")
+
+
+class BroadcastHub:
+    """Indexes connections by location and fans out broadcasts to them"""
+
+    def __init__(
+        self,
+        broker: Optional[LocalBroker] = None,
+        topic: str = Config.BROADCAST_TOPIC,
+        queue_size: int = Config.BROADCAST_QUEUE_SIZE,
+        synthesize: Optional[Callable[[str, str, str], Awaitable[Tuple[bytes, str]]]] = None
+    ):
+        self.broker = broker or LocalBroker()
+        self.topic = topic
+        self.queue_size = queue_size
+        self._synthesize = synthesize
+        self._all: Set[Subscriber] = set()
+        self._by_state: Dict[str, Set[Subscriber]] = defaultdict(set)
+        self._by_district: Dict[str, Set[Subscriber]] = defaultdict(set)
+        self._fanout_ms: Deque[float] = deque(maxlen=200)
+        self.stats = {"published": 0, "received": 0, "delivered": 0, "dropped": 0, "synthesized": 0}
+        self.broker.subscribe(topic, self._on_broker_message)
+
+    def subscribe(
+        self,
+        session_id: str,
+        send_json: Callable[[Dict], Awaitable[None]],
+        send_bytes: Optional[Callable[[bytes], Awaitable[None]]] = None,
+        location: Optional[Dict] = None,
+        language: str = "hindi",
+        binary_audio: bool = False
+    ) -> Subscriber:
+        """
+        Register a connection for broadcasts (call on the event loop)
+
+        Args:
+            session_id: The connection's session
+            send_json / send_bytes: How to write frames to the connection
+            location: SessionData.location (state / district / city)
+            language: Preferred broadcast language
+            binary_audio: Send audio as a binary frame (protocol 2)
+
+        Returns:
+            Handle for update() / unsubscribe()
+        """
+        subscriber = Subscriber(session_id, send_json, send_bytes, language, binary_audio, self.queue_size)
+        self._all.add(subscriber)
+        self.update(subscriber, location, language)
+        return subscriber
+
+    def update(self, subscriber: Subscriber, location: Optional[Dict] = None, language: Optional[str] = None):
+        """Re-index a connection after its location or language changed"""
+        if subscriber not in self._all:
+            return
+        if language:
+            subscriber.language = language
+        location = location or {}
+        state = _key(location.get("state"))
+        district = _key(location.get("district") or location.get("city"))
+        if (state, district) == (subscriber.state, subscriber.district):
+            return
+        self._unindex(subscriber)
+        subscriber.state, subscriber.district = state, district
+        if state:
+            self._by_state[state].add(subscriber)
+        if district:
+            self._by_district[district].add(subscriber)
+
+    def _unindex(self, subscriber: Subscriber):
+        if subscriber.state:
+            self._by_state[subscriber.state].discard(subscriber)
+            if not self._by_state[subscriber.state]:
+                del self._by_state[subscriber.state]
+        if subscriber.district:
+            self._by_district[subscriber.district].discard(subscriber)
+            if not self._by_district[subscriber.district]:
+                del self._by_district[subscriber.district]
+
+    def unsubscribe(self, subscriber: Optional[Subscriber]):
+        """Remove a connection; broadcasts still queued for it are dropped"""
+        if subscriber is None or subscriber not in self._all:
+            return
+        self._all.discard(subscriber)
+        self._unindex(subscriber)
+        subscriber.task.cancel()
+
+    def _targets(self, scope: str, state: str, district: str) -> Set[Subscriber]:
+        if scope == "all":
+            return self._all
+        if scope == "state":
+            return self._by_state.get(state, set())
+        subscribers = self._by_district.get(district, set())
+        if not state:
+            return subscribers
+        # Same district name in another state; sessions without a state still match
+        return {subscriber for subscriber in subscribers if subscriber.state in ("", state)}
+
+    async def broadcast(
+        self,
+        messages: Dict[str, str],
+        title: str = "",
+        kind: str = "emergency",
+        severity: str = "high",
+        scope: str = "district",
+        state: Optional[str] = None,
+        district: Optional[str] = None,
+        audio_profile: Optional[str] = None,
+        synthesize_audio: bool = True
+    ) -> Dict:
+        """
+        Render a broadcast once and publish it to every worker
+
+        Args:
+            messages: Text per language ({"hindi": "...", "english": "..."})
+            scope: "district", "state" or "all"
+            audio_profile: Audio profile of the pre-synthesized clips
+
+        Returns:
+            Broadcast id, workers reached and languages with audio
+        """
+        if scope not in SCOPES:
+            raise ValueError(f"scope must be one of {', '.join(SCOPES)}")
+        if (scope == "district" and not district) or (scope == "state" and not state):
+            raise ValueError(f"A {scope} broadcast needs a {scope}")
+
+        profile = audio_profile or select_profile()
+        audio: Dict[str, Dict] = {}
+        if synthesize_audio:
+            # One clip per language, shared by every recipient on every worker
+            for language, text in messages.items():
+                try:
+                    clip, audio_format = await self._synthesize_clip(text, language, profile)
+                except Exception as e:
+                    logger.warning(f"Broadcast audio failed for {language}: {str(e)}")
+                    continue
+                if clip:
+                    audio[language] = {"data": base64.b64encode(clip).decode("utf-8"), "format": audio_format}
+                    self.stats["synthesized"] += 1
+
+        alert = {
+            "id": str(uuid.uuid4()), "kind": kind, "severity": severity, "title": title,
+            "scope": scope, "state": state, "district": district,
+            "messages": messages, "audio": audio, "published_at": time.time()
+        }
+        workers = await self.broker.publish(self.topic, json.dumps(alert, ensure_ascii=False).encode("utf-8"))
+        self.stats["published"] += 1
+        logger.info(f"📢 Broadcast {alert['id']} ({kind}, {scope}: {district or state or 'all'}) to {workers} worker(s)")
+        return {"id": alert["id"], "workers": workers, "audio_languages": sorted(audio)}
+
+    async def _synthesize_clip(self, text: str, language: str, profile: str) -> Tuple[bytes, str]:
+        if self._synthesize:
+            return await self._synthesize(text, language, profile)
+        from voice_service import voice_service
+        return await voice_service.synthesize(text, language, profile)
+
+    async def _on_broker_message(self, payload: bytes):
+        """Deliver a published broadcast to this worker's matching connections"""
+        started = time.monotonic()
+        alert = json.loads(payload)
+        self.stats["received"] += 1
+        targets = self._targets(alert["scope"], _key(alert.get("state")), _key(alert.get("district")))
+        if not targets:
+            return
+
+        # Frames rendered once per (language, audio transport), shared by all recipients
+        frames: Dict[Tuple[str, bool], Tuple[Dict, Optional[bytes]]] = {}
+        messages = alert["messages"]
+        fallback = next(iter(messages))
+        for subscriber in list(targets):
+            language = subscriber.language if subscriber.language in messages else fallback
+            key = (language, subscriber.binary_audio)
+            if key not in frames:
+                frames[key] = self._render(alert, language, subscriber.binary_audio)
+            try:
+                subscriber.queue.put_nowait(frames[key])
+                self.stats["delivered"] += 1
+            except asyncio.QueueFull:
+                self.stats["dropped"] += 1
+
+        self._fanout_ms.append((time.monotonic() - started) * 1000)
+
+    @staticmethod
+    def _render(alert: Dict, language: str, binary_audio: bool) -> Tuple[Dict, Optional[bytes]]:
+        message = {
+            "type": "broadcast", "id": alert["id"], "kind": alert["kind"], "severity": alert["severity"],
+            "title": alert["title"], "text": alert["messages"][language], "language": language
+        }
+        clip = alert["audio"].get(language)
+        if not clip:
+            return message, None
+        message["audio_format"] = clip["format"]
+        if not binary_audio:
+            message["audio"] = clip["data"]
+            return message, None
+        audio = base64.b64decode(clip["data"])
+        message["audio_size"] = len(audio)
+        return message, audio
+
+    def get_stats(self) -> Dict:
+        fanout_ms = sorted(self._fanout_ms)
+        return {
+            **self.stats,
+            "subscribers": len(self._all),
+            "states": len(self._by_state),
+            "districts": len(self._by_district),
+            "fanout_ms_p50": round(fanout_ms[len(fanout_ms) // 2], 2) if fanout_ms else None,
+            "fanout_ms_max": round(fanout_ms[-1], 2) if fanout_ms else None
+        }
+
+
+# Global broadcast hub of this worker (in-process broker by default)
+broadcast_hub = BroadcastHub()
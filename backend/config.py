@@ -22,13 +22,91 @@ class Config:
     OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
     AZURE_SPEECH_KEY = os.getenv("AZURE_SPEECH_KEY")
     AZURE_SPEECH_REGION = os.getenv("AZURE_SPEECH_REGION")
+    AZURE_TTS_POOL_SIZE = int(os.getenv("AZURE_TTS_POOL_SIZE", "2"))  # Synthesizers per voice
+    AZURE_TTS_WARM_LANGUAGES = os.getenv("AZURE_TTS_WARM_LANGUAGES", "hindi,english").split(",")
     
     # Frontend Configuration
     FRONTEND_ORIGIN = os.getenv("FRONTEND_ORIGIN", "http://localhost:5173")
     
     # Voice Configuration
     ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "pNInz6obpgDQGcFmaJgB")  # Default Hindi voice
-    TTS_PROVIDER = os.getenv("TTS_PROVIDER", "gtts")  # Options: "elevenlabs", "gtts", or "azure"
+    TTS_PROVIDER = os.getenv("TTS_PROVIDER", "gtts")  # Options: "elevenlabs", "gtts", "azure", or "local"
+    
+    # Offline TTS (kiosk mode): Piper voices where available, espeak-ng otherwise
+    PIPER_VOICES_DIR = os.getenv("PIPER_VOICES_DIR", os.path.join(os.path.dirname(__file__), "piper_voices"))
+    ESPEAK_PATH = os.getenv("ESPEAK_PATH", "espeak-ng")
+    LOCAL_TTS_WORKERS = int(os.getenv("LOCAL_TTS_WORKERS", "2"))
+    LOCAL_TTS_RATE = int(os.getenv("LOCAL_TTS_RATE", "150"))  # espeak-ng words per minute
+    
+    # TTS Routing (fallback providers, hedging after p95, circuit breakers)
+    TTS_FALLBACK_PROVIDERS = [p for p in os.getenv("TTS_FALLBACK_PROVIDERS", "azure,elevenlabs,gtts,local").split(",") if p]
+    TTS_STATS_WINDOW = int(os.getenv("TTS_STATS_WINDOW", "100"))  # Requests per provider/language
+    TTS_HEDGE_MIN_MS = float(os.getenv("TTS_HEDGE_MIN_MS", "300"))
+    TTS_HEDGE_MAX_MS = float(os.getenv("TTS_HEDGE_MAX_MS", "3000"))
+    TTS_BREAKER_FAILURES = int(os.getenv("TTS_BREAKER_FAILURES", "3"))
+    TTS_BREAKER_COOLDOWN_SECONDS = float(os.getenv("TTS_BREAKER_COOLDOWN_SECONDS", "30"))
+    
+    # Speech-to-Text Configuration (AssemblyAI REST API, async path)
+    ASSEMBLYAI_BASE_URL = os.getenv("ASSEMBLYAI_BASE_URL", "https://api.assemblyai.com/v2")
+    STT_TIMEOUT_SECONDS = float(os.getenv("STT_TIMEOUT_SECONDS", "60"))
+    STT_POLL_INTERVAL_SECONDS = float(os.getenv("STT_POLL_INTERVAL_SECONDS", "0.5"))
+    MAX_AUDIO_UPLOAD_BYTES = int(os.getenv("MAX_AUDIO_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+    
+    # Offline Speech-to-Text (kiosk mode): faster-whisper, or a whisper.cpp binary
+    STT_PROVIDER = os.getenv("STT_PROVIDER", "assemblyai")  # "assemblyai" or "local"
+    LOCAL_STT_MODEL = os.getenv("LOCAL_STT_MODEL", "small")  # faster-whisper model name or path
+    WHISPER_CPP_PATH = os.getenv("WHISPER_CPP_PATH", "whisper-cli")
+    WHISPER_CPP_MODEL = os.getenv("WHISPER_CPP_MODEL", os.path.join(os.path.dirname(__file__), "models", "ggml-small.bin"))
+    LOCAL_STT_WORKERS = int(os.getenv("LOCAL_STT_WORKERS", "0"))  # 0 = CPU count
+    LOCAL_STT_MAX_SECONDS = float(os.getenv("LOCAL_STT_MAX_SECONDS", "4"))  # Shorter speech skips the network
+    
+    # Realtime Transcription (one AssemblyAI streaming session per /ws/voice connection)
+    REALTIME_MAX_SESSIONS = int(os.getenv("REALTIME_MAX_SESSIONS", "500"))  # Per worker process
+    REALTIME_POOL_SIZE = int(os.getenv("REALTIME_POOL_SIZE", "2"))  # Idle pre-opened connections per language
+    REALTIME_WARM_LANGUAGES = [l for l in os.getenv("REALTIME_WARM_LANGUAGES", "hindi").split(",") if l]
+    REALTIME_REUSE_GRACE_SECONDS = float(os.getenv("REALTIME_REUSE_GRACE_SECONDS", "1.5"))  # Let late transcripts drain
+    REALTIME_CONNECTION_MAX_AGE_SECONDS = float(os.getenv("REALTIME_CONNECTION_MAX_AGE_SECONDS", "3000"))
+    REALTIME_QUEUE_SIZE = int(os.getenv("REALTIME_QUEUE_SIZE", "32"))  # Pending transcript events per session
+    TRANSCRIPT_PARTIAL_INTERVAL_MS = float(os.getenv("TRANSCRIPT_PARTIAL_INTERVAL_MS", "200"))  # Min gap between caption frames
+    TRANSCRIPT_PARTIAL_MIN_WORDS = int(os.getenv("TRANSCRIPT_PARTIAL_MIN_WORDS", "1"))  # Words changed to send a partial now
+    TRANSCRIPT_PARTIAL_MAX_HOLD_MS = float(os.getenv("TRANSCRIPT_PARTIAL_MAX_HOLD_MS", "600"))  # Held partial flushed after this
+    SPECULATION_ENABLED = os.getenv("SPECULATION_ENABLED", "true").lower() == "true"  # Classify stable partials early
+    SPECULATION_STABLE_MS = float(os.getenv("SPECULATION_STABLE_MS", "400"))  # Partial unchanged this long
+    REALTIME_AUDIO_BUFFER_MS = int(os.getenv("REALTIME_AUDIO_BUFFER_MS", "2000"))  # Per-connection audio ring buffer
+    REALTIME_AUDIO_CHUNK_MS = int(os.getenv("REALTIME_AUDIO_CHUNK_MS", "100"))  # Largest chunk sent upstream at once
+    REALTIME_AUDIO_MAX_PENDING = int(os.getenv("REALTIME_AUDIO_MAX_PENDING", "4"))  # SDK-queued chunks before the sender waits
+    REALTIME_AUDIO_SILENCE_RMS = float(os.getenv("REALTIME_AUDIO_SILENCE_RMS", "0.01"))  # Frames below this RMS are silence
+    WS_REPLAY_MAX_FRAMES = int(os.getenv("WS_REPLAY_MAX_FRAMES", "256"))  # Unacknowledged frames kept per session
+    WS_REPLAY_MAX_BYTES = int(os.getenv("WS_REPLAY_MAX_BYTES", "2000000"))  # ... and their total size
+    WS_REPLAY_UNACKED_MAX_BYTES = int(os.getenv("WS_REPLAY_UNACKED_MAX_BYTES", "64000"))  # Delivered frames kept for clients that never ack
+    WS_RESUME_TTL_SECONDS = float(os.getenv("WS_RESUME_TTL_SECONDS", "120"))  # Disconnected session kept this long
+    BROADCAST_QUEUE_SIZE = int(os.getenv("BROADCAST_QUEUE_SIZE", "16"))  # Undelivered broadcasts per connection
+    BROADCAST_TOPIC = os.getenv("BROADCAST_TOPIC", "kisaan:broadcasts")  # Broker topic shared by all workers
+    BROADCAST_API_KEY = os.getenv("BROADCAST_API_KEY")  # Admin token for POST /broadcast (unset = disabled)
+    
+    # Voice Activity Detection (silence trimming before STT)
+    VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+    VAD_MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "250"))
+    FFMPEG_PATH = os.getenv("FFMPEG_PATH", "ffmpeg")
+    
+    # Audio Transcoding (16 kHz mono Opus before STT upload)
+    TRANSCODE_ENABLED = os.getenv("TRANSCODE_ENABLED", "true").lower() == "true"
+    TRANSCODE_WORKERS = int(os.getenv("TRANSCODE_WORKERS", "0"))  # 0 = CPU count
+    TRANSCODE_QUEUE_SIZE = int(os.getenv("TRANSCODE_QUEUE_SIZE", "32"))
+    TRANSCODE_TIMEOUT_SECONDS = float(os.getenv("TRANSCODE_TIMEOUT_SECONDS", "30"))  # Hung ffmpeg jobs are killed after this
+    STT_OPUS_BITRATE = os.getenv("STT_OPUS_BITRATE", "16k")
+    
+    # Response Audio Profiles ("native", "opus-12k", "mp3-32k", "mp3-64k")
+    DEFAULT_AUDIO_PROFILE = os.getenv("DEFAULT_AUDIO_PROFILE", "native")
+    AUDIO_VARIANT_CACHE_MB = int(os.getenv("AUDIO_VARIANT_CACHE_MB", "32"))
+    SSE_AUDIO_SEGMENT_MAX = int(os.getenv("SSE_AUDIO_SEGMENT_MAX", "500"))  # Per-sentence clips kept for /voice/audio
+    SSE_AUDIO_SEGMENT_TTL_SECONDS = float(os.getenv("SSE_AUDIO_SEGMENT_TTL_SECONDS", "300"))
+    
+    # Session Store (in-memory SessionData per worker: idle TTL, LRU cap, history cap)
+    SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+    SESSION_IDLE_TTL_SECONDS = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "7200"))  # Since last activity / lookup
+    SESSION_MAX_HISTORY_TURNS = int(os.getenv("SESSION_MAX_HISTORY_TURNS", "50"))
+    SESSION_SWEEP_INTERVAL_SECONDS = float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "60"))
     
     # Language Configuration
     SUPPORTED_LANGUAGES = {
@@ -47,4 +125,19 @@ class Config:
     
     # Agriculture API Configuration
     AGMARKNET_API_BASE = "https://api.data.gov.in/resource"
-    DATA_GOV_API_KEY = os.getenv("DATA_GOV_API_KEY")
\ No newline at end of file
+    DATA_GOV_API_KEY = os.getenv("DATA_GOV_API_KEY")
+    
+    # Knowledge Retrieval Configuration
+    KNOWLEDGE_DIR = os.getenv("KNOWLEDGE_DIR", os.path.join(os.path.dirname(__file__), "knowledge"))
+    KNOWLEDGE_INDEX_DIR = os.getenv("KNOWLEDGE_INDEX_DIR", os.path.join(os.path.dirname(__file__), "knowledge_index"))
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+    
+    # Expert Directory Configuration (versioned KVK / office / helpline datasets)
+    EXPERT_DIRECTORY_DIR = os.getenv("EXPERT_DIRECTORY_DIR", os.path.join(os.path.dirname(__file__), "data", "expert_directory"))
+    
+    # Soil Health Store Configuration (district soil health card aggregates)
+    SOIL_HEALTH_STORE_PATH = os.getenv("SOIL_HEALTH_STORE_PATH", os.path.join(os.path.dirname(__file__), "data", "soil_health", "soil_health_store.npz"))
+    
+    # Pest Risk Engine Configuration (daily batch over cached district forecasts)
+    WEATHER_CACHE_TTL_HOURS = float(os.getenv("WEATHER_CACHE_TTL_HOURS", "6"))  # Cached forecast is refetched after this
+    PEST_RISK_BATCH_INTERVAL_SECONDS = float(os.getenv("PEST_RISK_BATCH_INTERVAL_SECONDS", "86400"))  # Daily
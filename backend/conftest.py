@@ -0,0 +1,58 @@
+"""
+Shared pytest fixtures for the offline tests
+"""
+
+import pytest
+from aiohttp import web
+
+from config import Config
+
+
+async def start_assemblyai_stand_in(processing_polls: int = 2, text: str = "गेहूं का भाव"):
+    """Local server with /upload, /transcript and /transcript/{id}"""
+    state = {"uploaded": 0, "polls": 0}
+
+    async def upload(request):
+        state["uploaded"] = len(await request.read())
+        return web.json_response({"upload_url": "http://stand-in/audio/1"})
+
+    async def submit(request):
+        body = await request.json()
+        state["language_code"] = body["language_code"]
+        return web.json_response({"id": "t1", "status": "queued"})
+
+    async def poll(request):
+        state["polls"] += 1
+        if state["polls"] < processing_polls:
+            return web.json_response({"id": "t1", "status": "processing"})
+        return web.json_response({"id": "t1", "status": "completed", "text": text})
+
+    app = web.Application()
+    app.router.add_post("/v2/upload", upload)
+    app.router.add_post("/v2/transcript", submit)
+    app.router.add_get("/v2/transcript/{id}", poll)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, state, f"http://127.0.0.1:{port}/v2"
+
+
+@pytest.fixture
+def assemblyai_stand_in(monkeypatch):
+    """
+    Start the AssemblyAI REST stand-in (call it inside the test's event loop)
+
+    Returns an async function taking processing_polls / text and returning
+    (runner, state); it points Config.ASSEMBLYAI_BASE_URL at the stand-in and
+    polls fast. Config is restored after the test.
+    """
+    monkeypatch.setattr(Config, "STT_POLL_INTERVAL_SECONDS", 0.05)
+    monkeypatch.setattr(Config, "ASSEMBLYAI_BASE_URL", Config.ASSEMBLYAI_BASE_URL)
+
+    async def start(processing_polls: int = 2, text: str = "गेहूं का भाव"):
+        runner, state, Config.ASSEMBLYAI_BASE_URL = await start_assemblyai_stand_in(processing_polls, text)
+        return runner, state
+
+    return start
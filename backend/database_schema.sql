@@ -45,7 +45,7 @@ CREATE TABLE crop_advisories (
     advisory_id SERIAL PRIMARY KEY,
     crop_id INTEGER REFERENCES crops(crop_id) ON DELETE CASCADE,
     advisory_date DATE NOT NULL,
-    advisory_type VARCHAR(100) NOT NULL, -- pest_control, fertilizer, irrigation, disease
+    advisory_type VARCHAR(100) NOT NULL, -- pest_control, fertilizer, irrigation, disease, disease_risk (pest_risk_engine)
     description TEXT NOT NULL,
     severity VARCHAR(50), -- low, medium, high, critical
     action_required TEXT,
@@ -79,6 +79,10 @@ CREATE TABLE government_schemes (
     how_to_apply TEXT,
     state VARCHAR(255), -- NULL means applicable to all states
     district VARCHAR(255), -- NULL means applicable to all districts
+    min_land_acres DECIMAL(10, 2), -- NULL means no minimum holding
+    max_land_acres DECIMAL(10, 2), -- NULL means no upper limit
+    eligible_crops TEXT[], -- NULL means all crops
+    farmer_categories TEXT[], -- marginal, small, medium, large, tenant, women, sc_st; NULL means all
     scheme_url TEXT,
     active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -169,6 +173,9 @@ INSERT INTO government_schemes (scheme_name, scheme_name_hindi, description, des
  'Call 1800-180-1551',
  NULL);
 
+-- Structured eligibility rules used by scheme_eligibility.py
+UPDATE government_schemes SET min_land_acres = 0.01 WHERE scheme_name IN ('PM-KISAN', 'Kisan Credit Card');
+
 -- Create stored procedures for common operations
 
 -- Procedure to get farmer's crop information
@@ -34,3 +34,11 @@ def get_db_connection():
             host=Config.DB_HOST,
             port=Config.DB_PORT
         )
+
+def get_placeholder():
+    """
+    Get the query parameter placeholder for the configured database driver
+    SQLite uses "?", psycopg2 uses "%s"
+    """
+    db_type = getattr(Config, 'DB_TYPE', 'postgresql')
+    return "?" if db_type == 'sqlite' else "%s"
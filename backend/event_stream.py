@@ -0,0 +1,130 @@
+"""
+Server-Sent Events Transport for /voice/query/stream
+For kiosk browsers behind proxies that only allow plain HTTP: the voice query
+is answered as a text/event-stream, one event per pipeline stage as soon as
+it is available, instead of one JSON body after STT, the whole graph, all
+TTS and the avatar are done.
+
+    event: session      {"session_id", "audio_profile"}
+    event: transcript   {"text"}
+    event: query_type   {"query_type", "parsed_entities"}
+    event: token        {"delta"}                     LLM tokens of the answering agent
+    event: images       {"image_urls", "layout_type"}
+    event: sentence     {"index", "text"}             one per sentence of the final answer
+    event: audio        {"index", "url", "audio_format", "audio_size"}
+    event: done         {"text_response", "language", "requires_camera", ...}
+    event: error        {"message"}
+
+token events are live and provisional: an agent may post-process its LLM
+output or fall back to a canned answer. sentence events split the final
+answer after the graph has finished and line up with the audio events by
+index. Audio is synthesized per sentence, concurrently; each segment is served
+from AudioSegmentStore at GET /voice/audio/{segment_id} (short-lived, per worker).
+"""
+
+import re
+import json
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Dict, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # Keep nginx-style proxies from buffering the stream
+}
+
+# Sentence ends: Devanagari / Gurmukhi danda, Latin punctuation, line breaks
+_SENTENCE_END = re.compile(r"(?<=[।॥.!?])\s+|\n+")
+MIN_SEGMENT_CHARS = 40  # Shorter sentences are joined with the next one
+
+
+def sse_event(event: str, data: Dict, event_id: Optional[int] = None) -> str:
+    """Format one Server-Sent Event"""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def split_sentences(text: str, min_chars: int = MIN_SEGMENT_CHARS) -> List[str]:
+    """Split a response into speakable segments of at least min_chars (except the last)"""
+    segments = []
+    current = ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        current = f"{current} {sentence}" if current else sentence
+        if len(current) >= min_chars:
+            segments.append(current)
+            current = ""
+    if current:
+        segments.append(current)
+    return segments
+
+
+class AudioSegmentStore:
+    """Synthesized audio segments by id, kept for a short while for clients to fetch"""
+
+    def __init__(
+        self,
+        max_segments: int = Config.SSE_AUDIO_SEGMENT_MAX,
+        ttl_seconds: float = Config.SSE_AUDIO_SEGMENT_TTL_SECONDS
+    ):
+        self.max_segments = max_segments
+        self.ttl_seconds = ttl_seconds
+        # segment_id -> (synthesis task of (audio, media type), created_at)
+        self._segments: "OrderedDict[str, Tuple[asyncio.Task, float]]" = OrderedDict()
+
+    def add(self, synthesis: Awaitable[Tuple[bytes, str]]) -> Tuple[str, asyncio.Task]:
+        """
+        Start synthesizing a segment
+
+        Returns:
+            (segment id, task resolving to (audio bytes, media type))
+        """
+        self._expire()
+        segment_id = uuid.uuid4().hex
+        task = asyncio.ensure_future(synthesis)
+        self._segments[segment_id] = (task, time.monotonic())
+        while len(self._segments) > self.max_segments:
+            _, (old, _) = self._segments.popitem(last=False)
+            if not old.done():
+                old.cancel()
+        return segment_id, task
+
+    async def get(self, segment_id: str) -> Optional[Tuple[bytes, str]]:
+        """Audio of a segment (waits if it is still being synthesized); None if unknown"""
+        self._expire()
+        entry = self._segments.get(segment_id)
+        if entry is None:
+            return None
+        try:
+            return await asyncio.shield(entry[0])
+        except Exception as e:
+            logger.warning(f"Audio segment {segment_id} failed: {str(e)}")
+            return None
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._segments:
+            segment_id, (task, created_at) = next(iter(self._segments.items()))
+            if created_at >= cutoff:
+                break
+            del self._segments[segment_id]
+            if not task.done():
+                task.cancel()
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+
+# Global store of SSE audio segments (this worker)
+audio_segments = AudioSegmentStore()
@@ -0,0 +1,289 @@
+"""
+Offline Expert Directory
+Bundled directory of Krishi Vigyan Kendras (KVKs), district agriculture
+offices and national helplines with coordinates.
+
+- District / state lookup by English or local-language names
+- Grid-based spatial index for nearest-office queries
+- Incremental dataset versions (data/expert_directory/vNNN_*.json), each
+  holding "upserts" and "deletes", applied in version order
+
+Lets the expert connection agent answer with verified contacts without an
+LLM call.
+"""
+
+import os
+import re
+import json
+import math
+import logging
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Spatial grid cell size in degrees (~110 km at the equator)
+GRID_CELL_DEGREES = 1.0
+EARTH_RADIUS_KM = 6371.0
+
+# State names in local scripts mapped to the English dataset name
+STATE_ALIASES = {
+    "मध्य प्रदेश": "madhya pradesh", "mp": "madhya pradesh",
+    "राजस्थान": "rajasthan",
+    "उत्तर प्रदेश": "uttar pradesh", "up": "uttar pradesh",
+    "महाराष्ट्र": "maharashtra",
+    "गुजरात": "gujarat", "ગુજરાત": "gujarat",
+    "पंजाब": "punjab", "ਪੰਜਾਬ": "punjab",
+    "तेलंगाना": "telangana", "తెలంగాణ": "telangana",
+    "कर्नाटक": "karnataka", "ಕರ್ನಾಟಕ": "karnataka",
+    "तमिलनाडु": "tamil nadu", "தமிழ்நாடு": "tamil nadu",
+    "पश्चिम बंगाल": "west bengal", "পশ্চিমবঙ্গ": "west bengal",
+}
+
+VERSION_FILE_PATTERN = re.compile(r"^v(\d+)_.*\.json$")
+
+
+def _normalize(name: Optional[str]) -> str:
+    return re.sub(r"\s+", " ", (name or "").strip().lower())
+
+
+def _haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to many points"""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class ExpertDirectory:
+    """Versioned, spatially indexed directory of agricultural contacts"""
+
+    def __init__(self, data_dir: str = Config.EXPERT_DIRECTORY_DIR):
+        self.data_dir = data_dir
+        self.version = 0
+        self.entries: Dict[str, Dict] = {}
+
+        self._district_index: Dict[str, List[str]] = {}
+        self._state_index: Dict[str, List[str]] = {}
+        self._grid: Dict[Tuple[int, int], List[str]] = {}
+        self._helplines: List[str] = []
+
+        self.load()
+
+    def load(self):
+        """Apply every dataset version in data_dir newer than the current one"""
+        if not os.path.isdir(self.data_dir):
+            logger.warning(f"Expert directory data not found: {self.data_dir}")
+            return
+
+        versions = []
+        for name in os.listdir(self.data_dir):
+            match = VERSION_FILE_PATTERN.match(name)
+            if match:
+                versions.append((int(match.group(1)), os.path.join(self.data_dir, name)))
+
+        for _, path in sorted(versions):
+            self.apply_version(path, rebuild=False)
+        self._rebuild_indexes()
+
+    def apply_version(self, path: str, rebuild: bool = True) -> bool:
+        """
+        Apply one incremental dataset version
+
+        Args:
+            path: JSON file with "version", "upserts" and "deletes"
+            rebuild: Rebuild lookup indexes afterwards
+
+        Returns:
+            True if the version was applied
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading expert directory version {path}: {str(e)}")
+            return False
+
+        version = int(data.get("version", 0))
+        if version <= self.version:
+            logger.info(f"Skipping expert directory version {version} (current {self.version})")
+            return False
+
+        for entry_id in data.get("deletes", []):
+            self.entries.pop(entry_id, None)
+        for entry in data.get("upserts", []):
+            # Partial upserts only change the given fields
+            merged = dict(self.entries.get(entry["id"], {}))
+            merged.update(entry)
+            self.entries[entry["id"]] = merged
+
+        self.version = version
+        logger.info(f"✅ Expert directory version {version} applied ({len(self.entries)} entries)")
+
+        if rebuild:
+            self._rebuild_indexes()
+        return True
+
+    def _rebuild_indexes(self):
+        district_index: Dict[str, List[str]] = {}
+        state_index: Dict[str, List[str]] = {}
+        grid: Dict[Tuple[int, int], List[str]] = {}
+        helplines = []
+
+        for entry_id, entry in self.entries.items():
+            if entry.get("type") == "helpline":
+                helplines.append(entry_id)
+                continue
+
+            names = {_normalize(entry.get("district"))}
+            names.update(_normalize(alias) for alias in entry.get("district_aliases", []))
+            for name in names:
+                if name:
+                    district_index.setdefault(name, []).append(entry_id)
+
+            state = _normalize(entry.get("state"))
+            if state:
+                state_index.setdefault(state, []).append(entry_id)
+
+            if entry.get("latitude") is not None and entry.get("longitude") is not None:
+                grid.setdefault(self._cell(entry["latitude"], entry["longitude"]), []).append(entry_id)
+
+        self._district_index = district_index
+        self._state_index = state_index
+        self._grid = grid
+        self._helplines = sorted(helplines)
+
+    @staticmethod
+    def _cell(latitude: float, longitude: float) -> Tuple[int, int]:
+        return (int(math.floor(latitude / GRID_CELL_DEGREES)), int(math.floor(longitude / GRID_CELL_DEGREES)))
+
+    def _canonical_state(self, state: Optional[str]) -> str:
+        state = _normalize(state)
+        return STATE_ALIASES.get(state, state)
+
+    def find_by_district(self, district: Optional[str], state: Optional[str] = None) -> List[Dict]:
+        """
+        Get offices for a district (English or local-language name)
+
+        Args:
+            district: District or city name
+            state: State name to disambiguate (optional)
+
+        Returns:
+            List of directory entries
+        """
+        entry_ids = self._district_index.get(_normalize(district), [])
+        entries = [self.entries[entry_id] for entry_id in entry_ids]
+        canonical_state = self._canonical_state(state)
+        if canonical_state:
+            entries = [e for e in entries if _normalize(e.get("state")) == canonical_state] or entries
+        return entries
+
+    def find_by_state(self, state: Optional[str]) -> List[Dict]:
+        """Get all offices in a state"""
+        return [self.entries[entry_id] for entry_id in self._state_index.get(self._canonical_state(state), [])]
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 3,
+        entry_type: Optional[str] = None,
+        max_rings: int = 5
+    ) -> List[Dict]:
+        """
+        Get the k nearest offices using the grid index
+
+        Args:
+            latitude: Farmer latitude
+            longitude: Farmer longitude
+            k: Number of results
+            entry_type: Restrict to "kvk" or "district_office"
+            max_rings: How many grid rings to search outward
+
+        Returns:
+            Entries with a "distance_km" field, nearest first
+        """
+        center_lat, center_lon = self._cell(latitude, longitude)
+        candidates: List[str] = []
+        first_hit_ring = None
+
+        for ring in range(max_rings + 1):
+            for dlat in range(-ring, ring + 1):
+                for dlon in range(-ring, ring + 1):
+                    if max(abs(dlat), abs(dlon)) != ring:
+                        continue
+                    for entry_id in self._grid.get((center_lat + dlat, center_lon + dlon), []):
+                        if entry_type is None or self.entries[entry_id].get("type") == entry_type:
+                            candidates.append(entry_id)
+            # One extra ring after the ring with the first k hits, as a closer
+            # point may sit in it
+            if first_hit_ring is not None:
+                break
+            if len(candidates) >= k:
+                first_hit_ring = ring
+
+        if not candidates:
+            return []
+
+        lats = np.array([self.entries[c]["latitude"] for c in candidates], dtype=np.float64)
+        lons = np.array([self.entries[c]["longitude"] for c in candidates], dtype=np.float64)
+        distances = _haversine_km(latitude, longitude, lats, lons)
+
+        results = []
+        for i in np.argsort(distances)[:k]:
+            entry = dict(self.entries[candidates[i]])
+            entry["distance_km"] = round(float(distances[i]), 1)
+            results.append(entry)
+        return results
+
+    def helplines(self) -> List[Dict]:
+        """National helplines"""
+        return [self.entries[entry_id] for entry_id in self._helplines]
+
+    def lookup(self, location: Dict) -> List[Dict]:
+        """
+        Best offices for an agent-state location dict
+
+        Tries district, then city, then coordinates; returns [] if unknown.
+        """
+        for key in ("district", "city"):
+            entries = self.find_by_district(location.get(key), location.get("state"))
+            if entries:
+                return entries
+
+        if location.get("latitude") is not None and location.get("longitude") is not None:
+            nearest_kvk = self.nearest(location["latitude"], location["longitude"], k=1, entry_type="kvk")
+            if nearest_kvk:
+                return self.find_by_district(nearest_kvk[0]["district"], nearest_kvk[0]["state"]) or nearest_kvk
+        return []
+
+    def format_contacts(self, entries: List[Dict], language: str = "hindi") -> str:
+        """Render offices and helplines as a farmer-facing message"""
+        use_hindi = language == "hindi"
+        lines = ["👨‍🌾 **कृषि विशेषज्ञ संपर्क**" if use_hindi else "👨‍🌾 **Agricultural Expert Contacts**", ""]
+
+        lines.append("**📞 तत्काल सहायता:**" if use_hindi else "**📞 Helplines:**")
+        for helpline in self.helplines():
+            name = helpline.get("name_hindi") if use_hindi else helpline.get("name")
+            lines.append(f"• {name}: {helpline.get('phone')}")
+
+        if entries:
+            lines.append("")
+            lines.append("**🏛️ नजदीकी कार्यालय:**" if use_hindi else "**🏛️ Nearest Offices:**")
+            for entry in entries:
+                name = (entry.get("name_hindi") if use_hindi else "") or entry.get("name")
+                details = [entry.get("phone") or "", entry.get("website") or ""]
+                if entry.get("distance_km") is not None:
+                    details.append(f"{entry['distance_km']} km")
+                details = ", ".join(d for d in details if d)
+                lines.append(f"• {name}" + (f" ({details})" if details else ""))
+
+        return "\n".join(lines)
+
+
+# Global expert directory instance
+expert_directory = ExpertDirectory()
@@ -97,6 +97,11 @@ def init_sqlite_database(db_path='kisaan_assist.db'):
             eligibility TEXT,
             how_to_apply TEXT,
             state TEXT,
+            district TEXT,
+            min_land_acres REAL,
+            max_land_acres REAL,
+            eligible_crops TEXT,
+            farmer_categories TEXT,
             active INTEGER DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
@@ -162,6 +167,12 @@ def init_sqlite_database(db_path='kisaan_assist.db'):
         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
     """, sample_schemes)
     
+    # Structured eligibility rules used by scheme_eligibility.py
+    cursor.execute("""
+        UPDATE government_schemes SET min_land_acres = 0.01
+        WHERE scheme_name IN ('PM-KISAN', 'Kisan Credit Card')
+    """)
+    
     # Create indexes for better performance
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_farmers_phone ON farmers(phone_number)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_id ON voice_sessions(session_id)")
@@ -0,0 +1,300 @@
+"""
+Local Knowledge Retrieval Index
+Chunks the multilingual reference documents in knowledge/ (schemes, soil
+health, crop selection, crop diseases), embeds them with a multilingual
+sentence-transformer and stores the vectors as a NumPy matrix that is
+memory-mapped at runtime.
+
+Agents pull in only the top-k relevant passages instead of embedding the
+whole reference text in every prompt. When the index has not been built
+(or sentence-transformers is not installed) a lexical scorer over the same
+chunks is used, so answers stay grounded either way.
+
+Build offline:
+    python knowledge_index.py build
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import hashlib
+import logging
+from collections import Counter
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Tokens: word characters plus the Indic script blocks (Devanagari .. Malayalam),
+# so vowel signs don't split words
+TOKEN_PATTERN = re.compile(r"[\w\u0900-\u0DFF]+")
+DEVANAGARI_PATTERN = re.compile(r"[\u0900-\u097F]")
+
+MAX_CHUNK_CHARS = 800
+EMBEDDINGS_FILE = "embeddings.npy"
+CHUNKS_FILE = "chunks.json"
+
+
+def _tokenize(text: str) -> List[str]:
+    return [t.lower() for t in TOKEN_PATTERN.findall(text)]
+
+
+def _detect_language(text: str) -> str:
+    letters = sum(1 for ch in text if ch.isalpha())
+    devanagari = len(DEVANAGARI_PATTERN.findall(text))
+    return "hindi" if letters and devanagari / letters > 0.3 else "english"
+
+
+class KnowledgeIndex:
+    """Chunked reference documents with vector and lexical search"""
+
+    def __init__(
+        self,
+        docs_dir: str = Config.KNOWLEDGE_DIR,
+        index_dir: str = Config.KNOWLEDGE_INDEX_DIR,
+        model_name: str = Config.EMBEDDING_MODEL
+    ):
+        self.docs_dir = docs_dir
+        self.index_dir = index_dir
+        self.model_name = model_name
+
+        self.chunks: List[Dict] = []
+        self.embeddings: Optional[np.ndarray] = None
+        self._model = None
+        self._model_failed = False
+        self._topic_rows: Dict[str, np.ndarray] = {}
+        self._chunk_tokens: List[Counter] = []
+        self._idf: Dict[str, float] = {}
+        self._loaded = False
+
+    def _docs_fingerprint(self) -> str:
+        """Hash of the source documents, used to detect a stale index"""
+        digest = hashlib.sha1()
+        for name in sorted(os.listdir(self.docs_dir)):
+            if name.endswith((".md", ".txt")):
+                with open(os.path.join(self.docs_dir, name), "rb") as f:
+                    digest.update(name.encode("utf-8"))
+                    digest.update(f.read())
+        return digest.hexdigest()
+
+    def chunk_documents(self) -> List[Dict]:
+        """
+        Split every document into heading-scoped chunks
+
+        Returns:
+            List of chunk dicts (topic, title, text, language)
+        """
+        chunks = []
+        if not os.path.isdir(self.docs_dir):
+            logger.warning(f"Knowledge directory not found: {self.docs_dir}")
+            return chunks
+
+        for name in sorted(os.listdir(self.docs_dir)):
+            if not name.endswith((".md", ".txt")):
+                continue
+            topic = os.path.splitext(name)[0]
+            with open(os.path.join(self.docs_dir, name), encoding="utf-8") as f:
+                content = f.read()
+
+            # Split on level 2/3 headings; the heading travels with its body
+            sections = re.split(r"\n(?=#{2,3} )", content)
+            for section in sections:
+                section = section.strip()
+                if not section or section.startswith("# "):
+                    continue
+                title, _, body = section.partition("\n")
+                title = title.lstrip("#").strip()
+
+                pieces = [""]
+                for paragraph in re.split(r"\n\s*\n", body.strip()):
+                    if pieces[-1] and len(pieces[-1]) + len(paragraph) > MAX_CHUNK_CHARS:
+                        pieces.append("")
+                    pieces[-1] = f"{pieces[-1]}\n\n{paragraph}".strip()
+
+                for piece in pieces:
+                    text = f"{title}\n{piece}".strip()
+                    chunks.append({
+                        "id": len(chunks),
+                        "topic": topic,
+                        "title": title,
+                        "text": text,
+                        "language": _detect_language(text)
+                    })
+
+        return chunks
+
+    def _get_model(self):
+        """Lazily load the sentence-transformer model (optional dependency)"""
+        if self._model is None and not self._model_failed:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name, device="cpu")
+                logger.info(f"✅ Embedding model loaded: {self.model_name}")
+            except Exception as e:
+                logger.warning(f"Embedding model unavailable, using lexical retrieval: {str(e)}")
+                self._model_failed = True
+        return self._model
+
+    def build(self) -> Dict:
+        """
+        Chunk and embed all documents and write the index to index_dir
+
+        Returns:
+            Build summary
+        """
+        chunks = self.chunk_documents()
+        model = self._get_model()
+        if model is None:
+            raise RuntimeError("sentence-transformers is required to build the index")
+
+        vectors = model.encode(
+            [chunk["text"] for chunk in chunks],
+            batch_size=32,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ).astype(np.float32)
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        np.save(os.path.join(self.index_dir, EMBEDDINGS_FILE), vectors)
+        with open(os.path.join(self.index_dir, CHUNKS_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "model": self.model_name,
+                "fingerprint": self._docs_fingerprint(),
+                "chunks": chunks
+            }, f, ensure_ascii=False)
+
+        self._loaded = False
+        summary = {"chunks": len(chunks), "dimensions": int(vectors.shape[1]), "index_dir": self.index_dir}
+        logger.info(f"✅ Knowledge index built: {summary}")
+        return summary
+
+    def load(self):
+        """Load chunks and memory-map the embeddings if a fresh index exists"""
+        if self._loaded:
+            return
+
+        self.chunks = []
+        self.embeddings = None
+        chunks_path = os.path.join(self.index_dir, CHUNKS_FILE)
+        embeddings_path = os.path.join(self.index_dir, EMBEDDINGS_FILE)
+
+        if os.path.exists(chunks_path) and os.path.exists(embeddings_path):
+            try:
+                with open(chunks_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta.get("fingerprint") != self._docs_fingerprint():
+                    logger.warning("Knowledge index is stale, rebuild with: python knowledge_index.py build")
+                elif meta.get("model") != self.model_name:
+                    logger.warning(f"Knowledge index was built with {meta.get('model')}, not {self.model_name}")
+                else:
+                    self.chunks = meta["chunks"]
+                    self.embeddings = np.load(embeddings_path, mmap_mode="r")
+            except Exception as e:
+                logger.error(f"Error loading knowledge index: {str(e)}")
+
+        if not self.chunks:
+            self.chunks = self.chunk_documents()
+
+        topic_rows = {}
+        for chunk in self.chunks:
+            topic_rows.setdefault(chunk["topic"], []).append(chunk["id"])
+        self._topic_rows = {topic: np.array(rows) for topic, rows in topic_rows.items()}
+
+        # Lexical statistics for the fallback scorer
+        self._chunk_tokens = [Counter(_tokenize(chunk["text"])) for chunk in self.chunks]
+        doc_freq = Counter()
+        for tokens in self._chunk_tokens:
+            doc_freq.update(tokens.keys())
+        total = max(len(self.chunks), 1)
+        self._idf = {token: math.log(1 + total / df) for token, df in doc_freq.items()}
+
+        self._loaded = True
+        logger.info(f"Knowledge index ready: {len(self.chunks)} chunks, "
+                    f"{'vector' if self.embeddings is not None else 'lexical'} search")
+
+    def _lexical_scores(self, query: str, rows: np.ndarray) -> np.ndarray:
+        query_tokens = set(_tokenize(query))
+        scores = np.zeros(len(rows), dtype=np.float32)
+        for i, row in enumerate(rows):
+            tokens = self._chunk_tokens[row]
+            overlap = sum(self._idf.get(t, 0.0) for t in query_tokens if t in tokens)
+            scores[i] = overlap / math.sqrt(1 + sum(tokens.values()))
+        return scores
+
+    def search(
+        self,
+        query: str,
+        topic: Optional[str] = None,
+        k: int = 3,
+        language: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Get the top-k passages for a query
+
+        Args:
+            query: Farmer's question (any supported language)
+            topic: Restrict to one document (schemes, soil_health, ...)
+            k: Number of passages
+            language: Prefer passages in this language
+
+        Returns:
+            List of chunk dicts with a "score" field
+        """
+        self.load()
+        if not self.chunks or not query:
+            return []
+
+        if topic:
+            rows = self._topic_rows.get(topic)
+            if rows is None:
+                return []
+        else:
+            rows = np.arange(len(self.chunks))
+
+        model = self._get_model() if self.embeddings is not None else None
+        if model is not None:
+            query_vector = model.encode([query], normalize_embeddings=True)[0].astype(np.float32)
+            scores = np.asarray(self.embeddings[rows] @ query_vector)
+        else:
+            scores = self._lexical_scores(query, rows)
+
+        if language:
+            # Small boost so passages in the reply language win ties
+            boost = np.array([1.15 if self.chunks[r]["language"] == language else 1.0 for r in rows])
+            scores = scores * boost
+
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for i in top:
+            if scores[i] <= 0:
+                continue
+            chunk = dict(self.chunks[rows[i]])
+            chunk["score"] = float(scores[i])
+            results.append(chunk)
+        return results
+
+    def format_passages(self, passages: List[Dict]) -> str:
+        """Join passages into a prompt-ready reference block"""
+        return "\n\n".join(passage["text"] for passage in passages)
+
+
+# Global knowledge index instance
+knowledge_index = KnowledgeIndex()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        print(knowledge_index.build())
+    else:
+        query = " ".join(sys.argv[1:]) or "soil pH lime"
+        for passage in knowledge_index.search(query):
+            print(f"[{passage['topic']}] {passage['score']:.3f} {passage['title']}")
@@ -1,5 +1,5 @@
 import os
-from typing import List, TypedDict, Dict, Any
+from typing import List, TypedDict, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 from langchain_core.messages import SystemMessage, HumanMessage
 from langgraph.graph import StateGraph, END
@@ -16,6 +16,12 @@ load_dotenv()
 
 # Import after to avoid circular dependency
 from agriculture_apis import agriculture_api_service
+from pest_risk_engine import pest_risk_engine
+from scheme_eligibility import scheme_eligibility_engine
+from knowledge_index import knowledge_index
+from expert_directory import expert_directory
+from soil_health_store import soil_health_store
+from turn_manager import llm_call_tracker
 
 # Helper function to get current season
 def get_current_season():
@@ -110,13 +116,15 @@ class KisaanAgentState(TypedDict):
     image_urls: List[Dict[str, str]]  # Retrieved image URLs with metadata
     image_context: str  # Context for images (fertilizer_products, pesticide_products, disease_symptoms, etc.)
     layout_type: str  # UI layout type (split, full, chat-only)
+    farmer_id: Optional[int]  # Registered farmer for profile-based lookups
 
 # Initialize Gemini LLM
 llm = ChatGoogleGenerativeAI(
     model="gemini-2.5-flash-lite",
     temperature=0.01,
     google_api_key=os.getenv("GEMINI_API_KEY"),
-    model_kwargs={"seed": 42}
+    model_kwargs={"seed": 42},
+    callbacks=[llm_call_tracker]  # LLM time cancelled voice turns leave running
 )
 
 # Agent 1: Query Understanding Agent - IMPROVED
@@ -127,6 +135,11 @@ def query_understanding_agent(state: KisaanAgentState) -> KisaanAgentState:
     """
     logger.info("\n🔍 Query Understanding Agent running...")
     
+    # Already classified (speculatively, from a stable partial transcript)
+    if state.get("query_type"):
+        logger.info(f"✅ Query type pre-classified: {state['query_type']}")
+        return {}
+    
     user_query = state.get("user_query", "")
     language = state.get("language", "hindi")
     
@@ -165,7 +178,9 @@ JSON format:
         "symptom": "symptoms if mentioned or empty string",
         "location": "location if mentioned or empty string",
         "pest_name": "pest/disease name if mentioned or empty string",
-        "growth_stage": "growth stage if mentioned or empty string"
+        "growth_stage": "growth stage if mentioned or empty string",
+        "land_size_acres": "land holding in acres as a number if mentioned (convert bigha/hectare), else null",
+        "category": "farmer category if mentioned (marginal, small, medium, large, tenant, women, sc_st) or empty string"
     }},
     "confidence": "high|medium|low"
 }}
@@ -280,14 +295,14 @@ def weather_advisory_agent(state: KisaanAgentState) -> KisaanAgentState:
     language = state.get("language", "hindi")
     user_query = state.get("user_query", "")
     
-    # Fetch weather data synchronously using run_async_safe
-    weather_data = {}
+    # Fetch weather data synchronously using run_async_safe (unless prefetched)
+    weather_data = state.get("weather_data") or {}
     try:
-        if location.get("city"):
+        if not weather_data and location.get("city"):
             weather_data = run_async_safe(agriculture_api_service.get_current_weather(
                 city=location.get("city")
             ))
-        elif location.get("latitude") and location.get("longitude"):
+        elif not weather_data and location.get("latitude") and location.get("longitude"):
             weather_data = run_async_safe(agriculture_api_service.get_current_weather(
                 latitude=location["latitude"],
                 longitude=location["longitude"]
@@ -360,12 +375,19 @@ def crop_selection_agent(state: KisaanAgentState) -> KisaanAgentState:
     weather_data = state.get("weather_data", {})
     market_data = state.get("market_data", [])
     
+    passages = knowledge_index.search(
+        f"{user_query} {current_season}", topic="crop_selection", k=3, language=language
+    )
+    reference = knowledge_index.format_passages(passages)
+    
     prompt = f"""You are an experienced agricultural advisor helping a farmer choose the right crop.
 
 Farmer's Question: {user_query}
     
 Current Season: {current_season}
 Suitable crops for this season: {', '.join(seasonal_crops)}
+Reference:
+{reference if reference else "Not available"}
 Location: {location.get('city', 'Not specified')}, {location.get('state', 'India')}
 Language: {language}
     
@@ -405,6 +427,26 @@ Maximum 200 words for complete guidance.
             }
         }
 
+# Helper: district soil health card numbers for soil prompts
+def get_local_soil_data(location: Dict, language: str) -> Tuple[Dict, str]:
+    """
+    Fetch district soil health aggregates and a compact prompt text
+    
+    Returns:
+        (soil data dict, formatted text or "" when the district has no data)
+    """
+    district = location.get("district") or location.get("city")
+    if not district:
+        return {}, ""
+    try:
+        soil_data = run_async_safe(agriculture_api_service.get_soil_health_info(
+            district, location.get("state")
+        ))
+    except Exception as e:
+        logger.error(f"Soil health data error: {str(e)}")
+        return {}, ""
+    return soil_data, soil_health_store.format_summary(soil_data, language)
+
 # New Agent: Soil Management Agent - IMPROVED
 def soil_management_agent(state: KisaanAgentState) -> KisaanAgentState:
     """Provide soil health and fertilizer recommendations"""
@@ -418,8 +460,22 @@ def soil_management_agent(state: KisaanAgentState) -> KisaanAgentState:
     crop = entities.get("crop", "")
     user_query = state.get("user_query", "")
     location = state.get("location", {})
+    soil_data, local_soil = get_local_soil_data(location, language)
     
-    prompt = f"""You are a soil expert helping farmers improve their soil health and crop yields.
+    if local_soil:
+        # Real district numbers: a short prompt is enough
+        prompt = f"""You are a soil expert. Answer using the district soil test data below.
+
+Farmer's Question: {user_query}
+Crop mentioned: {crop if crop else "Not specified"}
+District soil health card data (median of {soil_data.get('samples')} samples, {location.get('district') or location.get('city')}):
+{local_soil}
+
+Correct the low / deficient nutrients first, with fertilizer quantities per acre,
+timing and organic options. Respond in {language}. Maximum 200 words.
+"""
+    else:
+        prompt = f"""You are a soil expert helping farmers improve their soil health and crop yields.
     
 Farmer's Question: {user_query}
 Crop mentioned: {crop if crop else "Not specified"}
@@ -454,7 +510,10 @@ Maximum 200 words for complete guidance.
     
     try:
         response = llm.invoke(messages)
-        return {"recommendations": [response.content]}
+        result = {"recommendations": [response.content]}
+        if local_soil:
+            result["soil_health_info"] = {"district_data": soil_data}
+        return result
     except Exception as e:
         logger.error(f"Soil management error: {str(e)}")
         return {}
@@ -577,14 +636,15 @@ Respond in {language}. Maximum 120 words.
             }
             return {"recommendations": [fallback.get(language, fallback["hindi"])]}
     
-    # Fetch market data synchronously
-    market_data = []
+    # Fetch market data synchronously (unless prefetched)
+    market_data = state.get("market_data") or []
     try:
-        market_data = run_async_safe(agriculture_api_service.get_commodity_prices(
-            commodity=commodity,
-            state=location.get("state"),
-            district=location.get("district")
-        ))
+        if not market_data:
+            market_data = run_async_safe(agriculture_api_service.get_commodity_prices(
+                commodity=commodity,
+                state=location.get("state"),
+                district=location.get("district")
+            ))
     except Exception as e:
         logger.error(f"Market fetch error: {str(e)}")
     
@@ -678,6 +738,59 @@ def government_schemes_agent(state: KisaanAgentState) -> KisaanAgentState:
     location = state.get("location", {})
     user_query = state.get("user_query", "")
     
+    # Rule-based eligibility over the government_schemes table
+    farmer_id = state.get("farmer_id")
+    matched_schemes = scheme_eligibility_engine.match(
+        farmer_id=farmer_id,
+        entities=state.get("parsed_entities", {}),
+        location=location,
+        language=language
+    )
+    
+    if matched_schemes:
+        scheme_lines = "\n".join(
+            f"- {s['name']}: {s['description']} | Eligibility: {s['eligibility']} | Apply: {s['how_to_apply']}"
+            for s in matched_schemes
+        )
+        # Only a registered profile is enough to call the farmer eligible;
+        # from the question alone the schemes may apply
+        if farmer_id:
+            scheme_heading = "Schemes this farmer is eligible for (from official records and the farmer's registered profile):"
+        else:
+            scheme_heading = "Schemes that may apply to this farmer (from official records; eligibility is not verified):"
+        prompt = f"""Farmer's Question: {user_query}
+
+{scheme_heading}
+{scheme_lines}
+
+Summarize only the schemes above that answer the question: benefit, eligibility and how to apply.
+Do not add schemes that are not listed.
+Respond in {language}. Maximum 150 words.
+"""
+        
+        messages = [
+            SystemMessage(content="You summarize government scheme records for farmers accurately and briefly."),
+            HumanMessage(content=prompt)
+        ]
+        
+        try:
+            response = llm.invoke(messages)
+            response_text = response.content
+        except Exception as e:
+            logger.error(f"Government schemes summary error: {str(e)}")
+            response_text = "\n\n".join(
+                f"**{s['name']}**\n• {s['description']}\n• {s['how_to_apply']}"
+                for s in matched_schemes
+            )
+        
+        return {
+            "recommendations": [response_text],
+            "government_schemes": matched_schemes
+        }
+    
+    passages = knowledge_index.search(user_query, topic="schemes", k=4, language=language)
+    reference = knowledge_index.format_passages(passages)
+    
     prompt = f"""You are a government schemes expert helping farmers access benefits and support.
     
 Farmer's Question: {user_query}
@@ -686,15 +799,8 @@ Language: {language}
     
 Provide COMPREHENSIVE, SPECIFIC, ACCURATE information about relevant government schemes (2024-2025).
     
-Major Schemes Available:
-1. **PM-Kisan Samman Nidhi**: ₹6000/year (₹2000 × 3 installments)
-2. **Pradhan Mantri Fasal Bima Yojana (PMFBY)**: 2% premium Kharif, 1.5% Rabi
-3. **Kisan Credit Card (KCC)**: Up to ₹3 lakh at 4% interest
-4. **PM-Kusum**: 90% subsidy on solar pumps
-5. **Soil Health Card Scheme**: Free soil testing
-6. **Paramparagat Krishi Vikas Yojana (PKVY)**: Organic farming support
-7. **National Agriculture Market (e-NAM)**: Online trading platform
-8. **Kisan Rail & Kisan Udaan**: Subsidized transport
+Scheme Reference:
+{reference if reference else "Not available"}
     
 For each relevant scheme mentioned in their question, provide:
     
@@ -972,6 +1078,14 @@ def pesticide_recommendation_agent(state: KisaanAgentState) -> KisaanAgentState:
     user_query = state.get("user_query", "")
     location = state.get("location", {})
     
+    # Precomputed weather-driven disease risk for the farmer's district
+    district_risk = pest_risk_engine.get_district_risk(
+        location.get("district") or location.get("city"),
+        location.get("state"),
+        crop
+    )
+    risk_summary = pest_risk_engine.format_risk_summary(district_risk, language)
+    
     prompt = f"""You are an expert entomologist and integrated pest management (IPM) specialist.
 
 Farmer's Question: {user_query}
@@ -979,6 +1093,7 @@ Crop: {crop if crop else "Not specified"}
 Pest/Disease: {pest_name if pest_name else "Not specified"}
 Symptoms: {symptom if symptom else "Not specified"}
 Location: {location.get('city', 'India')}
+Forecast Disease Risk (precomputed): {risk_summary if risk_summary else "No elevated risk"}
 Language: {language}
 
 Provide COMPREHENSIVE pest management guidance:
@@ -1072,7 +1187,8 @@ Maximum 280 words for thorough guidance.
             "pesticide_info": {
                 "recommendation": response.content,
                 "crop": crop,
-                "pest": pest_name
+                "pest": pest_name,
+                "district_risk": district_risk
             },
             "recommendations": [response.content],
             "requires_images": True,
@@ -1130,7 +1246,7 @@ Maximum 280 words for thorough guidance.
         }
         
         return {
-            "pesticide_info": {"fallback": True},
+            "pesticide_info": {"fallback": True, "district_risk": district_risk},
             "recommendations": [fallback.get(language, fallback["hindi"])]
         }
 
@@ -1772,209 +1888,28 @@ def soil_health_agent(state: KisaanAgentState) -> KisaanAgentState:
     user_query = state.get("user_query", "")
     location = state.get("location", {})
     
+    soil_data, local_soil = get_local_soil_data(location, language)
+    
+    # Only the relevant passages from the soil health reference; fewer are
+    # needed when real district numbers are available
+    passages = knowledge_index.search(user_query, topic="soil_health", k=2 if local_soil else 4, language=language)
+    reference = knowledge_index.format_passages(passages)
+    
     prompt = f"""You are a soil science expert and soil health specialist.
 
 Farmer's Question: {user_query}
 Location: {location.get('city', 'India')}, {location.get('state', 'India')}
 Language: {language}
 
-Provide COMPREHENSIVE soil health management guidance:
-
-**1. Soil Testing Importance & Process**
-
-**Why Test:**
-• Know exact nutrient levels (saves money on unnecessary fertilizers)
-• Identify deficiencies early
-• Optimize pH for crop
-• Track soil health over time
-
-**Where to Test:**
-• Govt Soil Testing Labs: FREE or ₹20-50/sample
-• Private labs: ₹200-500/sample (faster results)
-• Find nearest lab: soilhealth.dac.gov.in
-
-**How to Collect Sample:**
-1. **Timing:** Before sowing season
-2. **Tools:** Clean auger/spade, plastic bucket
-3. **Method:**
-   - Collect from 8-10 spots in zigzag pattern
-   - Depth: 0-6 inches (for most crops)
-   - Mix all samples thoroughly
-   - Take 500g sample in clean plastic bag
-4. **Submit:** To nearest soil testing lab with field details
-
-**Results Timeline:** 7-15 days
-
-**2. Understanding Soil Test Report**
-
-**Key Parameters:**
-
-**A) Soil pH:**
-• Ideal range: 6.0-7.5 for most crops
-• < 6.0 (Acidic): Add lime (CaCO₃) @ 200-500 kg/acre
-• > 8.0 (Alkaline): Add gypsum (CaSO₄) @ 200-400 kg/acre or sulfur
-
-**B) Organic Carbon (OC):**
-• Good: > 0.75%
-• Low: < 0.5% → Add FYM, compost, green manure
-
-**C) Macronutrients:**
-• **Nitrogen (N):** Low < 250 kg/ha → Apply urea
-• **Phosphorus (P):** Low < 12 kg/ha → Apply DAP/SSP
-• **Potassium (K):** Low < 120 kg/ha → Apply MOP/SOP
-
-**D) Micronutrients:**
-• **Zinc (Zn):** Low < 0.6 ppm → Zinc sulfate 25 kg/acre
-• **Iron (Fe):** Low < 4.5 ppm → Iron sulfate
-• **Boron (B):** Low < 0.5 ppm → Borax 10 kg/acre
-
-**3. Soil Health Improvement Strategies**
-
-**A) Organic Matter Addition (PRIORITY):**
+District soil health card data (median values):
+{local_soil if local_soil else "Not available"}
 
-**1. FYM (Farmyard Manure):**
-• Quantity: 5-10 tons/acre annually
-• Benefits: Improves structure, water retention, nutrients
-• Cost: ₹2,000-4,000/acre
-• Application: Before land preparation
-
-**2. Vermicompost:**
-• Quantity: 2-3 tons/acre
-• Benefits: Rich in microbes, better than FYM
-• Cost: ₹8,000-12,000/acre or make your own
-• DIY: 8x4x2 ft pit, kitchen waste + cow dung + earthworms
-
-**3. Green Manure:**
-• Crops: Dhaincha, sunhemp, cowpea
-• Method: Sow, let grow 40-50 days, plow back before flowering
-• Benefits: Adds 40-60 kg N/acre, improves structure
-• Cost: ₹500-800/acre (seeds only)
-
-**B) pH Management:**
-
-**For Acidic Soil (pH < 6.0):**
-• **Lime (CaCO₃):** 200-500 kg/acre
-  - Apply 30 days before sowing
-  - Mix into top 6 inches
-  - Cost: ₹1,500-3,000
-
-**For Alkaline Soil (pH > 8.0):**
-• **Gypsum:** 200-400 kg/acre
-• **Sulfur:** 50-100 kg/acre
-• **FYM:** Helps naturally lower pH
-• Cost: ₹1,000-2,500
-
-**C) Nutrient Deficiency Correction:**
-
-**Nitrogen Deficiency (Yellow leaves, stunted growth):**
-• **Quick fix:** Urea 50 kg/acre + irrigation
-• **Long-term:** FYM + legume rotation
-
-**Phosphorus Deficiency (Purple/dark leaves):**
-• **Application:** DAP 50-100 kg/acre or SSP 150-200 kg/acre
-• **With FYM for better availability**
-
-**Potassium Deficiency (Leaf edge burning):**
-• **Application:** MOP 25-50 kg/acre
-• **Wood ash:** Good organic source (50-100 kg/acre)
-
-**Zinc Deficiency (White/yellow bands between veins):**
-• **Soil application:** Zinc sulfate 25 kg/acre
-• **Foliar spray:** 0.5% ZnSO₄ solution (500g per 100L water)
-
-**4. Soil Structure Improvement**
-
-**For Clay Soil (Heavy, waterlogged):**
-• Add FYM: 8-10 tons/acre
-• Gypsum: 400 kg/acre
-• Deep plowing in summer
-• Raised bed cultivation
-
-**For Sandy Soil (Light, low water retention):**
-• FYM: 10-15 tons/acre (higher amount)
-• Mulching: Retains moisture
-• Clay addition if feasible
-• Frequent but light irrigation
-
-**5. Soil Conservation Practices**
-
-• **Contour plowing:** On slopes to prevent erosion
-• **Mulching:** Crop residue, straw (prevents crusting)
-• **Crop rotation:** Legume → Cereal → Oilseed
-• **Cover crops:** In off-season prevents nutrient loss
-• **Avoid burning residue:** Destroys soil microbes
+Reference (soil health knowledge base):
+{reference if reference else "Not available"}
 
-**6. Soil Biological Health**
-
-**Beneficial Microbes:**
-• **Rhizobium:** For legumes (fixes N)
-• **Azotobacter:** Free-living N fixer
-• **PSB (Phosphate Solubilizing Bacteria):** Makes P available
-• **Trichoderma:** Controls soil-borne diseases
-
-**Application:** Mix with FYM or apply with seeds
-**Cost:** ₹50-100/packet (200g)
-
-**7. Season-wise Soil Care**
-
-**Summer (Apr-May):**
-• Deep plowing (exposes pests/diseases to sun)
-• Add FYM before monsoon
-• pH correction if needed
-
-**Monsoon (Jun-Sep):**
-• Control erosion
-• Proper drainage
-• Green manure crops
-
-**Winter (Oct-Mar):**
-• Crop rotation planning
-• Soil sampling (best time)
-
-**8. Cost-Benefit of Soil Health Investment**
-
-**Annual Investment:**
-• FYM: ₹3,000/acre
-• Soil testing: ₹50/acre
-• pH correction (if needed): ₹2,000/acre (one-time every 3-4 years)
-• Bio-fertilizers: ₹200/acre
-**Total: ₹3,250-5,250/acre**
-
-**Returns:**
-• 20-40% yield increase
-• 30% fertilizer saving over 2-3 years
-• Better soil structure & water retention
-• Disease reduction
-**ROI: ₹5-10 return per ₹1 invested**
-
-**9. Soil Health Card Scheme**
-
-**What:** Free soil testing by government
-**Benefits:**
-• Nutrient status report
-• Crop-specific fertilizer recommendations
-• Issued every 2 years
-
-**How to Get:**
-• Contact village agriculture officer
-• Or register: soilhealth.dac.gov.in
-• Sample collected from your field
-• Report within 15-30 days
-
-**10. Warning Signs of Poor Soil Health**
-
-⚠️ **Take Action If:**
-• Crops grow poorly despite fertilizers
-• Waterlogging or excessive drying
-• Soil crust formation
-• Increased pest/disease problems
-• Yield declining year-on-year
-
-**Immediate Steps:**
-1. Get soil tested
-2. Add FYM (minimum 5 tons/acre)
-3. Stop excessive chemical use
-4. Plant green manure crop
+Provide COMPREHENSIVE soil health management guidance grounded in the reference above:
+testing, interpreting results, improvement strategies, costs and warning signs
+relevant to the question.
 
 Be EXTREMELY DETAILED and SPECIFIC with all recommendations.
 Use real numbers, costs, and practical examples.
@@ -1991,7 +1926,8 @@ Maximum 450 words for comprehensive soil health guidance.
         response = llm.invoke(messages)
         return {
             "soil_health_info": {
-                "analysis": response.content
+                "analysis": response.content,
+                "district_data": soil_data if local_soil else {}
             },
             "recommendations": [response.content]
         }
@@ -2304,12 +2240,22 @@ def emergency_response_agent(state: KisaanAgentState) -> KisaanAgentState:
     user_query = state.get("user_query", "")
     location = state.get("location", {})
     
+    # Precomputed weather-driven disease risk for the farmer's district
+    district_risk = pest_risk_engine.get_district_risk(
+        location.get("district") or location.get("city"),
+        location.get("state"),
+        crop
+    )
+    risk_summary = pest_risk_engine.format_risk_summary(district_risk, language)
+    severity = district_risk[0]["severity"] if district_risk else "high"
+    
     prompt = f"""You are an agricultural emergency response specialist handling URGENT farming issues.
 
 🚨 EMERGENCY: {user_query}
 Crop: {crop if crop else "Not specified"}
 Symptoms: {symptom if symptom else "Not specified"}
 Location: {location.get('city', 'India')}
+Forecast Disease Risk (precomputed): {risk_summary if risk_summary else "No elevated risk"}
 Language: {language}
 
 This is an EMERGENCY. Provide IMMEDIATE, ACTIONABLE response with:
@@ -2336,8 +2282,9 @@ Maximum 350 words for emergency guidance.
         return {
             "emergency_info": {
                 "response": response.content,
-                "severity": "high",
-                "urgent": True
+                "severity": severity,
+                "urgent": True,
+                "district_risk": district_risk
             },
             "recommendations": [response.content]
         }
@@ -2378,9 +2325,13 @@ Check every 4-6 hours
 ⚠️ Don't Delay - Every Hour Counts!"""
         }
         
+        response_text = fallback.get(language, fallback["hindi"])
+        if risk_summary:
+            response_text = f"{response_text}\n\n**⚠️ {'मौसम आधारित रोग जोखिम' if language == 'hindi' else 'Forecast Disease Risk'}:**\n{risk_summary}"
+        
         return {
-            "emergency_info": {"fallback": True, "urgent": True},
-            "recommendations": [fallback.get(language, fallback["hindi"])]
+            "emergency_info": {"fallback": True, "urgent": True, "district_risk": district_risk},
+            "recommendations": [response_text]
         }
 
 # Agent 16: Local Expert Connection Agent
@@ -2395,6 +2346,21 @@ def expert_connection_agent(state: KisaanAgentState) -> KisaanAgentState:
     user_query = state.get("user_query", "")
     location = state.get("location", {})
     
+    # Known district / coordinates: answer straight from the offline directory
+    # (helplines plus the offices with their phone / website and distance)
+    offices = expert_directory.lookup(location)
+    if offices:
+        contacts = expert_directory.format_contacts(offices, language)
+        return {
+            "expert_contact_info": {
+                "resources": contacts,
+                "offices": offices,
+                "location": location.get('district', location.get('city', 'India')),
+                "directory_version": expert_directory.version
+            },
+            "recommendations": [contacts]
+        }
+    
     prompt = f"""You are a local agricultural resource connector helping farmers access expert help.
 
 Farmer's Request: {user_query}
@@ -2433,6 +2399,18 @@ Maximum 350 words for comprehensive expert connection guide.
     except Exception as e:
         logger.error(f"Expert connection error: {str(e)}")
         
+        # Offices elsewhere in the farmer's state, else the KVK portal
+        state_offices = [
+            office for office in expert_directory.find_by_state(location.get('state'))
+            if office.get("type") == "kvk"
+        ][:3]
+        state_offices_hindi = "\n".join(
+            f"• {office.get('name_hindi') or office['name']}: {office.get('website', '')}" for office in state_offices
+        ) or "KVK सूची: kvk.icar.gov.in"
+        state_offices_english = "\n".join(
+            f"• {office['name']}: {office.get('website', '')}" for office in state_offices
+        ) or "KVK directory: kvk.icar.gov.in"
+        
         fallback = {
             "hindi": f"""👨‍🌾 **कृषि विशेषज्ञ संपर्क**
 
@@ -2454,7 +2432,7 @@ Maximum 350 words for comprehensive expert connection guide.
 3. पहले हेल्पलाइन कॉल करें
 4. KVK विजिट करें
 
-Google: "{location.get('district', 'आपका जिला')} KVK contact"
+{state_offices_hindi}
 या farmer.gov.in""",
             
             "english": f"""👨‍🌾 **Agricultural Expert Contacts**
@@ -2477,7 +2455,7 @@ Kisan Call Center: 1800-180-1551
 3. Call helpline first
 4. Visit KVK
 
-Google: "{location.get('district', 'your district')} KVK contact"
+{state_offices_english}
 Or farmer.gov.in"""
         }
         
@@ -0,0 +1,187 @@
+"""
+Offline CPU Speech-to-Text
+Local Whisper transcription for kiosks without connectivity, and for short
+utterances that are quicker to transcribe here than to upload.
+
+Backends, in order of preference:
+    faster-whisper  (pip install faster-whisper) - the model is loaded once
+                    per worker in the pool initializer
+    whisper.cpp     (WHISPER_CPP_PATH binary + ggml model file)
+
+Transcription runs in a process pool sized to the available cores; each
+worker gets an equal share of CPU threads. The session language is passed
+to Whisper as a hint, which skips language detection.
+"""
+
+import os
+import shutil
+import asyncio
+import logging
+import tempfile
+import subprocess
+import multiprocessing
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+from config import Config
+from audio_transcoder import pcm_to_wav, SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Whisper language codes per supported language
+WHISPER_LANGUAGES = {
+    'hindi': 'hi',
+    'english': 'en',
+    'punjabi': 'pa',
+    'marathi': 'mr',
+    'gujarati': 'gu',
+    'tamil': 'ta',
+    'telugu': 'te',
+    'kannada': 'kn',
+    'bengali': 'bn'
+}
+
+# faster-whisper model loaded in this worker process (set by _init_worker)
+_worker_model = None
+
+
+def _init_worker(model_name: Optional[str], threads: int):
+    """Process pool initializer: load the faster-whisper model once per worker"""
+    global _worker_model
+    if not model_name:
+        return
+    try:
+        from faster_whisper import WhisperModel
+        _worker_model = WhisperModel(model_name, device="cpu", compute_type="int8", cpu_threads=threads)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load Whisper model {model_name}: {str(e)}")
+
+
+def _transcribe_in_worker(
+    samples: np.ndarray,
+    language_code: str,
+    cli_path: str,
+    cli_model: str,
+    threads: int
+) -> str:
+    """Transcribe 16 kHz int16 PCM in a pool worker"""
+    if _worker_model is not None:
+        segments, _ = _worker_model.transcribe(
+            samples.astype(np.float32) / 32768.0,
+            language=language_code,
+            beam_size=1,
+            condition_on_previous_text=False
+        )
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+    with tempfile.NamedTemporaryFile(suffix=".wav") as wav_file:
+        wav_file.write(pcm_to_wav(samples))
+        wav_file.flush()
+        result = subprocess.run(
+            [cli_path, "-m", cli_model, "-l", language_code, "-t", str(threads), "-nt", "-np", "-f", wav_file.name],
+            capture_output=True,
+            timeout=120
+        )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", errors="ignore")[:200])
+    return " ".join(result.stdout.decode("utf-8", errors="ignore").split())
+
+
+class LocalSTTEngine:
+    """Process-pool backed offline Whisper transcription"""
+
+    def __init__(
+        self,
+        model_name: str = Config.LOCAL_STT_MODEL,
+        cli_path: str = Config.WHISPER_CPP_PATH,
+        cli_model: str = Config.WHISPER_CPP_MODEL,
+        workers: int = Config.LOCAL_STT_WORKERS
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self.cli_path = cli_path
+        self.cli_model = cli_model
+
+        if importlib.util.find_spec("faster_whisper") is not None:
+            self.backend = "faster-whisper"
+            self.model_name = model_name
+        elif shutil.which(cli_path) and os.path.exists(cli_model):
+            self.backend = "whisper.cpp"
+            self.model_name = None
+        else:
+            self.backend = None
+            self.model_name = None
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {"requests": 0, "failures": 0, "audio_seconds": 0.0, "busy_ms": 0.0}
+
+        if self.backend:
+            logger.info(f"✅ Local STT: {self.backend} ({self.workers} workers x {self.threads} threads)")
+
+    @property
+    def available(self) -> bool:
+        return self.backend is not None
+
+    def start(self):
+        """Create the worker pool (workers load the model on start)"""
+        if self._pool is None:
+            # Spawned (not forked) workers: no inherited sockets or event loop state
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.threads)
+            )
+
+    async def warm_up(self):
+        """Start every worker and transcribe a short silence in each"""
+        if not self.available:
+            return
+        self.start()
+        silence = np.zeros(SAMPLE_RATE // 2, dtype=np.int16)
+        await asyncio.gather(*(self.transcribe(silence, "english") for _ in range(self.workers)))
+        logger.info(f"✅ Local STT warmed ({self.workers} workers)")
+
+    async def transcribe(self, samples: np.ndarray, language: str = "hindi") -> str:
+        """
+        Transcribe 16 kHz mono int16 PCM on a pool worker
+
+        Args:
+            samples: Speech samples (already VAD-trimmed)
+            language: Session language, used as the Whisper language hint
+
+        Returns:
+            Transcript text
+        """
+        if not self.available:
+            raise RuntimeError("No local STT backend available")
+        self.start()
+        self.stats["requests"] += 1
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            text = await loop.run_in_executor(
+                self._pool, _transcribe_in_worker,
+                samples, WHISPER_LANGUAGES.get(language, 'hi'), self.cli_path, self.cli_model, self.threads
+            )
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        self.stats["audio_seconds"] += len(samples) / SAMPLE_RATE
+        self.stats["busy_ms"] += (loop.time() - started) * 1000
+        return text
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "backend": self.backend, "workers": self.workers}
+
+
+# Global local STT engine instance
+local_stt = LocalSTTEngine()
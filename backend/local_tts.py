@@ -0,0 +1,208 @@
+"""
+Offline CPU Text-to-Speech
+Local TTS for kiosks that lose connectivity. Piper neural voices are used
+where a model exists for the language (Hindi, English, Telugu, ...), and
+espeak-ng formant voices cover every other SUPPORTED_LANGUAGES entry.
+
+Synthesis runs in a process pool so a long answer never holds the GIL or
+the event loop. Each worker loads its Piper models once, in the pool
+initializer, and warm_up() starts the workers before the first request.
+
+Piper models: PIPER_VOICES_DIR/<locale>-<name>-<quality>.onnx (+ .onnx.json),
+e.g. hi_IN-pratham-medium.onnx from https://huggingface.co/rhasspy/piper-voices
+"""
+
+import io
+import os
+import wave
+import shutil
+import asyncio
+import logging
+import subprocess
+import multiprocessing
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# espeak-ng voice per supported language
+ESPEAK_VOICES = {
+    'hindi': 'hi',
+    'english': 'en-us',
+    'punjabi': 'pa',
+    'marathi': 'mr',
+    'gujarati': 'gu',
+    'tamil': 'ta',
+    'telugu': 'te',
+    'kannada': 'kn',
+    'bengali': 'bn'
+}
+
+# Piper model filename prefixes per supported language
+PIPER_LOCALES = {
+    'hindi': 'hi_IN',
+    'english': 'en_',
+    'punjabi': 'pa_IN',
+    'marathi': 'mr_IN',
+    'gujarati': 'gu_IN',
+    'tamil': 'ta_IN',
+    'telugu': 'te_IN',
+    'kannada': 'kn_IN',
+    'bengali': 'bn_'
+}
+
+# Piper voices loaded in this worker process (filled by _init_worker)
+_worker_voices: Dict[str, object] = {}
+
+
+def _init_worker(piper_models: Dict[str, str]):
+    """Process pool initializer: load Piper voices once per worker"""
+    if not piper_models:
+        return
+    try:
+        from piper import PiperVoice
+    except ImportError:
+        logger.warning("piper-tts not installed. Install: pip install piper-tts")
+        return
+
+    for language, model_path in piper_models.items():
+        try:
+            _worker_voices[language] = PiperVoice.load(model_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load Piper voice {model_path}: {str(e)}")
+
+
+def _synthesize_in_worker(text: str, language: str, espeak_path: str, espeak_voice: Optional[str], rate: int) -> bytes:
+    """Synthesize to WAV bytes in a pool worker (Piper if loaded, else espeak-ng)"""
+    voice = _worker_voices.get(language)
+    if voice is not None:
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            # piper-tts >= 1.3 renamed synthesize(text, wav) to synthesize_wav
+            synthesize_wav = getattr(voice, "synthesize_wav", None) or voice.synthesize
+            synthesize_wav(text, wav_file)
+        return buffer.getvalue()
+
+    if espeak_voice is None:
+        return b""
+    result = subprocess.run(
+        [espeak_path, "-v", espeak_voice, "-s", str(rate), "--stdout", "--stdin"],
+        input=text.encode("utf-8"),
+        capture_output=True,
+        timeout=60
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", errors="ignore")[:200])
+    return result.stdout
+
+
+class LocalTTSEngine:
+    """Process-pool backed offline TTS (Piper / espeak-ng), WAV output"""
+
+    media_type = "audio/wav"
+
+    def __init__(
+        self,
+        voices_dir: str = Config.PIPER_VOICES_DIR,
+        espeak_path: str = Config.ESPEAK_PATH,
+        workers: int = Config.LOCAL_TTS_WORKERS,
+        rate: int = Config.LOCAL_TTS_RATE
+    ):
+        self.espeak_path = espeak_path
+        self.workers = workers
+        self.rate = rate
+        self.espeak_available = shutil.which(espeak_path) is not None
+        self.piper_models = self._find_piper_models(voices_dir) if importlib.util.find_spec("piper") else {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {"requests": 0, "failures": 0, "bytes": 0}
+
+        if self.available:
+            logger.info(f"✅ Local TTS: piper={sorted(self.piper_models)} espeak-ng={self.espeak_available}")
+
+    @staticmethod
+    def _find_piper_models(voices_dir: str) -> Dict[str, str]:
+        if not os.path.isdir(voices_dir):
+            return {}
+        models = {}
+        for filename in sorted(os.listdir(voices_dir)):
+            if not filename.endswith(".onnx"):
+                continue
+            for language, prefix in PIPER_LOCALES.items():
+                if filename.startswith(prefix) and language not in models:
+                    models[language] = os.path.join(voices_dir, filename)
+        return models
+
+    @property
+    def available(self) -> bool:
+        return bool(self.piper_models) or self.espeak_available
+
+    def engine_for(self, language: str) -> Optional[str]:
+        """'piper', 'espeak-ng' or None if the language has no local voice"""
+        if language in self.piper_models:
+            return "piper"
+        if self.espeak_available and language in ESPEAK_VOICES:
+            return "espeak-ng"
+        return None
+
+    def start(self):
+        """Create the worker pool (workers load their Piper models on start)"""
+        if self._pool is None:
+            # Spawned (not forked) workers: no inherited sockets or event loop state
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.piper_models,)
+            )
+
+    async def warm_up(self):
+        """Start every worker and run one short synthesis in each"""
+        if not self.available:
+            return
+        self.start()
+        language = next(iter(self.piper_models), "english")
+        await asyncio.gather(*(self.synthesize("ready", language) for _ in range(self.workers)))
+        logger.info(f"✅ Local TTS warmed ({self.workers} workers)")
+
+    async def synthesize(self, text: str, language: str = "hindi") -> bytes:
+        """
+        Synthesize text on a pool worker
+
+        Returns:
+            WAV bytes, empty if the language has no local voice
+        """
+        if self.engine_for(language) is None:
+            return b""
+        self.start()
+        self.stats["requests"] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            audio = await loop.run_in_executor(
+                self._pool, _synthesize_in_worker,
+                text, language, self.espeak_path, ESPEAK_VOICES.get(language), self.rate
+            )
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        self.stats["bytes"] += len(audio)
+        return audio
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "piper_languages": sorted(self.piper_models),
+            "espeak_available": self.espeak_available
+        }
+
+
+# Global local TTS engine instance
+local_tts = LocalTTSEngine()
@@ -1,6 +1,6 @@
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Header, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 import logging
 import uuid
@@ -10,24 +10,39 @@ from config import Config
 from db import get_db_connection
 from models import (
     VoiceQueryRequest, VoiceResponse, LanguageSelectionRequest,
-    FarmerProfile, CropInformation, SessionData
+    FarmerProfile, CropInformation, SessionData, BroadcastRequest
 )
 from voice_service import voice_service
-from realtime_voice_service import realtime_voice_service
+from realtime_voice_service import realtime_sessions
+from transcript_coalescer import TranscriptCoalescer, get_caption_stats
+from speculative_agent import SpeculativeRunner, get_speculation_stats
+from turn_manager import TurnManager, get_turn_stats
+from audio_ring_buffer import AudioSender, get_buffer_stats
+from session_resumption import resumable_sessions
+from broadcast_hub import broadcast_hub
+from event_stream import SSE_HEADERS, audio_segments, sse_event, split_sentences
+from session_store import SessionStore
+from pest_risk_engine import pest_risk_engine
 from langgraph_kisaan_agents import build_kisaan_graph
 from crop_disease_camera import CropDiseaseCamera
 from avatar_service import avatar_service
-from typing import Dict
+from binary_transport import (
+    PROTOCOL_V1, PROTOCOL_V2, parse_voice_upload, multipart_mixed_response, multipart_mixed_stream
+)
+from audio_profiles import AUDIO_PROFILES, select_profile
+from typing import AsyncIterator, Dict, Optional
 import re
+import hmac
 import json
 import base64
+import asyncio
 
 app = FastAPI(title="Kisan Voice Assistant API")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# In-memory session storage (use Redis in production)
-active_sessions: Dict[str, SessionData] = {}
+# In-memory session storage with idle TTL and size caps (use Redis in production)
+active_sessions = SessionStore()
 
 # Initialize camera-based disease detector
 disease_camera = CropDiseaseCamera()
@@ -44,6 +59,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def startup():
+    """Warm up pooled TTS and realtime transcription connections, start the session sweepers and the daily pest risk batch"""
+    await voice_service.warm_up()
+    await realtime_sessions.warm_up()
+    active_sessions.start_sweeper()
+    resumable_sessions.start_sweeper()
+    pest_risk_engine.start_scheduler()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release shared HTTP sessions and realtime connections"""
+    await pest_risk_engine.stop_scheduler()
+    await active_sessions.stop_sweeper()
+    await resumable_sessions.stop_sweeper()
+    await realtime_sessions.close()
+    await voice_service.close()
+
 @app.get("/")
 async def root():
     return {"message": "नमस्ते! Welcome to Kisan Voice Assistant API 🌾"}
@@ -214,42 +247,60 @@ async def detect_language(request: VoiceQueryRequest):
         })
 
 
-@app.post("/voice/query", response_model=VoiceResponse)
-async def process_voice_query(request: VoiceQueryRequest):
-    """
-    Main endpoint for processing voice queries from farmers
-    """
-    session_id = request.session_id or str(uuid.uuid4())
-    
-    # Get or create session
+def get_or_create_session(session_id: str, language: str) -> SessionData:
+    """Get an active session, creating it if needed"""
     if session_id not in active_sessions:
         active_sessions[session_id] = SessionData(
             session_id=session_id,
-            language=request.language or Config.DEFAULT_LANGUAGE,
+            language=language or Config.DEFAULT_LANGUAGE,
             conversation_history=[],
             last_activity=datetime.now().isoformat()
         )
+    return active_sessions[session_id]
+
+
+async def run_voice_turn(session: SessionData, transcribed_text: str) -> Dict:
+    """
+    Run one voice turn on already transcribed text (shared by v1 and v2)
     
-    session = active_sessions[session_id]
+    Handles the empty transcript retry, language selection and the agent
+    graph, and updates the conversation history. Audio is left to the
+    caller so each protocol can encode it its own way.
     
-    # Transcribe audio to text
-    transcribed_text = await voice_service.transcribe_audio(
-        request.audio_base64, 
-        request.language or session.language
-    )
+    Returns:
+        Dict with text_response, language, user_text, requires_camera,
+        additional_info and kind ("retry", "language_selected" or "answer")
+    """
+    early = early_voice_turn(session, transcribed_text)
+    if early:
+        return early
     
-    logger.info(f"Transcribed: {transcribed_text}")
+    # Build and run agent graph
+    graph = build_kisaan_graph()
+    initial_state = voice_turn_state(session, transcribed_text)
     
+    # Run the agent workflow
+    try:
+        final_state = graph.invoke(initial_state)
+    except Exception as e:
+        logger.error(f"Agent workflow error: {str(e)}")
+        final_state = None
+    
+    return record_voice_turn(session, transcribed_text, final_state)
+
+
+def early_voice_turn(session: SessionData, transcribed_text: str) -> Optional[Dict]:
+    """Retry prompt or language confirmation when the transcript is not a question, else None"""
     if not transcribed_text:
         error_msg = "मुझे आपकी आवाज़ सुनाई नहीं दी। कृपया फिर से बोलें।" if session.language == "hindi" else "I couldn't hear you. Please speak again."
-        error_audio = await voice_service.text_to_speech(error_msg, session.language)
-        return VoiceResponse(
-            text_response=error_msg,
-            audio_base64=error_audio,
-            language=session.language,
-            session_id=session_id,
-            user_text=""
-        )
+        return {
+            "kind": "retry",
+            "text_response": error_msg,
+            "language": session.language,
+            "user_text": "",
+            "requires_camera": False,
+            "additional_info": None
+        }
     
     # Detect language selection
     detected_lang = voice_service.detect_language_from_speech(transcribed_text)
@@ -260,26 +311,26 @@ async def process_voice_query(request: VoiceQueryRequest):
             'english': "Great! You can now ask me any questions about farming.",
             'punjabi': "ਬਹੁਤ ਵਧੀਆ! ਤੁਸੀਂ ਹੁਣ ਮੈਨੂੰ ਖੇਤੀ ਬਾਰੇ ਕੋਈ ਵੀ ਸਵਾਲ ਪੁੱਛ ਸਕਦੇ ਹੋ।"
         }
-        confirmation_text = confirmation_messages.get(detected_lang, confirmation_messages['hindi'])
-        confirmation_audio = await voice_service.text_to_speech(confirmation_text, detected_lang)
-        
-        return VoiceResponse(
-            text_response=confirmation_text,
-            audio_base64=confirmation_audio,
-            language=detected_lang,
-            session_id=session_id
-        )
-    
+        return {
+            "kind": "language_selected",
+            "text_response": confirmation_messages.get(detected_lang, confirmation_messages['hindi']),
+            "language": detected_lang,
+            "user_text": "",
+            "requires_camera": False,
+            "additional_info": None
+        }
+    return None
+
+
+def voice_turn_state(session: SessionData, transcribed_text: str) -> Dict:
+    """Agent graph input for a transcribed question"""
     # Extract location from conversation if available
     location = session.location or extract_location_from_text(transcribed_text)
     if location:
         session.location = location
     
-    # Build and run agent graph
-    graph = build_kisaan_graph()
-    
     # Prepare state for agents
-    initial_state = {
+    return {
         "user_query": transcribed_text,
         "language": session.language,
         "location": location or {"city": "Indore", "state": "Madhya Pradesh"},  # Default fallback
@@ -291,28 +342,20 @@ async def process_voice_query(request: VoiceQueryRequest):
         "government_schemes": [],
         "pest_disease_info": {},
         "recommendations": [],
-        "final_response": ""
+        "final_response": "",
+        "farmer_id": session.farmer_id
     }
-    
-    # Run the agent workflow
-    try:
-        final_state = graph.invoke(initial_state)
-        response_text = final_state.get("final_response", "मुझे खेद है, मैं आपकी मदद नहीं कर सका।")
-        requires_camera = final_state.get("requires_camera", False)
-    except Exception as e:
-        logger.error(f"Agent workflow error: {str(e)}")
+
+
+def record_voice_turn(session: SessionData, transcribed_text: str, final_state: Optional[Dict]) -> Dict:
+    """Answer of a graph run (None if it failed), added to the conversation history"""
+    if final_state is None:
+        final_state = {}
         response_text = "मुझे खेद है, कुछ गलत हो गया। कृपया फिर से प्रयास करें।" if session.language == "hindi" else "Sorry, something went wrong. Please try again."
         requires_camera = False
-    
-    # Convert response to speech
-    response_audio = await voice_service.text_to_speech(response_text, session.language)
-    
-    # Generate avatar response with additional info
-    avatar_response = await avatar_service.generate_avatar_response(
-        text=response_text,
-        audio_base64=response_audio,
-        language=session.language
-    )
+    else:
+        response_text = final_state.get("final_response", "मुझे खेद है, मैं आपकी मदद नहीं कर सका।")
+        requires_camera = final_state.get("requires_camera", False)
     
     # Extract additional info for display panel
     additional_info = avatar_service.extract_additional_info(final_state)
@@ -326,19 +369,258 @@ async def process_voice_query(request: VoiceQueryRequest):
     })
     session.last_activity = datetime.now().isoformat()
     
-    response_data = {
+    return {
+        "kind": "answer",
         "text_response": response_text,
-        "audio_base64": avatar_response.get("audio_base64", response_audio),
         "language": session.language,
-        "session_id": session_id,
         "user_text": transcribed_text,
         "requires_camera": requires_camera,
-        "avatar_data": avatar_response,
         "additional_info": additional_info
     }
+
+
+def negotiate_audio_profile(session: SessionData, requested: str = None, headers: Dict = None) -> str:
+    """Pick the response audio profile and remember an explicit choice on the session"""
+    if requested in AUDIO_PROFILES:
+        session.audio_profile = requested
+    return select_profile(requested, session.audio_profile, headers)
+
+
+@app.post("/voice/query", response_model=VoiceResponse)
+async def process_voice_query(request: VoiceQueryRequest, http_request: Request):
+    """
+    Main endpoint for processing voice queries from farmers
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+    session = get_or_create_session(session_id, request.language)
+    audio_profile = negotiate_audio_profile(session, request.audio_profile, http_request.headers)
+    
+    # Transcribe audio to text
+    transcribed_text = await voice_service.transcribe_audio(
+        request.audio_base64, 
+        request.language or session.language
+    )
+    
+    logger.info(f"Transcribed: {transcribed_text}")
+    
+    turn = await run_voice_turn(session, transcribed_text)
+    
+    # Convert response to speech
+    audio_bytes, audio_format = await voice_service.synthesize(turn["text_response"], turn["language"], audio_profile)
+    response_audio = base64.b64encode(audio_bytes).decode("utf-8") if audio_bytes else ""
+    
+    if turn["kind"] != "answer":
+        return VoiceResponse(
+            text_response=turn["text_response"],
+            audio_base64=response_audio,
+            language=turn["language"],
+            session_id=session_id,
+            user_text=turn["user_text"],
+            audio_format=audio_format
+        )
+    
+    # Generate avatar response with additional info
+    avatar_response = await avatar_service.generate_avatar_response(
+        text=turn["text_response"],
+        audio_base64=response_audio,
+        language=session.language
+    )
+    
+    response_data = {
+        "text_response": turn["text_response"],
+        "audio_base64": avatar_response.get("audio_base64", response_audio),
+        "language": session.language,
+        "session_id": session_id,
+        "user_text": turn["user_text"],
+        "requires_camera": turn["requires_camera"],
+        "avatar_data": avatar_response,
+        "additional_info": turn["additional_info"],
+        "audio_format": audio_format
+    }
     
     return VoiceResponse(**response_data)
 
+
+@app.post("/v2/voice/query")
+async def process_voice_query_v2(request: Request):
+    """
+    Voice query over the binary transport (protocol v2)
+    
+    Accepts raw audio (application/octet-stream, audio/*) or multipart
+    form data and answers with multipart/mixed: JSON metadata, then the
+    audio bytes. See binary_transport for the wire format.
+    """
+    audio_data, fields = await parse_voice_upload(request)
+    session_id = fields["session_id"] or str(uuid.uuid4())
+    language = fields["language"]
+    session = get_or_create_session(session_id, language)
+    audio_profile = negotiate_audio_profile(session, fields["audio_profile"], request.headers)
+    
+    stt_result = await voice_service.transcribe_bytes(audio_data, language or session.language)
+    transcribed_text = stt_result["text"]
+    logger.info(f"Transcribed (v2): {transcribed_text}")
+    
+    turn = await run_voice_turn(session, transcribed_text)
+    wants_json = "application/json" in request.headers.get("accept", "")
+    stream_audio = not wants_json and (fields["stream"] or "").lower() in ("1", "true", "yes")
+    
+    metadata = {
+        "text_response": turn["text_response"],
+        "language": turn["language"],
+        "session_id": session_id,
+        "user_text": turn["user_text"],
+        "requires_camera": turn["requires_camera"],
+        "additional_info": turn["additional_info"],
+        "audio_profile": audio_profile,
+        "stt_metrics": stt_result["metrics"]
+    }
+    if turn["kind"] == "answer":
+        # Avatar metadata only; the audio travels once, in the binary part
+        metadata["avatar_data"] = await avatar_service.generate_avatar_response(
+            text=turn["text_response"],
+            audio_base64="",
+            language=session.language
+        )
+    
+    if stream_audio:
+        # Metadata goes out now; audio follows chunk by chunk as it is synthesized
+        audio_chunks, audio_format = await voice_service.stream_speech(turn["text_response"], turn["language"], audio_profile)
+        metadata.update({"audio_format": audio_format, "audio_streaming": True})
+        return multipart_mixed_stream(metadata, audio_chunks, audio_format)
+    
+    response_audio, audio_format = await voice_service.synthesize(turn["text_response"], turn["language"], audio_profile)
+    metadata.update({"audio_format": audio_format, "audio_size": len(response_audio)})
+    
+    if wants_json:
+        metadata["audio_base64"] = base64.b64encode(response_audio).decode("utf-8")
+        return JSONResponse(content=metadata)
+    
+    return multipart_mixed_response(metadata, response_audio, audio_format)
+
+
+@app.post("/voice/query/stream")
+async def process_voice_query_stream(request: VoiceQueryRequest, http_request: Request):
+    """
+    Voice query answered as Server-Sent Events (text/event-stream)
+    
+    Same request and pipeline as /voice/query, but every stage is sent as
+    soon as it is ready: transcript, query type, the answer sentence by
+    sentence, images and per-sentence audio URLs. See event_stream.
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+    session = get_or_create_session(session_id, request.language)
+    audio_profile = negotiate_audio_profile(session, request.audio_profile, http_request.headers)
+    return StreamingResponse(
+        stream_voice_query(session, request, audio_profile),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+# Graph nodes whose LLM output is not part of the spoken answer
+NON_ANSWER_NODES = {"query_understanding", "image_retrieval", "response_generation"}
+
+
+async def stream_voice_query(session: SessionData, request: VoiceQueryRequest, audio_profile: str) -> AsyncIterator[str]:
+    """Stage events of one voice turn (see event_stream for the event types)"""
+    yield sse_event("session", {"session_id": session.session_id, "audio_profile": audio_profile})
+    try:
+        transcribed_text = await voice_service.transcribe_audio(
+            request.audio_base64,
+            request.language or session.language
+        )
+        logger.info(f"Transcribed (stream): {transcribed_text}")
+        yield sse_event("transcript", {"text": transcribed_text})
+        
+        turn = early_voice_turn(session, transcribed_text)
+        final_state = {}
+        if turn is None:
+            # Node by node, so classification and images go out before the
+            # answer, and the answering agent's LLM tokens as they are generated
+            graph = build_kisaan_graph()
+            final_state = voice_turn_state(session, transcribed_text)
+            images_sent = False
+            try:
+                async for mode, chunk in graph.astream(final_state, stream_mode=["updates", "values", "messages"]):
+                    if mode == "values":
+                        final_state = chunk
+                        continue
+                    if mode == "messages":
+                        message, metadata = chunk
+                        if metadata.get("langgraph_node") not in NON_ANSWER_NODES and isinstance(message.content, str) and message.content:
+                            yield sse_event("token", {"delta": message.content})
+                        continue
+                    for node, changes in chunk.items():
+                        changes = changes or {}
+                        if node == "query_understanding" and changes.get("query_type"):
+                            yield sse_event("query_type", {
+                                "query_type": changes["query_type"],
+                                "parsed_entities": changes.get("parsed_entities", {})
+                            })
+                        if changes.get("image_urls") and not images_sent:
+                            images_sent = True
+                            yield sse_event("images", {
+                                "image_urls": changes["image_urls"],
+                                "layout_type": changes.get("layout_type", final_state.get("layout_type"))
+                            })
+            except Exception as e:
+                logger.error(f"Agent workflow error: {str(e)}")
+                final_state = None
+            turn = record_voice_turn(session, transcribed_text, final_state)
+        
+        # The final answer split into sentences once the graph is done (tokens
+        # above are provisional); every sentence's audio is synthesized concurrently
+        segments = []
+        for index, sentence in enumerate(split_sentences(turn["text_response"])):
+            segments.append((index, *audio_segments.add(
+                voice_service.synthesize(sentence, turn["language"], audio_profile)
+            )))
+            yield sse_event("sentence", {"index": index, "text": sentence})
+        
+        for index, segment_id, synthesis in segments:
+            try:
+                audio, audio_format = await asyncio.shield(synthesis)
+            except Exception as e:
+                logger.warning(f"Segment {index} synthesis failed: {str(e)}")
+                audio, audio_format = b"", None
+            yield sse_event("audio", {
+                "index": index,
+                "url": f"/voice/audio/{segment_id}" if audio else None,
+                "audio_format": audio_format,
+                "audio_size": len(audio)
+            })
+        
+        done = {
+            "text_response": turn["text_response"],
+            "language": turn["language"],
+            "session_id": session.session_id,
+            "user_text": turn["user_text"],
+            "requires_camera": turn["requires_camera"],
+            "additional_info": turn["additional_info"],
+            "image_urls": (final_state or {}).get("image_urls", [])
+        }
+        if turn["kind"] == "answer":
+            done["avatar_data"] = await avatar_service.generate_avatar_response(
+                text=turn["text_response"],
+                audio_base64="",
+                language=session.language
+            )
+        yield sse_event("done", done)
+    
+    except Exception as e:
+        logger.error(f"Error streaming voice query: {str(e)}")
+        yield sse_event("error", {"message": str(e)})
+
+
+@app.get("/voice/audio/{segment_id}")
+async def get_audio_segment(segment_id: str):
+    """One sentence of a streamed answer's audio (waits while it is synthesized)"""
+    segment = await audio_segments.get(segment_id)
+    if not segment or not segment[0]:
+        raise HTTPException(status_code=404, detail="Audio segment not found")
+    audio, media_type = segment
+    return Response(content=audio, media_type=media_type)
+
 def extract_location_from_text(text: str) -> Dict:
     """
     Extract location information from user text
@@ -367,8 +649,13 @@ def extract_location_from_text(text: str) -> Dict:
     return location if location else None
 
 @app.post("/farmer/register")
-async def register_farmer(farmer: FarmerProfile):
-    """Register a new farmer profile"""
+async def register_farmer(farmer: FarmerProfile, session_id: Optional[str] = None):
+    """
+    Register a new farmer profile
+    
+    With a session_id the voice session is linked to the new farmer, so
+    agents can use the registered profile (e.g. scheme eligibility).
+    """
     conn = None
     cur = None
     
@@ -390,6 +677,11 @@ async def register_farmer(farmer: FarmerProfile):
         farmer_id = cur.fetchone()[0]
         conn.commit()
         
+        session = active_sessions.get(session_id) if session_id else None
+        if session:
+            session.farmer_id = farmer_id
+            session.location = {**(session.location or {}), "district": farmer.district, "state": farmer.state}
+        
         return JSONResponse(content={
             "message": "किसान पंजीकरण सफल रहा!" if farmer.primary_crops else "Farmer registered successfully!",
             "farmer_id": farmer_id
@@ -556,6 +848,51 @@ async def diagnose_crop_disease(request: dict):
 def health_check():
     return {"status": "healthy", "service": "Kisan Voice Assistant"}
 
+@app.get("/voice/tts-stats")
+def tts_stats():
+    """TTS routing stats: per-provider latency, error rates and circuit states"""
+    return voice_service.tts_router.get_stats()
+
+@app.get("/voice/realtime-stats")
+def realtime_stats():
+    """Realtime voice: sessions, pooled connections, audio buffers, captions, speculation and turns"""
+    return {
+        **realtime_sessions.get_stats(),
+        "audio_buffer": get_buffer_stats(),
+        "resumption": resumable_sessions.get_stats(),
+        "captions": get_caption_stats(),
+        "speculation": get_speculation_stats(),
+        "turns": get_turn_stats()
+    }
+
+@app.post("/broadcast")
+async def publish_broadcast(request: BroadcastRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Push a weather / pest emergency or advisory to connected /ws/voice clients
+    in a district or state (rendered and synthesized once, all workers)
+    
+    Requires the X-Admin-Token header to match Config.BROADCAST_API_KEY;
+    broadcasting is disabled while no key is configured.
+    """
+    if not Config.BROADCAST_API_KEY:
+        raise HTTPException(status_code=403, detail="Broadcasting is not enabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, Config.BROADCAST_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    try:
+        return await broadcast_hub.broadcast(**request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/sessions/stats")
+def session_stats():
+    """Session store: live sessions, history turns, estimated bytes and evictions"""
+    return active_sessions.get_stats()
+
+@app.get("/broadcast/stats")
+def broadcast_stats():
+    """Broadcast subscribers per location and fan-out stats of this worker"""
+    return broadcast_hub.get_stats()
+
 
 @app.websocket("/ws/voice")
 async def websocket_voice_endpoint(websocket: WebSocket):
@@ -565,116 +902,205 @@ async def websocket_voice_endpoint(websocket: WebSocket):
     Protocol:
     - Client connects and sends: {"type": "start", "language": "hindi", "session_id": "..."}
     - Client streams audio: {"type": "audio", "data": "base64_encoded_pcm"}
+    - Audio is buffered per connection; if the upstream falls behind the server
+      sends {"type": "flow", "action": "pause", "buffered_ms": n} and later
+      {"type": "flow", "action": "resume", "buffered_ms": n}
     - Server sends partial transcripts: {"type": "transcript", "text": "...", "is_final": false}
+      (throttled: unchanged or rapid partials are coalesced; with
+      "transcript_deltas": true in the start message partials come as
+      {"type": "transcript", "is_final": false, "keep": n, "append": "..."})
+    - Stable partials are classified (and weather / prices prefetched)
+      before the final arrives; "speculative": false in the start message
+      turns this off (default: SPECULATION_ENABLED)
     - Server sends final transcripts: {"type": "transcript", "text": "...", "is_final": true}
     - Server sends AI response: {"type": "response", "text": "...", "audio": "base64"}
     - Client sends: {"type": "stop"} to end
+    - Responses carry "turn": n. A new final transcript while turn n is still
+      being answered (barge-in) cancels it, and the server sends
+      {"type": "cancelled", "turn": n, "reason": "barge_in"}
+    - Every server frame is numbered: JSON frames carry "seq", a binary frame
+      takes the number after the JSON frame before it. Client sends
+      {"type": "ack", "seq": n} for frames it has handled. After a dropped
+      connection, reconnect with the same "session_id" and "last_seq": n in
+      the start message: frames after n (including answers finished while
+      offline) are replayed before "started", which reports "resumed",
+      "replayed" and "replay_gap" (see session_resumption)
+    - "location": {"state": "...", "district": "..."} in the start message (or
+      the session's stored location) subscribes the connection to district /
+      state broadcasts: {"type": "broadcast", "kind": "emergency", ...} with
+      pre-synthesized audio (see broadcast_hub)
+    
+    Protocol 2 (start with "protocol": 2):
+    - Client streams audio as binary frames of raw PCM (16-bit, 16kHz, mono)
+    - Server sends the response JSON without "audio" but with "audio_format"
+      and "audio_size", followed by one binary frame with the audio
+    - With "stream_audio": true in the start message, audio is sent as one
+      binary frame per TTS chunk as it is synthesized, then
+      {"type": "audio_end", "audio_size": n, "turn": n}
     """
     await websocket.accept()
     logger.info("🔌 WebSocket connection established")
     
     session_id = None
     language = "hindi"
+    protocol = PROTOCOL_V1
+    stream_audio = False
+    transcriber = None
+    audio = None
+    captions = None
+    speculation = None
+    channel = None  # Outbound frames, numbered and kept for a resume
+    turns = None
+    broadcasts = None  # Subscription to district / state broadcasts
+    attached_session = None  # Kept while connected, even if the store evicts it
     graph = build_kisaan_graph()
     
+    def notify_cancelled(target):
+        async def on_turn_cancelled(turn: int, reason: str):
+            await target.send_json({"type": "cancelled", "turn": turn, "reason": reason})
+        return on_turn_cancelled
+    
     async def on_transcript(text: str, is_final: bool):
-        """Handle transcript from AssemblyAI"""
+        """Handle transcript from AssemblyAI (delivered in order by the session's bridge)"""
+        # Send transcript to client (partials coalesced, finals always in full)
+        if is_final:
+            await captions.final(text)
+        else:
+            await captions.partial(text)
+            if speculation:
+                session = active_sessions.get(session_id)
+                speculation.on_partial(text, language, session.location if session else None)
+        
+        # If final transcript, answer in the background so captions keep flowing
+        if is_final and text.strip():
+            await turns.start(lambda turn: respond(text, turn))
+    
+    async def respond(text: str, turn: int):
+        """Process a final transcript with LangGraph and send the response (one turn)"""
+        nonlocal language
         try:
-            # Send transcript to client
-            await websocket.send_json({
-                "type": "transcript",
-                "text": text,
-                "is_final": is_final
+            logger.info(f"Processing final transcript: {text}")
+            
+            # Classification / prefetch already done on the stable partial?
+            prepared = await speculation.take(text) if speculation else None
+            
+            # Get session (put back if LRU / idle TTL dropped it while connected)
+            session = active_sessions.get(session_id)
+            if not session:
+                logger.info(f"Session {session_id} was evicted while connected, restoring it")
+                active_sessions[session_id] = session = attached_session
+            
+            # Detect language switch
+            detected_lang = voice_service.detect_language_from_speech(text)
+            if detected_lang:
+                language = detected_lang
+                session.language = language
+                logger.info(f"Language switched to: {language}")
+                if broadcasts:
+                    broadcast_hub.update(broadcasts, session.location, language)
+            
+            # Create state for LangGraph
+            state = {
+                "user_query": text,
+                "language": language,
+                "location": session.location or {},
+                "query_type": "",
+                "parsed_entities": {},
+                "crop_info": [],
+                "weather_data": {},
+                "market_data": [],
+                "government_schemes": [],
+                "pest_disease_info": {},
+                "fertilizer_info": {},
+                "pesticide_info": {},
+                "application_guide_info": {},
+                "irrigation_info": {},
+                "soil_health_info": {},
+                "crop_calendar_info": {},
+                "cost_info": {},
+                "emergency_info": {},
+                "expert_contact_info": {},
+                "recommendations": [],
+                "final_response": "",
+                "requires_camera": False,
+                "seasonal_info": {},
+                "agent_flow": [],
+                "requires_images": False,
+                "image_queries": [],
+                "image_urls": [],
+                "image_context": "",
+                "layout_type": "chat-only",
+                "farmer_id": session.farmer_id
+            }
+            if prepared:
+                state.update(prepared)
+            
+            # Run through agent graph
+            logger.info("Running query through agent graph...")
+            result = await graph.ainvoke(state)
+            
+            # Get response
+            response_text = result.get("final_response", "")
+            requires_camera = result.get("requires_camera", False)
+            image_urls = result.get("image_urls", [])
+            requires_images = result.get("requires_images", False)
+            
+            logger.info(f"Agent response: {response_text[:100]}...")
+            
+            # Update session history
+            session.conversation_history.append({
+                "user": text,
+                "assistant": response_text,
+                "timestamp": datetime.now().isoformat(),
+                "query_type": result.get("query_type", "unknown")
             })
+            session.last_activity = datetime.now().isoformat()
+            
+            response_message = {
+                "type": "response",
+                "text": response_text,
+                "requires_camera": requires_camera,
+                "requires_images": requires_images,
+                "image_urls": image_urls,
+                "language": language,
+                "turn": turn
+            }
+            
+            # Convert response to speech in the session's audio profile
+            audio_profile = select_profile(session_profile=session.audio_profile)
+            
+            if stream_audio:
+                # First audio reaches the client while the rest is still synthesizing
+                audio_chunks, audio_format = await voice_service.stream_speech(response_text, language, audio_profile)
+                response_message.update({"audio_format": audio_format, "audio_streaming": True})
+                await channel.send_json(response_message)
+                audio_size = 0
+                try:
+                    async for chunk in audio_chunks:
+                        audio_size += len(chunk)
+                        await channel.send_bytes(chunk)
+                finally:
+                    # Stops provider synthesis at once if the turn was cancelled
+                    await audio_chunks.aclose()
+                await channel.send_json({"type": "audio_end", "audio_size": audio_size, "turn": turn})
+                return
+            
+            response_audio, audio_format = await voice_service.synthesize(response_text, language, audio_profile)
+            response_message["audio_format"] = audio_format
+            
+            # Send response to client
+            if protocol == PROTOCOL_V2:
+                response_message["audio_size"] = len(response_audio)
+                await channel.send_json(response_message)
+                if response_audio:
+                    await channel.send_bytes(response_audio)
+            else:
+                response_message["audio"] = base64.b64encode(response_audio).decode("utf-8") if response_audio else ""
+                await channel.send_json(response_message)
             
-            # If final transcript, process with LangGraph
-            if is_final and text.strip():
-                logger.info(f"Processing final transcript: {text}")
-                
-                # Get session
-                session = active_sessions.get(session_id)
-                if not session:
-                    logger.warning(f"Session {session_id} not found")
-                    return
-                
-                # Detect language switch
-                detected_lang = voice_service.detect_language_from_speech(text)
-                if detected_lang:
-                    language = detected_lang
-                    session.language = language
-                    logger.info(f"Language switched to: {language}")
-                
-                # Create state for LangGraph
-                state = {
-                    "user_query": text,
-                    "language": language,
-                    "location": session.farmer_profile.location if session.farmer_profile else {},
-                    "query_type": "",
-                    "parsed_entities": {},
-                    "crop_info": [],
-                    "weather_data": {},
-                    "market_data": [],
-                    "government_schemes": [],
-                    "pest_disease_info": {},
-                    "fertilizer_info": {},
-                    "pesticide_info": {},
-                    "application_guide_info": {},
-                    "irrigation_info": {},
-                    "soil_health_info": {},
-                    "crop_calendar_info": {},
-                    "cost_info": {},
-                    "emergency_info": {},
-                    "expert_contact_info": {},
-                    "recommendations": [],
-                    "final_response": "",
-                    "requires_camera": False,
-                    "seasonal_info": {},
-                    "agent_flow": [],
-                    "requires_images": False,
-                    "image_queries": [],
-                    "image_urls": [],
-                    "image_context": "",
-                    "layout_type": "chat-only"
-                }
-                
-                # Run through agent graph
-                logger.info("Running query through agent graph...")
-                result = await graph.ainvoke(state)
-                
-                # Get response
-                response_text = result.get("final_response", "")
-                requires_camera = result.get("requires_camera", False)
-                image_urls = result.get("image_urls", [])
-                requires_images = result.get("requires_images", False)
-                
-                logger.info(f"Agent response: {response_text[:100]}...")
-                
-                # Update session history
-                session.conversation_history.append({
-                    "user": text,
-                    "assistant": response_text,
-                    "timestamp": datetime.now().isoformat(),
-                    "query_type": result.get("query_type", "unknown")
-                })
-                session.last_activity = datetime.now().isoformat()
-                
-                # Convert response to speech
-                response_audio = await voice_service.text_to_speech(response_text, language)
-                
-                # Send response to client
-                await websocket.send_json({
-                    "type": "response",
-                    "text": response_text,
-                    "audio": response_audio,
-                    "requires_camera": requires_camera,
-                    "requires_images": requires_images,
-                    "image_urls": image_urls,
-                    "language": language
-                })
-                
         except Exception as e:
             logger.error(f"Error processing transcript: {str(e)}")
-            await websocket.send_json({
+            await channel.send_json({
                 "type": "error",
                 "message": str(e)
             })
@@ -682,48 +1108,96 @@ async def websocket_voice_endpoint(websocket: WebSocket):
     async def on_error(error_msg: str):
         """Handle transcription errors"""
         logger.error(f"Transcription error: {error_msg}")
-        await websocket.send_json({
+        await channel.send_json({
             "type": "error",
             "message": error_msg
         })
     
     try:
-        # Set callbacks for realtime service
-        realtime_voice_service.set_callbacks(
-            on_transcript=on_transcript,
-            on_error=on_error
-        )
-        
         while True:
             try:
-                # Receive message from client
-                message = await websocket.receive_json()
+                # Receive message from client (text JSON or binary PCM)
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    logger.info("WebSocket disconnected")
+                    break
+                
+                if frame.get("bytes") is not None:
+                    # Binary frame: raw PCM buffered for AssemblyAI, no decoding
+                    if audio:
+                        await audio.feed(frame["bytes"])
+                    continue
+                
+                message = json.loads(frame.get("text") or "{}")
                 msg_type = message.get("type")
                 
                 if msg_type == "start":
                     # Start new session
                     session_id = message.get("session_id") or str(uuid.uuid4())
                     language = message.get("language", "hindi")
+                    protocol = PROTOCOL_V2 if message.get("protocol") == PROTOCOL_V2 else PROTOCOL_V1
+                    stream_audio = protocol == PROTOCOL_V2 and bool(message.get("stream_audio"))
+                    transcript_deltas = bool(message.get("transcript_deltas"))
+                    speculative = bool(message.get("speculative", Config.SPECULATION_ENABLED))
                     
                     # Create or get session
-                    if session_id not in active_sessions:
-                        active_sessions[session_id] = SessionData(
-                            session_id=session_id,
-                            language=language,
-                            conversation_history=[],
-                            last_activity=datetime.now().isoformat()
+                    session = attached_session = get_or_create_session(session_id, language)
+                    negotiate_audio_profile(session, message.get("audio_profile"), websocket.headers)
+                    
+                    # Resume the session's outbound frames if the client reconnected
+                    last_seq = message.get("last_seq")
+                    resumed, replayed, replay_gap = False, 0, False
+                    if channel is None or channel.session_id != session_id:
+                        if channel:
+                            channel.detach(websocket)
+                        channel, resumed = await resumable_sessions.open(session_id, resume=last_seq is not None)
+                        if channel.turns is None:
+                            # One answer in flight per session; a new final transcript cancels it
+                            channel.turns = TurnManager(on_cancel=notify_cancelled(channel))
+                        turns = channel.turns
+                        replayed, replay_gap = await resumable_sessions.attach(
+                            channel, websocket, int(last_seq or 0) if resumed else 0
                         )
                     
-                    # Set language and start transcription
-                    realtime_voice_service.set_language(language)
-                    await realtime_voice_service.start()
+                    # This connection's own transcriber (pooled upstream connection)
+                    if audio:
+                        audio.close()
+                        audio = None
+                    await realtime_sessions.release(transcriber)
+                    transcriber = None
+                    if captions:
+                        captions.close()
+                    captions = TranscriptCoalescer(channel.send_json, deltas=transcript_deltas)
+                    if speculation:
+                        speculation.close()
+                    speculation = SpeculativeRunner() if speculative else None
+                    transcriber = await realtime_sessions.acquire(language, on_transcript, on_error)
+                    # Receive loop only buffers; a sender task feeds the transcriber
+                    audio = AudioSender(transcriber.send_audio, transcriber.pending_writes, channel.send_json)
+                    
+                    # District / state broadcasts for this connection
+                    if isinstance(message.get("location"), dict):
+                        session.location = {**(session.location or {}), **message["location"]}
+                    broadcast_hub.unsubscribe(broadcasts)
+                    broadcasts = broadcast_hub.subscribe(
+                        session_id, channel.send_json, channel.send_bytes,
+                        location=session.location, language=language, binary_audio=protocol == PROTOCOL_V2
+                    )
                     
                     logger.info(f"Started real-time session: {session_id} ({language})")
                     
-                    await websocket.send_json({
+                    await channel.send_json({
                         "type": "started",
                         "session_id": session_id,
-                        "language": language
+                        "language": language,
+                        "protocol": protocol,
+                        "stream_audio": stream_audio,
+                        "transcript_deltas": transcript_deltas,
+                        "speculative": speculative,
+                        "resumed": resumed,
+                        "replayed": replayed,
+                        "replay_gap": replay_gap,
+                        "audio_profile": select_profile(session_profile=session.audio_profile)
                     })
                 
                 elif msg_type == "audio":
@@ -732,15 +1206,30 @@ async def websocket_voice_endpoint(websocket: WebSocket):
                     if audio_base64:
                         # Decode base64 audio
                         audio_bytes = base64.b64decode(audio_base64)
-                        # Send to AssemblyAI
-                        await realtime_voice_service.send_audio(audio_bytes)
+                        # Buffer for AssemblyAI
+                        if audio:
+                            await audio.feed(audio_bytes)
+                
+                elif msg_type == "ack":
+                    # Client has these frames; stop keeping them for a resume
+                    if channel:
+                        channel.ack(int(message.get("seq", 0)))
                 
                 elif msg_type == "stop":
-                    # Stop transcription
-                    await realtime_voice_service.stop()
+                    # Stop transcription (after the buffered audio has gone upstream)
+                    if audio:
+                        await audio.flush()
+                        audio.close()
+                        audio = None
+                    await realtime_sessions.release(transcriber)
+                    transcriber = None
                     logger.info("Stopped real-time transcription")
                     
-                    await websocket.send_json({
+                    # Ended on purpose: nothing to resume
+                    broadcast_hub.unsubscribe(broadcasts)
+                    broadcasts = None
+                    await resumable_sessions.close(session_id)
+                    await (channel or websocket).send_json({
                         "type": "stopped"
                     })
                     break
@@ -750,14 +1239,23 @@ async def websocket_voice_endpoint(websocket: WebSocket):
                 break
             except Exception as e:
                 logger.error(f"Error in WebSocket loop: {str(e)}")
-                await websocket.send_json({
+                await (channel or websocket).send_json({
                     "type": "error",
                     "message": str(e)
                 })
     
     finally:
-        # Clean up
-        await realtime_voice_service.stop()
+        # Clean up (an answer in flight keeps running; its frames wait for a resume)
+        if channel:
+            channel.detach(websocket)
+        broadcast_hub.unsubscribe(broadcasts)
+        if audio:
+            audio.close()
+        await realtime_sessions.release(transcriber)
+        if captions:
+            captions.close()
+        if speculation:
+            speculation.close()
         logger.info("🔌 WebSocket connection closed")
 
 
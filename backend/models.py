@@ -7,12 +7,14 @@ class VoiceQueryRequest(BaseModel):
     audio_base64: str
     session_id: Optional[str] = None
     language: Optional[str] = "hindi"
+    audio_profile: Optional[str] = None  # Response audio: native, opus-12k, mp3-32k, mp3-64k
 
 class VoiceResponse(BaseModel):
     text_response: str
     audio_base64: str
     language: str
     session_id: str
+    audio_format: Optional[str] = "audio/mpeg"  # Media type of audio_base64
     user_text: Optional[str] = ""  # Add transcribed user text
     requires_camera: Optional[bool] = False  # Trigger camera for disease detection
     avatar_data: Optional[Dict[str, Any]] = None  # Avatar response data
@@ -129,6 +131,19 @@ class SessionData(BaseModel):
     session_id: str
     farmer_id: Optional[int] = None
     language: str
-    location: Optional[str] = None
+    location: Optional[Dict[str, Any]] = None  # city / district / state / latitude / longitude
     conversation_history: List[dict] = []
-    last_activity: str
\ No newline at end of file
+    last_activity: str
+    audio_profile: Optional[str] = None  # Negotiated response audio profile
+
+# Broadcasts
+class BroadcastRequest(BaseModel):
+    messages: Dict[str, str]  # Text per language
+    title: str = ""
+    kind: str = "emergency"  # emergency or advisory
+    severity: str = "high"
+    scope: str = "district"  # district, state or all
+    state: Optional[str] = None
+    district: Optional[str] = None
+    audio_profile: Optional[str] = None
+    synthesize_audio: bool = True
@@ -0,0 +1,592 @@
+"""
+Weather-driven Pest & Disease Risk Engine
+Applies temperature / humidity / leaf-wetness rules to cached forecasts for
+every district with registered crops in one vectorized NumPy batch, and
+writes the resulting risk levels into crop_advisories.
+
+Agents read the precomputed risk from memory instead of asking the LLM.
+
+The server runs the batch at startup and then daily (start_scheduler());
+districts without a fresh forecast in weather_cache are fetched first.
+Run once as a batch job:
+    python pest_risk_engine.py
+"""
+
+import json
+import asyncio
+import logging
+from datetime import datetime, date
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from db import get_db_connection, get_placeholder
+from agriculture_apis import agriculture_api_service
+
+logger = logging.getLogger(__name__)
+
+# OpenWeather 5-day forecast uses 3-hour steps
+FORECAST_STEP_HOURS = 3
+FORECAST_STEPS = 40
+
+# Leaf wetness proxy: canopy is treated as wet when RH is at or above this
+# value, or when any rain is forecast for the step
+LEAF_WETNESS_RH = 90
+
+RISK_LEVELS = ["none", "low", "medium", "high", "critical"]
+
+# advisory_type used for rows written by this engine
+RISK_ADVISORY_TYPE = "disease_risk"
+
+# Disease rules: a forecast step is favourable when temperature lies inside
+# [temp_min, temp_max] and the leaf is wet. Risk is graded on the longest
+# continuous run of favourable hours (low/medium/high/critical thresholds).
+DISEASE_RULES = {
+    "wheat_rust": {
+        "name": "Wheat Rust (Yellow/Brown)",
+        "name_hindi": "गेहूं का रतुआ (पीला/भूरा)",
+        "crops": ["wheat", "gehun", "गेहूं", "गेहूँ"],
+        "temp_min": 10.0,
+        "temp_max": 20.0,
+        "hours": [3, 6, 12, 24],
+        "action": "Scout for yellow/brown pustules on leaves; spray Propiconazole 25% EC @ 1 mL/L if pustules appear.",
+        "action_hindi": "पत्तियों पर पीले/भूरे धब्बे देखें; दिखने पर प्रोपिकोनाज़ोल 25% EC @ 1 mL/लीटर छिड़कें।"
+    },
+    "rice_blast": {
+        "name": "Rice Blast",
+        "name_hindi": "धान का झोंका रोग (ब्लास्ट)",
+        "crops": ["rice", "paddy", "dhan", "धान", "चावल"],
+        "temp_min": 20.0,
+        "temp_max": 30.0,
+        "hours": [3, 9, 15, 24],
+        "action": "Avoid excess nitrogen; spray Tricyclazole 75% WP @ 0.6 g/L at first eye-shaped lesions.",
+        "action_hindi": "अधिक नाइट्रोजन न दें; आँख जैसे धब्बे दिखते ही ट्राइसाइक्लाज़ोल 75% WP @ 0.6 ग्राम/लीटर छिड़कें।"
+    },
+    "late_blight": {
+        "name": "Late Blight",
+        "name_hindi": "पछेती झुलसा",
+        "crops": ["potato", "aloo", "tomato", "tamatar", "आलू", "टमाटर"],
+        "temp_min": 10.0,
+        "temp_max": 25.0,
+        "hours": [3, 11, 18, 36],
+        "action": "Spray Mancozeb 75% WP @ 2.5 g/L as protectant; switch to Metalaxyl + Mancozeb if lesions spread.",
+        "action_hindi": "बचाव हेतु मैंकोज़ेब 75% WP @ 2.5 ग्राम/लीटर छिड़कें; धब्बे फैलें तो मेटालैक्सिल + मैंकोज़ेब दें।"
+    }
+}
+
+
+def _location_key(district: Optional[str], state: Optional[str] = None) -> Tuple[str, str]:
+    """Normalized (state, district) key used by the in-memory risk index"""
+    return ((state or "").strip().lower(), (district or "").strip().lower())
+
+
+def forecast_location(district: Optional[str], state: Optional[str] = None) -> str:
+    """weather_cache location name for a district: "District, State" """
+    district, state = (district or "").strip(), (state or "").strip()
+    return f"{district}, {state}" if state else district
+
+
+def _longest_run(mask: np.ndarray) -> np.ndarray:
+    """
+    Length of the longest run of True values along the last axis
+
+    Args:
+        mask: Boolean array of shape (districts, steps)
+
+    Returns:
+        Integer array of shape (districts,)
+    """
+    counts = np.cumsum(mask, axis=1)
+    resets = np.maximum.accumulate(np.where(mask, 0, counts), axis=1)
+    return (counts - resets).max(axis=1)
+
+
+class PestRiskEngine:
+    """Batch pest/disease risk computation over district weather forecasts"""
+
+    def __init__(self, rules: Optional[Dict[str, Dict]] = None):
+        self.rules = rules or DISEASE_RULES
+        self._crop_to_rules = {}
+        for rule_id, rule in self.rules.items():
+            for crop_name in rule["crops"]:
+                self._crop_to_rules.setdefault(crop_name.lower(), []).append(rule_id)
+
+        # (state, district) -> list of risk dicts, filled by run_batch()
+        self._risk_index: Dict[Tuple[str, str], List[Dict]] = {}
+        self._district_index: Dict[str, List[Dict]] = {}
+        # (advisory date, state, district) -> stored risks, used until a batch has run
+        self._stored_risks: Dict[Tuple[date, str, str], List[Dict]] = {}
+        self.last_run: Optional[str] = None
+        self._scheduler: Optional[asyncio.Task] = None
+
+    def rules_for_crop(self, crop_name: str) -> List[str]:
+        """Get the disease rule ids that apply to a crop name"""
+        crop_lower = (crop_name or "").strip().lower()
+        if crop_lower in self._crop_to_rules:
+            return self._crop_to_rules[crop_lower]
+        # Allow "wheat (HD-2967)" style names
+        for name, rule_ids in self._crop_to_rules.items():
+            if name in crop_lower:
+                return rule_ids
+        return []
+
+    def build_forecast_arrays(self, forecasts: List[List[Dict]]) -> Dict[str, np.ndarray]:
+        """
+        Stack per-district forecast lists into (districts, steps) arrays
+
+        Args:
+            forecasts: One list per district of forecast dicts as produced by
+                AgricultureAPIService._process_weather_data()["forecasts"]
+
+        Returns:
+            Dict with temperature, humidity and rain arrays (NaN padded)
+        """
+        shape = (len(forecasts), FORECAST_STEPS)
+        temperature = np.full(shape, np.nan, dtype=np.float32)
+        humidity = np.full(shape, np.nan, dtype=np.float32)
+        rain = np.zeros(shape, dtype=np.float32)
+
+        for row, items in enumerate(forecasts):
+            items = items[:FORECAST_STEPS]
+            if not items:
+                continue
+            n = len(items)
+            temperature[row, :n] = [item.get("temperature", np.nan) for item in items]
+            humidity[row, :n] = [item.get("humidity", np.nan) for item in items]
+            rain[row, :n] = [item.get("rain", 0) or 0 for item in items]
+
+        return {"temperature": temperature, "humidity": humidity, "rain": rain}
+
+    def compute_risk(self, arrays: Dict[str, np.ndarray]) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Evaluate every disease rule for every district in one pass
+
+        Args:
+            arrays: Output of build_forecast_arrays()
+
+        Returns:
+            rule_id -> {"hours": int array, "level": level index array}
+        """
+        temperature = arrays["temperature"]
+        # NaN comparisons are False, so padded steps are never favourable
+        wet = (arrays["humidity"] >= LEAF_WETNESS_RH) | (arrays["rain"] > 0)
+
+        results = {}
+        for rule_id, rule in self.rules.items():
+            favourable = wet & (temperature >= rule["temp_min"]) & (temperature <= rule["temp_max"])
+            hours = _longest_run(favourable) * FORECAST_STEP_HOURS
+            low_h, medium_h, high_h, critical_h = rule["hours"]
+            level = np.select(
+                [hours >= critical_h, hours >= high_h, hours >= medium_h, hours >= low_h],
+                [4, 3, 2, 1],
+                default=0
+            )
+            results[rule_id] = {"hours": hours, "level": level}
+
+        return results
+
+    def _fetch_crop_districts(self, cursor) -> List[Dict]:
+        """Get active crops joined with their farmer's district"""
+        ph = get_placeholder()
+        cursor.execute(f"""
+            SELECT c.crop_id, c.crop_name, f.district, f.state
+            FROM crops c
+            JOIN farmers f ON f.farmer_id = c.farmer_id
+            WHERE c.expected_harvest_date IS NULL OR c.expected_harvest_date >= {ph}
+        """, (date.today(),))
+        return [
+            {"crop_id": row[0], "crop_name": row[1], "district": row[2], "state": row[3]}
+            for row in cursor.fetchall()
+        ]
+
+    def _fetch_cached_forecasts(
+        self,
+        cursor,
+        keys: List[Tuple[str, str]],
+        fresh_only: bool = False
+    ) -> Dict[Tuple[str, str], List[Dict]]:
+        """
+        Get the latest cached forecast per (state, district) from weather_cache
+
+        Rows cached as "District, State" are preferred; a row under the bare
+        district name (e.g. from a coordinate lookup) is used otherwise.
+        """
+        if not keys:
+            return {}
+
+        names = {}
+        for state, district in keys:
+            names.setdefault(forecast_location(district, state).lower(), []).append((state, district))
+        bare = {district for _, district in keys} - set(names)
+
+        ph = get_placeholder()
+        locations = sorted(set(names) | bare)
+        placeholders = ", ".join([ph] * len(locations))
+        params = list(locations)
+        fresh = ""
+        if fresh_only:
+            fresh = f"AND valid_until >= {ph}"
+            params.append(datetime.now())
+        cursor.execute(f"""
+            SELECT LOWER(location), forecast_data
+            FROM weather_cache
+            WHERE LOWER(location) IN ({placeholders}) {fresh}
+            ORDER BY fetched_at ASC
+        """, params)
+
+        by_location = {}
+        for location, forecast_data in cursor.fetchall():
+            if isinstance(forecast_data, str):
+                try:
+                    forecast_data = json.loads(forecast_data)
+                except ValueError:
+                    continue
+            if forecast_data:
+                # Later rows overwrite earlier ones, so the newest wins
+                by_location[location] = forecast_data.get("forecasts", [])
+
+        forecasts = {}
+        for key in keys:
+            items = by_location.get(forecast_location(key[1], key[0]).lower()) or by_location.get(key[1])
+            if items:
+                forecasts[key] = items
+        return forecasts
+
+    def _write_advisories(self, cursor, crop_ids: List[int], advisories: List[Dict]):
+        """
+        Replace today's engine advisories for every crop the run evaluated
+
+        Crops whose risk has dropped since an earlier run today lose their
+        stale advisory even when the run produces none.
+        """
+        ph = get_placeholder()
+        today = date.today()
+        crop_ids = sorted(set(crop_ids))
+        if crop_ids:
+            placeholders = ", ".join([ph] * len(crop_ids))
+            cursor.execute(f"""
+                DELETE FROM crop_advisories
+                WHERE advisory_type = {ph} AND advisory_date = {ph} AND crop_id IN ({placeholders})
+            """, [RISK_ADVISORY_TYPE, today] + crop_ids)
+
+        if not advisories:
+            return
+        cursor.executemany(f"""
+            INSERT INTO crop_advisories
+            (crop_id, advisory_date, advisory_type, description, severity, action_required)
+            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+        """, [
+            (a["crop_id"], today, RISK_ADVISORY_TYPE, a["description"], a["severity"], a["action_required"])
+            for a in advisories
+        ])
+
+    def _index_risks(self, risks: List[Dict]):
+        """Rebuild the in-memory lookup tables"""
+        risk_index = {}
+        district_index = {}
+        for risk in risks:
+            key = _location_key(risk["district"], risk["state"])
+            risk_index.setdefault(key, []).append(risk)
+            district_index.setdefault(key[1], []).append(risk)
+        self._risk_index = risk_index
+        self._district_index = district_index
+
+    def evaluate(
+        self,
+        district_forecasts: Dict[Tuple[str, str], List[Dict]],
+        district_crops: Dict[Tuple[str, str], List[Dict]]
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Compute risks and advisory rows without touching the database
+
+        Args:
+            district_forecasts: (state, district) -> forecast list
+            district_crops: (state, district) -> crop rows in that district
+
+        Returns:
+            (district risk summaries, crop_advisories rows)
+        """
+        keys = [key for key in district_crops if district_forecasts.get(key)]
+        if not keys:
+            return [], []
+
+        arrays = self.build_forecast_arrays([district_forecasts[key] for key in keys])
+        results = self.compute_risk(arrays)
+
+        risks = []
+        advisories = []
+        for row, key in enumerate(keys):
+            crops = district_crops[key]
+            for rule_id, rule in self.rules.items():
+                level = int(results[rule_id]["level"][row])
+                if level == 0:
+                    continue
+                affected = [c for c in crops if rule_id in self.rules_for_crop(c["crop_name"])]
+                if not affected:
+                    continue
+
+                hours = int(results[rule_id]["hours"][row])
+                severity = RISK_LEVELS[level]
+                risk = {
+                    "district": affected[0]["district"],
+                    "state": affected[0]["state"],
+                    "disease": rule_id,
+                    "disease_name": rule["name"],
+                    "disease_name_hindi": rule["name_hindi"],
+                    "crops": sorted({c["crop_name"] for c in affected}),
+                    "severity": severity,
+                    "favourable_hours": hours,
+                    "action": rule["action"],
+                    "action_hindi": rule["action_hindi"]
+                }
+                risks.append(risk)
+
+                # Only actionable levels become advisories
+                if level >= 2:
+                    description = (
+                        f"{rule['name']} risk {severity}: {hours} continuous hours of "
+                        f"favourable weather forecast in {risk['district']}"
+                    )
+                    for crop in affected:
+                        advisories.append({
+                            "crop_id": crop["crop_id"],
+                            "description": description,
+                            "severity": severity,
+                            "action_required": rule["action"]
+                        })
+
+        return risks, advisories
+
+    def run_batch(self) -> Dict:
+        """
+        Run the full batch: load crops and cached forecasts, compute risk for
+        every district, write crop_advisories and refresh the in-memory index
+
+        Returns:
+            Summary of the run
+        """
+        started = datetime.now()
+        conn = None
+        cur = None
+
+        try:
+            conn = get_db_connection()
+            cur = conn.cursor()
+
+            crops = self._fetch_crop_districts(cur)
+            district_crops = {}
+            for crop in crops:
+                key = _location_key(crop["district"], crop["state"])
+                district_crops.setdefault(key, []).append(crop)
+
+            cached = self._fetch_cached_forecasts(cur, sorted(district_crops))
+            district_forecasts = {key: cached.get(key, []) for key in district_crops}
+
+            risks, advisories = self.evaluate(district_forecasts, district_crops)
+            self._write_advisories(cur, [crop["crop_id"] for crop in crops], advisories)
+            conn.commit()
+
+            self._index_risks(risks)
+            self.last_run = started.isoformat()
+
+            summary = {
+                "districts": len(district_crops),
+                "districts_with_forecast": sum(1 for f in district_forecasts.values() if f),
+                "risks": len(risks),
+                "advisories_written": len(advisories),
+                "duration_ms": round((datetime.now() - started).total_seconds() * 1000, 1)
+            }
+            logger.info(f"✅ Pest risk batch complete: {summary}")
+            return summary
+
+        except Exception as e:
+            logger.error(f"Pest risk batch error: {str(e)}")
+            if conn:
+                conn.rollback()
+            return {"error": str(e)}
+        finally:
+            if cur:
+                cur.close()
+            if conn:
+                conn.close()
+
+    def _stale_forecast_locations(self) -> List[Tuple[str, str]]:
+        """(district, state) of crop districts without a fresh cached forecast"""
+        conn = None
+        cur = None
+        try:
+            conn = get_db_connection()
+            cur = conn.cursor()
+            locations = {}
+            for crop in self._fetch_crop_districts(cur):
+                if crop["district"]:
+                    locations.setdefault(_location_key(crop["district"], crop["state"]), (crop["district"], crop["state"]))
+            fresh = self._fetch_cached_forecasts(cur, sorted(locations), fresh_only=True)
+            return [location for key, location in locations.items() if key not in fresh]
+        except Exception as e:
+            logger.error(f"Error checking cached forecasts: {str(e)}")
+            return []
+        finally:
+            if cur:
+                cur.close()
+            if conn:
+                conn.close()
+
+    async def refresh_forecasts(self) -> int:
+        """
+        Fetch forecasts (into weather_cache) for crop districts whose cached
+        forecast is missing or expired
+
+        Returns:
+            Number of districts fetched
+        """
+        stale = await asyncio.to_thread(self._stale_forecast_locations)
+        fetched = 0
+        for district, state in stale:
+            weather = await agriculture_api_service.get_weather_forecast(
+                city=f"{district},IN",
+                days=FORECAST_STEPS * FORECAST_STEP_HOURS // 24,
+                cache_location=forecast_location(district, state)
+            )
+            if weather.get("forecasts"):
+                fetched += 1
+        if stale:
+            logger.info(f"🌦️ Refreshed forecasts for {fetched}/{len(stale)} districts")
+        return fetched
+
+    async def run_scheduled(self) -> Dict:
+        """Refresh stale forecasts, then run the batch off the event loop"""
+        await self.refresh_forecasts()
+        return await asyncio.to_thread(self.run_batch)
+
+    async def _run_periodically(self, interval_seconds: float):
+        while True:
+            try:
+                await self.run_scheduled()
+            except Exception as e:
+                logger.error(f"Scheduled pest risk batch failed: {str(e)}")
+            await asyncio.sleep(interval_seconds)
+
+    def start_scheduler(self, interval_seconds: float = Config.PEST_RISK_BATCH_INTERVAL_SECONDS):
+        """Run the batch now and then every interval_seconds (call on the server's event loop)"""
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.create_task(self._run_periodically(interval_seconds))
+
+    async def stop_scheduler(self):
+        if self._scheduler:
+            self._scheduler.cancel()
+            await asyncio.gather(self._scheduler, return_exceptions=True)
+            self._scheduler = None
+
+    def _load_from_db(self, district: str, state: Optional[str] = None) -> List[Dict]:
+        """Load today's stored risk advisories for a district (index cold start)"""
+        conn = None
+        cur = None
+        try:
+            ph = get_placeholder()
+            conn = get_db_connection()
+            cur = conn.cursor()
+            cur.execute(f"""
+                SELECT c.crop_name, f.district, f.state, ca.description, ca.severity, ca.action_required
+                FROM crop_advisories ca
+                JOIN crops c ON c.crop_id = ca.crop_id
+                JOIN farmers f ON f.farmer_id = c.farmer_id
+                WHERE ca.advisory_type = {ph} AND ca.advisory_date = {ph} AND LOWER(f.district) = {ph}
+            """, (RISK_ADVISORY_TYPE, date.today(), district.strip().lower()))
+
+            risks = []
+            for crop_name, row_district, row_state, description, severity, action in cur.fetchall():
+                if state and (row_state or "").strip().lower() != state.strip().lower():
+                    continue
+                risks.append({
+                    "district": row_district,
+                    "state": row_state,
+                    "crops": [crop_name],
+                    "severity": severity,
+                    "description": description,
+                    "action": action
+                })
+            return risks
+        except Exception as e:
+            logger.error(f"Error loading stored pest risk: {str(e)}")
+            return []
+        finally:
+            if cur:
+                cur.close()
+            if conn:
+                conn.close()
+
+    def get_district_risk(
+        self,
+        district: Optional[str],
+        state: Optional[str] = None,
+        crop: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Get precomputed risks for a district (optionally for one crop)
+
+        Args:
+            district: District (or city) name
+            state: State name (optional, narrows the match)
+            crop: Crop name (optional)
+
+        Returns:
+            List of risk dicts, highest severity first
+        """
+        if not district:
+            return []
+
+        key = _location_key(district, state)
+        if state:
+            risks = self._risk_index.get(key)
+        else:
+            risks = self._district_index.get(key[1])
+
+        if risks is None:
+            if self.last_run:
+                return []
+            # No batch has run in this process yet; fall back to today's
+            # stored rows (cached per advisory date, and only when found)
+            stored_key = (date.today(),) + key
+            risks = self._stored_risks.get(stored_key)
+            if risks is None:
+                risks = self._load_from_db(district, state)
+                if risks:
+                    self._stored_risks = {
+                        k: v for k, v in self._stored_risks.items() if k[0] == stored_key[0]
+                    }
+                    self._stored_risks[stored_key] = risks
+
+        if crop:
+            rule_ids = set(self.rules_for_crop(crop))
+            crop_lower = crop.strip().lower()
+            risks = [
+                r for r in risks
+                if r.get("disease") in rule_ids
+                or any(crop_lower in c.lower() for c in r.get("crops", []))
+            ]
+
+        return sorted(risks, key=lambda r: RISK_LEVELS.index(r.get("severity", "none")), reverse=True)
+
+    def format_risk_summary(self, risks: List[Dict], language: str = "hindi") -> str:
+        """Short, prompt-ready description of precomputed risks"""
+        lines = []
+        for risk in risks[:3]:
+            if language == "hindi" and risk.get("disease_name_hindi"):
+                name = risk["disease_name_hindi"]
+                action = risk.get("action_hindi", risk.get("action", ""))
+            else:
+                name = risk.get("disease_name", risk.get("description", ""))
+                action = risk.get("action", "")
+            lines.append(f"• {name} ({risk.get('severity')}): {action}")
+        return "\n".join(lines)
+
+
+# Global pest risk engine instance
+pest_risk_engine = PestRiskEngine()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(pest_risk_engine.run_batch())
@@ -1,176 +1,543 @@
 """
 Real-time Voice Service with AssemblyAI WebSocket for live transcription
+
+Every /ws/voice connection gets its own RealtimeVoiceService (callbacks,
+language and upstream connection are per connection). RealtimeSessionManager
+hands these out, caps the sessions per worker process and keeps a small pool
+of pre-opened upstream connections per language, so a new session skips the
+AssemblyAI handshake. A released connection goes back to the pool and is
+reused once late transcripts of the previous session have drained.
+
+The SDK calls on_data / on_error on its own reader thread, which has no
+event loop. A per-session TranscriptBridge hands those events to the loop
+(call_soon_threadsafe) through a bounded queue: a newer partial replaces a
+queued one, partials are dropped when the queue is full, and finals and
+errors are never dropped. One dispatcher task per session delivers them in
+order.
 """
 
-import os
+import time
 import asyncio
-import base64
-import json
+import inspect
 import logging
-from typing import Optional, Callable
+from collections import deque
+from typing import Optional, Callable, Deque, Dict, List, Set, Tuple
 import assemblyai as aai
 from config import Config
-from voice_service import voice_service
 
 logger = logging.getLogger(__name__)
 
 # Initialize AssemblyAI
 aai.settings.api_key = Config.ASSEMBLYAI_API_KEY
 
+# AssemblyAI language codes per supported language
+LANGUAGE_CODES = {
+    'hindi': 'hi',
+    'english': 'en',
+    'punjabi': 'pa',
+    'marathi': 'mr',
+    'gujarati': 'gu',
+    'tamil': 'ta',
+    'telugu': 'te',
+    'kannada': 'kn',
+    'bengali': 'bn'
+}
+
+# Older SDK releases have no language_code on the realtime transcriber
+_SUPPORTS_LANGUAGE_CODE = "language_code" in inspect.signature(aai.RealtimeTranscriber.__init__).parameters
+
+
+class RealtimeCapacityError(RuntimeError):
+    """Raised when the worker already serves REALTIME_MAX_SESSIONS sessions"""
+
+
+class TranscriptBridge:
+    """Delivers SDK-thread transcript events to one session's callbacks on the event loop"""
+
+    def __init__(
+        self,
+        on_transcript: Callable[[str, bool], None],
+        on_error: Optional[Callable[[str], None]] = None,
+        max_queue: int = Config.REALTIME_QUEUE_SIZE,
+        lag_ms: Optional[Deque[float]] = None
+    ):
+        self.on_transcript = on_transcript
+        self.on_error = on_error
+        self.max_queue = max_queue
+        self.loop = asyncio.get_running_loop()
+        self.lag_ms: Deque[float] = lag_ms if lag_ms is not None else deque(maxlen=200)
+        self.stats = {"delivered": 0, "merged": 0, "dropped": 0, "overflow": 0, "max_depth": 0}
+
+        # (kind, text, received_at) with kind "partial", "final" or "error"
+        self._events: Deque[Tuple[str, str, float]] = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._task = self.loop.create_task(self._dispatch())
+
+    @property
+    def depth(self) -> int:
+        return len(self._events)
+
+    def submit(self, kind: str, text: str):
+        """Queue an event; safe to call from any thread"""
+        if self._closed:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._enqueue, kind, text, time.monotonic())
+        except RuntimeError:
+            # Loop already closed (server shutting down)
+            pass
+
+    def _enqueue(self, kind: str, text: str, received_at: float):
+        if self._closed:
+            return
+        events = self._events
+        if events and events[-1][0] == "partial" and kind != "error":
+            # A newer partial or the final supersedes an undelivered partial
+            events[-1] = (kind, text, received_at)
+            self.stats["merged"] += 1
+            self._ready.set()
+            return
+
+        if len(events) >= self.max_queue:
+            if kind == "partial":
+                self.stats["dropped"] += 1
+                return
+            # Finals and errors are never dropped: make room by discarding a partial
+            for i, event in enumerate(events):
+                if event[0] == "partial":
+                    del events[i]
+                    self.stats["dropped"] += 1
+                    break
+            else:
+                self.stats["overflow"] += 1
+
+        events.append((kind, text, received_at))
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(events))
+        self._ready.set()
+
+    async def _dispatch(self):
+        while True:
+            if not self._events:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            kind, text, received_at = self._events.popleft()
+            self.lag_ms.append((time.monotonic() - received_at) * 1000)
+            try:
+                if kind == "error":
+                    if self.on_error:
+                        await self.on_error(text)
+                else:
+                    await self.on_transcript(text, kind == "final")
+                self.stats["delivered"] += 1
+            except Exception as e:
+                logger.error(f"Error delivering transcript: {str(e)}")
+
+    def close(self):
+        """Stop delivery; queued events are discarded"""
+        self._closed = True
+        self._events.clear()
+        self._task.cancel()
+
+
+def create_transcriber(service: "RealtimeVoiceService"):
+    """Build an AssemblyAI realtime transcriber wired to one service's callbacks"""
+    options = {}
+    if _SUPPORTS_LANGUAGE_CODE:
+        options["language_code"] = service.language
+    return aai.RealtimeTranscriber(
+        sample_rate=16000,
+        on_data=service._on_data,
+        on_error=service._on_error,
+        on_open=service._on_open,
+        on_close=service._on_close,
+        encoding=aai.AudioEncoding.pcm_s16le,
+        **options
+    )
+
 
 class RealtimeVoiceService:
-    """Real-time voice transcription and TTS using AssemblyAI WebSocket"""
-    
-    def __init__(self):
-        self.transcriber: Optional[aai.RealtimeTranscriber] = None
+    """Real-time transcription for one WebSocket connection (AssemblyAI WebSocket)"""
+
+    def __init__(self, language: str = "hindi", factory: Callable = create_transcriber):
+        self.factory = factory
+        self.transcriber = None
         self.is_active = False
         self.on_transcript_callback: Optional[Callable] = None
         self.on_error_callback: Optional[Callable] = None
+        self.bridge: Optional[TranscriptBridge] = None
+        self.lag_ms: Optional[Deque[float]] = None
         self.language = "hi"  # Default to Hindi
-        
-        logger.info("🎤 Real-time Voice Service initialized")
-    
+        self.language_name = "hindi"
+        self.opened_at = 0.0
+        self.released_at = 0.0
+        self._connect_error: Optional[str] = None
+        self.set_language(language)
+
     def set_callbacks(
-        self, 
+        self,
         on_transcript: Callable[[str, bool], None],
         on_error: Optional[Callable[[str], None]] = None
     ):
         """
-        Set callback functions for transcription events
-        
+        Set callback functions for transcription events (call on the event
+        loop the callbacks should run on)
+
         Args:
             on_transcript: Called when transcript is received (text, is_final)
             on_error: Called when error occurs (error_message)
         """
+        self.clear_callbacks()
         self.on_transcript_callback = on_transcript
         self.on_error_callback = on_error
-    
+        self.bridge = TranscriptBridge(on_transcript, on_error, lag_ms=self.lag_ms)
+
+    def clear_callbacks(self):
+        """Detach from the WebSocket; transcripts arriving afterwards are dropped"""
+        if self.bridge:
+            self.bridge.close()
+            self.bridge = None
+        self.on_transcript_callback = None
+        self.on_error_callback = None
+
     def set_language(self, language: str):
         """
-        Set the language for transcription
-        
+        Set the language for transcription (applies to the next start())
+
         Args:
             language: Language code (hindi, english, etc.)
         """
-        lang_map = {
-            'hindi': 'hi',
-            'english': 'en',
-            'punjabi': 'pa',
-            'marathi': 'mr',
-            'gujarati': 'gu',
-            'tamil': 'ta',
-            'telugu': 'te',
-            'kannada': 'kn',
-            'bengali': 'bn'
-        }
-        self.language = lang_map.get(language, 'hi')
-        logger.info(f"Language set to: {language} ({self.language})")
-    
+        self.language_name = language if language in LANGUAGE_CODES else "hindi"
+        self.language = LANGUAGE_CODES[self.language_name]
+        logger.debug(f"Language set to: {language} ({self.language})")
+
     async def start(self):
-        """Start real-time transcription"""
+        """
+        Open the upstream connection
+
+        Raises:
+            RuntimeError: If AssemblyAI could not be reached
+        """
         if self.is_active:
             logger.warning("Real-time transcription already active")
             return
-        
+
+        self._connect_error = None
         try:
             logger.info("Starting AssemblyAI real-time transcription...")
-            
-            # Create transcriber configuration
-            self.transcriber = aai.RealtimeTranscriber(
-                sample_rate=16000,
-                on_data=self._on_data,
-                on_error=self._on_error,
-                on_open=self._on_open,
-                on_close=self._on_close,
-                language_code=self.language,
-                encoding=aai.AudioEncoding.pcm_s16le
-            )
-            
-            # Connect to AssemblyAI
-            self.transcriber.connect()
-            self.is_active = True
-            
-            logger.info("✅ Real-time transcription started")
-            
+            self.transcriber = self.factory(self)
+
+            # connect() blocks on the WebSocket handshake
+            await asyncio.to_thread(self.transcriber.connect)
         except Exception as e:
-            logger.error(f"Error starting real-time transcription: {str(e)}")
-            self.is_active = False
-            if self.on_error_callback:
-                await self.on_error_callback(str(e))
-    
+            self._connect_error = str(e)
+
+        if self._connect_error:
+            # The SDK reports handshake failures through on_error, not by raising
+            logger.error(f"Error starting real-time transcription: {self._connect_error}")
+            self.transcriber = None
+            raise RuntimeError(self._connect_error)
+
+        self.is_active = True
+        self.opened_at = time.monotonic()
+        logger.info("✅ Real-time transcription started")
+
     async def stop(self):
         """Stop real-time transcription"""
         if not self.is_active:
             return
-        
+
         try:
             logger.info("Stopping real-time transcription...")
-            
+
+            self.is_active = False
             if self.transcriber:
-                self.transcriber.close()
+                # close() joins the SDK's reader / writer threads
+                await asyncio.to_thread(self.transcriber.close)
                 self.transcriber = None
-            
-            self.is_active = False
+
             logger.info("✅ Real-time transcription stopped")
-            
+
         except Exception as e:
             logger.error(f"Error stopping real-time transcription: {str(e)}")
-    
+
+    def end_utterance(self):
+        """Ask AssemblyAI to finalize whatever audio it has buffered"""
+        if self.is_active and self.transcriber:
+            try:
+                self.transcriber.force_end_utterance()
+            except Exception as e:
+                logger.warning(f"Could not end utterance: {str(e)}")
+
     async def send_audio(self, audio_data: bytes):
         """
         Send audio data to AssemblyAI for transcription
-        
+
         Args:
             audio_data: Raw audio bytes (PCM 16-bit, 16kHz)
         """
         if not self.is_active or not self.transcriber:
             logger.warning("Transcriber not active, cannot send audio")
             return
-        
+
         try:
             self.transcriber.stream(audio_data)
         except Exception as e:
             logger.error(f"Error sending audio: {str(e)}")
             if self.on_error_callback:
                 await self.on_error_callback(str(e))
-    
+
+    def pending_writes(self) -> int:
+        """Audio chunks queued in the SDK but not yet written to AssemblyAI"""
+        # stream() only enqueues; the SDK's writer thread sends at the upstream's pace
+        impl = getattr(self.transcriber, "_impl", None)
+        write_queue = getattr(impl, "_write_queue", None)
+        return write_queue.qsize() if write_queue is not None else 0
+
     def _on_open(self, session_opened: aai.RealtimeSessionOpened):
         """Called when WebSocket connection is opened"""
         logger.info(f"✅ AssemblyAI session opened: {session_opened.session_id}")
-    
+
     def _on_data(self, transcript: aai.RealtimeTranscript):
-        """Called when transcript data is received"""
+        """Called (on the SDK reader thread) when transcript data is received"""
         if not transcript.text:
             return
-        
+
         try:
             is_final = isinstance(transcript, aai.RealtimeFinalTranscript)
-            
-            logger.info(f"{'📝 Final' if is_final else '👂 Partial'} transcript: {transcript.text}")
-            
-            # Call the callback if set
-            if self.on_transcript_callback:
-                asyncio.create_task(
-                    self.on_transcript_callback(transcript.text, is_final)
-                )
-        
+
+            logger.debug(f"{'📝 Final' if is_final else '👂 Partial'} transcript: {transcript.text}")
+
+            # Hand over to the event loop (no bridge: session released, drop it)
+            bridge = self.bridge
+            if bridge:
+                bridge.submit("final" if is_final else "partial", transcript.text)
+
         except Exception as e:
             logger.error(f"Error processing transcript: {str(e)}")
-    
+
     def _on_error(self, error: aai.RealtimeError):
         """Called when an error occurs"""
         logger.error(f"❌ AssemblyAI error: {error}")
-        
-        if self.on_error_callback:
-            asyncio.create_task(
-                self.on_error_callback(str(error))
-            )
-    
+
+        if not self.is_active:
+            self._connect_error = str(error)
+            return
+
+        bridge = self.bridge
+        if bridge:
+            bridge.submit("error", str(error))
+
     def _on_close(self):
         """Called when WebSocket connection is closed"""
         logger.info("AssemblyAI session closed")
         self.is_active = False
 
 
-# Global realtime voice service instance
-realtime_voice_service = RealtimeVoiceService()
+class RealtimeSessionManager:
+    """Per-connection transcribers with a pool of pre-opened upstream connections"""
+
+    def __init__(
+        self,
+        max_sessions: int = Config.REALTIME_MAX_SESSIONS,
+        pool_size: int = Config.REALTIME_POOL_SIZE,
+        reuse_grace_seconds: float = Config.REALTIME_REUSE_GRACE_SECONDS,
+        max_age_seconds: float = Config.REALTIME_CONNECTION_MAX_AGE_SECONDS,
+        factory: Callable = create_transcriber
+    ):
+        self.max_sessions = max_sessions
+        self.pool_size = pool_size
+        self.reuse_grace_seconds = reuse_grace_seconds
+        self.max_age_seconds = max_age_seconds
+        self.factory = factory
+
+        self._idle: Dict[str, Deque[RealtimeVoiceService]] = {}
+        self._active: Set[RealtimeVoiceService] = set()
+        self._reserved = 0
+        self._warm_languages: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()
+        self.stats = {
+            "acquired": 0, "pool_hits": 0, "opened": 0, "reused": 0,
+            "rejected": 0, "failed": 0, "closed": 0, "peak_active": 0
+        }
+        self._acquire_ms: Deque[float] = deque(maxlen=200)
+
+        # Transcript delivery: lag shared by all bridges, counters of released sessions
+        self._lag_ms: Deque[float] = deque(maxlen=1000)
+        self._delivery_totals = {"delivered": 0, "merged": 0, "dropped": 0, "overflow": 0, "max_depth": 0}
+
+    def _reusable(self, service: RealtimeVoiceService, now: float) -> bool:
+        return service.is_active and now - service.opened_at < self.max_age_seconds
+
+    def _take_idle(self, language: str) -> Optional[RealtimeVoiceService]:
+        """Oldest pooled connection whose previous session has drained"""
+        idle = self._idle.get(language)
+        if not idle:
+            return None
+        now = time.monotonic()
+        for service in list(idle):
+            if not self._reusable(service, now):
+                idle.remove(service)
+                self._spawn(self._close(service))
+                continue
+            if now - service.released_at < self.reuse_grace_seconds:
+                continue  # Still draining its previous session; try the next one
+            idle.remove(service)
+            return service
+        return None
+
+    async def _open(self, language: str) -> RealtimeVoiceService:
+        service = RealtimeVoiceService(language, factory=self.factory)
+        service.lag_ms = self._lag_ms
+        try:
+            await service.start()
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        self.stats["opened"] += 1
+        return service
+
+    async def _close(self, service: RealtimeVoiceService):
+        service.clear_callbacks()
+        await service.stop()
+        self.stats["closed"] += 1
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _replenish(self, language: str):
+        """Top the language's idle pool back up to pool_size"""
+        idle = self._idle.setdefault(language, deque())
+        missing = self.pool_size - len(idle)
+        if missing <= 0:
+            return
+        results = await asyncio.gather(*(self._open(language) for _ in range(missing)), return_exceptions=True)
+        for service in results:
+            if isinstance(service, RealtimeVoiceService):
+                idle.append(service)
+            else:
+                logger.warning(f"⚠️ Could not pre-open realtime connection ({language}): {service}")
+
+    async def warm_up(self, languages: List[str] = Config.REALTIME_WARM_LANGUAGES):
+        """Pre-open pool_size upstream connections for each language"""
+        if self.pool_size <= 0:
+            return
+        if self.factory is create_transcriber and not Config.ASSEMBLYAI_API_KEY:
+            return
+        self._warm_languages.update(languages)
+        await asyncio.gather(*(self._replenish(language) for language in languages))
+        idle = sum(len(self._idle.get(language, ())) for language in languages)
+        logger.info(f"✅ Realtime pool warmed ({idle} connections: {', '.join(languages)})")
+
+    async def acquire(
+        self,
+        language: str,
+        on_transcript: Callable[[str, bool], None],
+        on_error: Optional[Callable[[str], None]] = None
+    ) -> RealtimeVoiceService:
+        """
+        Get a started transcriber for one WebSocket connection
+
+        Raises:
+            RealtimeCapacityError: If max_sessions are already active
+            RuntimeError: If a new upstream connection could not be opened
+        """
+        if len(self._active) + self._reserved >= self.max_sessions:
+            self.stats["rejected"] += 1
+            raise RealtimeCapacityError("Voice service is busy, please try again shortly")
+
+        language = language if language in LANGUAGE_CODES else "hindi"
+        started = time.monotonic()
+        service = self._take_idle(language)
+        if service is not None:
+            self.stats["pool_hits"] += 1
+            if service.released_at:
+                self.stats["reused"] += 1
+        else:
+            # Hold the slot while the handshake runs
+            self._reserved += 1
+            try:
+                service = await self._open(language)
+            finally:
+                self._reserved -= 1
+
+        service.set_callbacks(on_transcript=on_transcript, on_error=on_error)
+        self._active.add(service)
+        self.stats["acquired"] += 1
+        self.stats["peak_active"] = max(self.stats["peak_active"], len(self._active))
+        self._acquire_ms.append((time.monotonic() - started) * 1000)
+
+        if language in self._warm_languages:
+            self._spawn(self._replenish(language))
+        return service
+
+    async def release(self, service: Optional[RealtimeVoiceService]):
+        """Detach a transcriber from its connection and pool or close it"""
+        if service is None or service not in self._active:
+            return
+        self._active.discard(service)
+        self._add_delivery_stats(self._delivery_totals, service.bridge)
+        service.clear_callbacks()
+
+        idle = self._idle.setdefault(service.language_name, deque())
+        if self._reusable(service, time.monotonic()) and len(idle) < self.pool_size:
+            # Flush the previous farmer's last utterance before anyone else gets it
+            service.end_utterance()
+            service.released_at = time.monotonic()
+            idle.append(service)
+        else:
+            await self._close(service)
+
+    async def close(self):
+        """Close every pooled and active connection"""
+        services = list(self._active) + [s for idle in self._idle.values() for s in idle]
+        self._active.clear()
+        self._idle.clear()
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*(self._close(service) for service in services), return_exceptions=True)
+
+    @staticmethod
+    def _add_delivery_stats(totals: Dict, bridge: Optional[TranscriptBridge]):
+        if bridge is None:
+            return
+        for key, value in bridge.stats.items():
+            totals[key] = max(totals[key], value) if key == "max_depth" else totals[key] + value
+
+    def get_delivery_stats(self) -> Dict:
+        """Transcript delivery across sessions: queue depth, lag, merged / dropped partials"""
+        delivery = dict(self._delivery_totals)
+        depths = []
+        for service in self._active:
+            self._add_delivery_stats(delivery, service.bridge)
+            if service.bridge:
+                depths.append(service.bridge.depth)
+        lag_ms = sorted(self._lag_ms)
+        return {
+            **delivery,
+            "queue_depth": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "lag_ms_p50": round(lag_ms[len(lag_ms) // 2], 2) if lag_ms else None,
+            "lag_ms_p95": round(lag_ms[int(len(lag_ms) * 0.95)], 2) if lag_ms else None,
+            "lag_ms_max": round(lag_ms[-1], 2) if lag_ms else None
+        }
+
+    def get_stats(self) -> Dict:
+        acquire_ms = sorted(self._acquire_ms)
+        return {
+            **self.stats,
+            "active": len(self._active),
+            "max_sessions": self.max_sessions,
+            "idle": {language: len(idle) for language, idle in self._idle.items()},
+            "acquire_ms_p50": round(acquire_ms[len(acquire_ms) // 2], 1) if acquire_ms else None,
+            "acquire_ms_max": round(acquire_ms[-1], 1) if acquire_ms else None,
+            "delivery": self.get_delivery_stats()
+        }
+
+
+# Global realtime session manager (one transcriber per WebSocket connection)
+realtime_sessions = RealtimeSessionManager()
@@ -0,0 +1,377 @@
+"""
+Government Scheme Eligibility Engine
+Compiles the rules in the government_schemes table (state, district, land
+size, crop and farmer category) into indexed predicates and evaluates them
+against a farmer profile or extracted query entities.
+
+The schemes agent only has to summarize the ranked matches instead of
+carrying a static scheme list in every prompt.
+"""
+
+import re
+import json
+import logging
+import time
+import unicodedata
+from typing import List, Dict, Optional, Set
+
+from config import Config
+from db import get_db_connection, get_placeholder
+
+logger = logging.getLogger(__name__)
+
+# Land holding categories (1 hectare = 2.47 acres)
+MARGINAL_MAX_ACRES = 2.47
+SMALL_MAX_ACRES = 4.94
+MEDIUM_MAX_ACRES = 24.7
+
+# Land units farmers use, in acres. A bigha differs by state; the common
+# north Indian one (about 0.62 acres) is assumed.
+LAND_UNIT_ACRES = {
+    unicodedata.normalize("NFC", unit): acres for unit, acres in {
+        "acre": 1.0, "acres": 1.0, "ac": 1.0, "एकड़": 1.0,
+        "hectare": 2.47, "hectares": 2.47, "ha": 2.47, "हेक्टेयर": 2.47,
+        "bigha": 0.62, "bighas": 0.62, "बीघा": 0.62, "बीघे": 0.62,
+        "kanal": 0.125, "kanals": 0.125, "कनाल": 0.125,
+        "guntha": 0.025, "gunthas": 0.025, "गुंठा": 0.025,
+    }.items()
+}
+
+# Common crop names in Hindi / transliteration mapped to English
+CROP_ALIASES = {
+    "गेहूं": "wheat", "गेहूँ": "wheat", "gehun": "wheat",
+    "धान": "rice", "चावल": "rice", "paddy": "rice", "dhan": "rice",
+    "मक्का": "maize", "makka": "maize", "corn": "maize",
+    "कपास": "cotton", "kapas": "cotton",
+    "सोयाबीन": "soybean", "soyabean": "soybean",
+    "गन्ना": "sugarcane", "ganna": "sugarcane",
+    "चना": "chickpea", "gram": "chickpea",
+    "सरसों": "mustard", "sarson": "mustard",
+    "आलू": "potato", "aloo": "potato",
+}
+
+
+def normalize_crop(crop: Optional[str]) -> str:
+    """Normalize a crop name to its lowercase English form"""
+    crop_lower = (crop or "").strip().lower()
+    return CROP_ALIASES.get(crop_lower, crop_lower)
+
+
+def _split_list(value) -> List[str]:
+    """Parse a TEXT[] / comma separated / JSON list column"""
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        items = value
+    else:
+        value = str(value).strip()
+        if value.startswith("["):
+            try:
+                items = json.loads(value)
+            except ValueError:
+                items = value.strip("[]").split(",")
+        else:
+            items = value.strip("{}").split(",")
+    return [str(item).strip().strip('"').lower() for item in items if str(item).strip()]
+
+
+def land_category(land_size_acres: Optional[float]) -> Optional[str]:
+    """Map land holding in acres to the standard farmer category"""
+    if land_size_acres is None:
+        return None
+    if land_size_acres <= MARGINAL_MAX_ACRES:
+        return "marginal"
+    if land_size_acres <= SMALL_MAX_ACRES:
+        return "small"
+    if land_size_acres <= MEDIUM_MAX_ACRES:
+        return "medium"
+    return "large"
+
+
+def _parse_acres(value) -> Optional[float]:
+    """
+    Land size entity ("2.5", 2.5, "3 acres", "2 hectare", "5 बीघा") as a
+    number of acres; None if missing or in a unit not in LAND_UNIT_ACRES
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    text = unicodedata.normalize("NFC", str(value or "")).lower()
+    match = re.search(r"\d+(?:\.\d+)?", text)
+    if not match:
+        return None
+    words = text[match.end():].split()
+    unit = words[0].strip(".,;:()") if words else ""
+    if not unit:
+        return float(match.group())
+    if unit not in LAND_UNIT_ACRES:
+        logger.debug(f"Unknown land unit in {value!r}")
+        return None
+    return round(float(match.group()) * LAND_UNIT_ACRES[unit], 2)
+
+
+class SchemeEligibilityEngine:
+    """Indexed eligibility rules over the government_schemes table"""
+
+    # Reload schemes from the database after this many seconds
+    refresh_seconds = 600
+
+    def __init__(self):
+        self.schemes: List[Dict] = []
+        self._state_index: Dict[Optional[str], Set[int]] = {}
+        self._crop_index: Dict[str, Set[int]] = {}
+        self._any_crop: Set[int] = set()
+        self._category_index: Dict[str, Set[int]] = {}
+        self._any_category: Set[int] = set()
+        self._loaded_at = 0.0
+
+    def _compile_rule(self, row: Dict) -> Dict:
+        """Turn a government_schemes row into a rule with explicit bounds"""
+        eligibility = (row.get("eligibility") or "").lower()
+
+        min_land = row.get("min_land_acres")
+        if min_land is None and ("landholding" in eligibility or "land holding" in eligibility
+                                 or "with land" in eligibility):
+            # "All landholding farmers" -> any non-zero holding
+            min_land = 0.01
+
+        return {
+            "scheme_id": row.get("scheme_id", row.get("id")),
+            "scheme_name": row.get("scheme_name", ""),
+            "scheme_name_hindi": row.get("scheme_name_hindi") or "",
+            "description": row.get("description") or "",
+            "description_hindi": row.get("description_hindi") or "",
+            "eligibility": row.get("eligibility") or "",
+            "how_to_apply": row.get("how_to_apply") or "",
+            "scheme_url": row.get("scheme_url") or "",
+            "state": (row.get("state") or "").strip().lower() or None,
+            "district": (row.get("district") or "").strip().lower() or None,
+            "min_land_acres": float(min_land) if min_land is not None else None,
+            "max_land_acres": float(row["max_land_acres"]) if row.get("max_land_acres") is not None else None,
+            "crops": [normalize_crop(c) for c in _split_list(row.get("eligible_crops"))],
+            "categories": _split_list(row.get("farmer_categories")),
+        }
+
+    def compile(self, rows: List[Dict]):
+        """
+        Build the rule list and its indexes
+
+        Args:
+            rows: government_schemes rows as dicts
+        """
+        schemes = [self._compile_rule(row) for row in rows]
+
+        state_index: Dict[Optional[str], Set[int]] = {}
+        crop_index: Dict[str, Set[int]] = {}
+        any_crop: Set[int] = set()
+        category_index: Dict[str, Set[int]] = {}
+        any_category: Set[int] = set()
+
+        for idx, scheme in enumerate(schemes):
+            state_index.setdefault(scheme["state"], set()).add(idx)
+
+            if scheme["crops"]:
+                for crop in scheme["crops"]:
+                    crop_index.setdefault(crop, set()).add(idx)
+            else:
+                any_crop.add(idx)
+
+            if scheme["categories"]:
+                for category in scheme["categories"]:
+                    category_index.setdefault(category, set()).add(idx)
+            else:
+                any_category.add(idx)
+
+        self.schemes = schemes
+        self._state_index = state_index
+        self._crop_index = crop_index
+        self._any_crop = any_crop
+        self._category_index = category_index
+        self._any_category = any_category
+        self._loaded_at = time.monotonic()
+
+        logger.info(f"✅ Compiled eligibility rules for {len(schemes)} schemes")
+
+    def load(self, force: bool = False) -> bool:
+        """Load active schemes from the database (cached for refresh_seconds)"""
+        if not force and self.schemes and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return True
+
+        conn = None
+        cur = None
+        try:
+            conn = get_db_connection()
+            cur = conn.cursor()
+            cur.execute("SELECT * FROM government_schemes WHERE active = TRUE")
+            columns = [col[0] for col in cur.description]
+            rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+            self.compile(rows)
+            return True
+        except Exception as e:
+            logger.error(f"Error loading government schemes: {str(e)}")
+            return bool(self.schemes)
+        finally:
+            if cur:
+                cur.close()
+            if conn:
+                conn.close()
+
+    def get_farmer_profile(self, farmer_id: int) -> Dict:
+        """Fetch the eligibility-relevant fields of a registered farmer"""
+        conn = None
+        cur = None
+        try:
+            # The SQLite test schema names the primary key "id"
+            key_column = "id" if getattr(Config, 'DB_TYPE', 'postgresql') == 'sqlite' else "farmer_id"
+            conn = get_db_connection()
+            cur = conn.cursor()
+            cur.execute(f"""
+                SELECT district, state, land_size_acres, primary_crops
+                FROM farmers WHERE {key_column} = {get_placeholder()}
+            """, (farmer_id,))
+            row = cur.fetchone()
+            if not row:
+                return {}
+            return {
+                "district": row[0],
+                "state": row[1],
+                "land_size_acres": float(row[2]) if row[2] is not None else None,
+                "crops": _split_list(row[3]),
+            }
+        except Exception as e:
+            logger.error(f"Error loading farmer profile {farmer_id}: {str(e)}")
+            return {}
+        finally:
+            if cur:
+                cur.close()
+            if conn:
+                conn.close()
+
+    def evaluate(self, profile: Dict, limit: int = 5) -> List[int]:
+        """
+        Evaluate compiled predicates against a profile
+
+        Args:
+            profile: Dict with optional state, district, land_size_acres,
+                crops (list) and categories (list)
+            limit: Maximum number of schemes to return
+
+        Returns:
+            Indexes into self.schemes, best match first
+        """
+        state = (profile.get("state") or "").strip().lower() or None
+        district = (profile.get("district") or "").strip().lower() or None
+        land = profile.get("land_size_acres")
+        crops = {normalize_crop(c) for c in profile.get("crops", []) if c}
+        categories = {c.lower() for c in profile.get("categories", []) if c}
+        derived_category = land_category(land)
+        if derived_category:
+            categories.add(derived_category)
+
+        # State predicate via index: national schemes + the farmer's state
+        candidates = set(self._state_index.get(None, set()))
+        if state:
+            candidates |= self._state_index.get(state, set())
+
+        # Crop predicate: unrestricted schemes, plus ones listing the crop.
+        # Without a known crop, crop-restricted schemes are still shown.
+        if crops:
+            crop_ok = set(self._any_crop)
+            for crop in crops:
+                crop_ok |= self._crop_index.get(crop, set())
+            candidates &= crop_ok
+
+        # Category predicate, only enforced when the category is known
+        if categories:
+            category_ok = set(self._any_category)
+            for category in categories:
+                category_ok |= self._category_index.get(category, set())
+            candidates &= category_ok
+
+        ranked = []
+        for idx in candidates:
+            scheme = self.schemes[idx]
+
+            if scheme["district"] and district and scheme["district"] != district:
+                continue
+            if land is not None:
+                if scheme["min_land_acres"] is not None and land < scheme["min_land_acres"]:
+                    continue
+                if scheme["max_land_acres"] is not None and land > scheme["max_land_acres"]:
+                    continue
+
+            # More specific matches rank higher
+            score = 0
+            if scheme["district"]:
+                score += 4
+            if scheme["state"]:
+                score += 3
+            if scheme["crops"] and crops & set(scheme["crops"]):
+                score += 2
+            if scheme["categories"] and categories & set(scheme["categories"]):
+                score += 2
+            if scheme["max_land_acres"] is not None:
+                score += 1
+            ranked.append((-score, scheme["scheme_name"], idx))
+
+        ranked.sort()
+        return [idx for _, _, idx in ranked[:limit]]
+
+    def localize(self, scheme: Dict, language: str = "hindi") -> Dict:
+        """Pick the language-specific name and description for a scheme"""
+        use_hindi = language == "hindi"
+        return {
+            "scheme_id": scheme["scheme_id"],
+            "name": (scheme["scheme_name_hindi"] if use_hindi else "") or scheme["scheme_name"],
+            "description": (scheme["description_hindi"] if use_hindi else "") or scheme["description"],
+            "eligibility": scheme["eligibility"],
+            "how_to_apply": scheme["how_to_apply"],
+            "url": scheme["scheme_url"],
+        }
+
+    def match(
+        self,
+        farmer_id: Optional[int] = None,
+        entities: Optional[Dict] = None,
+        location: Optional[Dict] = None,
+        language: str = "hindi",
+        limit: int = 5
+    ) -> List[Dict]:
+        """
+        Find ranked eligible schemes for a farmer or a query
+
+        Args:
+            farmer_id: Registered farmer (profile values take priority)
+            entities: Entities extracted by the query understanding agent
+            location: Location dict from the agent state
+            language: Response language for localized fields
+            limit: Maximum number of schemes
+
+        Returns:
+            List of localized scheme dicts
+        """
+        if not self.load():
+            return []
+
+        entities = entities or {}
+        location = location or {}
+
+        profile = {
+            "state": location.get("state"),
+            "district": location.get("district"),
+            "land_size_acres": _parse_acres(entities.get("land_size_acres")),
+            "crops": [entities["crop"]] if entities.get("crop") else [],
+            "categories": [str(entities["category"]).strip()] if entities.get("category") else [],
+        }
+        if farmer_id:
+            farmer = self.get_farmer_profile(farmer_id)
+            for key, value in farmer.items():
+                if key == "crops":
+                    profile["crops"] = list(set(profile["crops"]) | set(value))
+                elif value is not None:
+                    profile[key] = value
+
+        return [self.localize(self.schemes[idx], language) for idx in self.evaluate(profile, limit)]
+
+
+# Global scheme eligibility engine instance
+scheme_eligibility_engine = SchemeEligibilityEngine()
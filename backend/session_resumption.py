@@ -0,0 +1,267 @@
+"""
+Resumable /ws/voice Sessions
+Rural connections drop mid-answer. Instead of writing to the WebSocket
+directly, the endpoint sends through the session's ResumableChannel: every
+outbound frame gets the next sequence number (JSON frames carry it as "seq";
+a binary frame takes the number after the JSON frame before it) and is kept
+in a bounded replay buffer until the client acknowledges it.
+
+When the connection drops the channel is detached, not closed: the answer in
+flight keeps running and its frames are buffered. A client that reconnects
+within WS_RESUME_TTL_SECONDS and starts with
+
+    {"type": "start", "session_id": "...", "last_seq": n, ...}
+
+gets every buffered frame after n replayed (with their original seq) before
+"started", so the farmer does not have to ask again. Clients acknowledge
+with {"type": "ack", "seq": n} to free the buffer early. If the buffer had
+to evict frames the client never saw, "started" says "replay_gap": true.
+
+Clients that never ack (v1 clients) would pin a full buffer per session, so
+while such a client is connected only WS_REPLAY_UNACKED_MAX_BYTES of
+delivered frames are kept. A client opts in to the full buffer by sending an
+ack or resuming with last_seq; frames buffered while detached always get it.
+
+A background sweeper expires detached channels every
+SESSION_SWEEP_INTERVAL_SECONDS, so their buffers and answers in flight do not
+wait for the next connection to be released.
+"""
+
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ResumableChannel:
+    """Sequence-numbered outbound frames of one session, replayable after a reconnect"""
+
+    def __init__(
+        self,
+        session_id: str,
+        max_frames: int = Config.WS_REPLAY_MAX_FRAMES,
+        max_bytes: int = Config.WS_REPLAY_MAX_BYTES,
+        max_unacked_bytes: int = Config.WS_REPLAY_UNACKED_MAX_BYTES
+    ):
+        self.session_id = session_id
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self.max_unacked_bytes = max_unacked_bytes
+        self.acks = False  # Client acks or resumes: keep the full replay buffer
+        self.websocket = None
+        self.detached_at = time.monotonic()
+        self.turns = None  # The session's TurnManager, shared by its connections
+
+        self.seq = 0
+        self._evicted_through = 0  # Highest seq dropped before it was acknowledged
+        # (seq, payload, size) with payload a JSON string or bytes
+        self._frames: Deque[Tuple[int, Any, int]] = deque()
+        self._bytes = 0
+        self._lock = asyncio.Lock()
+        self.stats = {"frames": 0, "buffered_while_detached": 0, "replayed": 0, "evicted": 0}
+
+    @property
+    def buffered_frames(self) -> int:
+        return len(self._frames)
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._bytes
+
+    async def send_json(self, message: Dict):
+        """Send a JSON frame (with "seq"), or buffer it if the client is away"""
+        async with self._lock:
+            self.seq += 1
+            text = json.dumps({**message, "seq": self.seq}, separators=(",", ":"), ensure_ascii=False)
+            await self._send(text, len(text.encode("utf-8")))
+
+    async def send_bytes(self, data: bytes):
+        """Send a binary frame, or buffer it if the client is away"""
+        async with self._lock:
+            self.seq += 1
+            await self._send(data, len(data))
+
+    async def _send(self, payload, size: int):
+        self._frames.append((self.seq, payload, size))
+        self._bytes += size
+        self.stats["frames"] += 1
+        # A connected client that never acks only gets a short tail kept
+        max_bytes = self.max_bytes if self.acks or self.websocket is None else self.max_unacked_bytes
+        while self._frames and (len(self._frames) > self.max_frames or self._bytes > max_bytes):
+            seq, _, dropped = self._frames.popleft()
+            self._bytes -= dropped
+            self._evicted_through = seq
+            self.stats["evicted"] += 1
+
+        if self.websocket is None:
+            self.stats["buffered_while_detached"] += 1
+            return
+        try:
+            await self._write(self.websocket, payload)
+        except Exception as e:
+            # The connection is gone; the frame stays buffered for a resume
+            logger.info(f"📴 Session {self.session_id} lost its connection: {str(e)}")
+            self._detach()
+
+    @staticmethod
+    async def _write(websocket, payload):
+        if isinstance(payload, str):
+            await websocket.send_text(payload)
+        else:
+            await websocket.send_bytes(payload)
+
+    def ack(self, seq: int):
+        """Forget frames the client has received"""
+        self.acks = True
+        self._forget(seq)
+
+    def _forget(self, seq: int):
+        while self._frames and self._frames[0][0] <= seq:
+            _, _, size = self._frames.popleft()
+            self._bytes -= size
+
+    async def attach(self, websocket, last_seq: int = 0) -> Tuple[int, bool]:
+        """
+        Make websocket this session's connection, replaying frames after last_seq
+
+        Returns:
+            (frames replayed, whether frames after last_seq were already evicted)
+        """
+        async with self._lock:
+            self._forget(last_seq)
+            gap = last_seq < self._evicted_through
+            replayed = 0
+            for _, payload, _ in list(self._frames):
+                await self._write(websocket, payload)
+                replayed += 1
+            self.websocket = websocket
+            self.stats["replayed"] += replayed
+        return replayed, gap
+
+    def detach(self, websocket):
+        """The connection closed; keep buffering for a resume"""
+        if self.websocket is websocket:
+            self._detach()
+
+    def _detach(self):
+        self.websocket = None
+        self.detached_at = time.monotonic()
+
+
+class ResumableSessionRegistry:
+    """Channels of this worker's sessions, kept for a while after their connection drops"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = Config.WS_RESUME_TTL_SECONDS,
+        sweep_interval_seconds: float = Config.SESSION_SWEEP_INTERVAL_SECONDS
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._channels: Dict[str, ResumableChannel] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        self.stats = {
+            "opened": 0, "resumed": 0, "resume_misses": 0, "expired": 0, "replayed_frames": 0, "replay_gaps": 0
+        }
+
+    async def open(self, session_id: str, resume: bool = False) -> Tuple[ResumableChannel, bool]:
+        """
+        Channel for a starting connection
+
+        Args:
+            session_id: Session from the start message
+            resume: The client asked to resume (sent last_seq)
+
+        Returns:
+            (channel, whether an existing channel was resumed)
+        """
+        await self.sweep()
+        channel = self._channels.get(session_id)
+        if channel and resume:
+            self.stats["resumed"] += 1
+            channel.acks = True
+            return channel, True
+
+        if resume:
+            # Expired, or started on another worker: the client starts over
+            self.stats["resume_misses"] += 1
+        if channel:
+            await self._cancel_turn(channel, "replaced")
+        channel = ResumableChannel(session_id)
+        self._channels[session_id] = channel
+        self.stats["opened"] += 1
+        return channel, False
+
+    async def attach(self, channel: ResumableChannel, websocket, last_seq: int = 0) -> Tuple[int, bool]:
+        """Attach a connection to its channel (see ResumableChannel.attach)"""
+        replayed, gap = await channel.attach(websocket, last_seq)
+        self.stats["replayed_frames"] += replayed
+        if gap:
+            self.stats["replay_gaps"] += 1
+        if replayed:
+            logger.info(f"🔁 Session {channel.session_id} resumed, {replayed} frames replayed")
+        return replayed, gap
+
+    async def close(self, session_id: Optional[str]):
+        """Client ended the session: cancel its answer in flight and drop the buffer"""
+        channel = self._channels.pop(session_id, None) if session_id else None
+        if channel:
+            await self._cancel_turn(channel, "stopped")
+
+    async def sweep(self) -> int:
+        """Drop channels whose connection has been gone longer than the TTL; returns the number dropped"""
+        now = time.monotonic()
+        expired = [
+            session_id for session_id, channel in self._channels.items()
+            if channel.websocket is None and now - channel.detached_at > self.ttl_seconds
+        ]
+        for session_id in expired:
+            channel = self._channels.pop(session_id)
+            self.stats["expired"] += 1
+            logger.info(f"⌛ Resumable session {session_id} expired with {channel.buffered_frames} frames unsent")
+            await self._cancel_turn(channel, "expired")
+        return len(expired)
+
+    async def _sweep_periodically(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Resumable session sweep failed: {str(e)}")
+
+    def start_sweeper(self):
+        """Start the background sweeper (call on the server's event loop)"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_periodically())
+
+    async def stop_sweeper(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+
+    @staticmethod
+    async def _cancel_turn(channel: ResumableChannel, reason: str):
+        if channel.turns:
+            await channel.turns.cancel(reason)
+
+    def get_stats(self) -> Dict:
+        channels = list(self._channels.values())
+        return {
+            **self.stats,
+            "sessions": len(channels),
+            "detached": sum(1 for channel in channels if channel.websocket is None),
+            "buffered_frames": sum(channel.buffered_frames for channel in channels),
+            "buffered_bytes": sum(channel.buffered_bytes for channel in channels)
+        }
+
+
+# Global registry of resumable /ws/voice sessions
+resumable_sessions = ResumableSessionRegistry()
@@ -0,0 +1,157 @@
+"""
+Bounded In-Memory Session Store
+Replaces the plain dict of SessionData that grew for as long as the worker
+ran. SessionStore is a drop-in MutableMapping with limits:
+
+    idle TTL     a session unused for SESSION_IDLE_TTL_SECONDS (counted from
+                 the later of its last_activity and its last lookup) is gone
+    session cap  past SESSION_MAX the least recently used session is evicted
+    history cap  conversation_history keeps the last SESSION_MAX_HISTORY_TURNS
+                 turns (trimmed on lookup and by the sweeper)
+
+A background sweeper drops idle sessions every SESSION_SWEEP_INTERVAL_SECONDS
+so memory stays flat even for sessions nobody looks up again. get_stats()
+reports counts and an estimate of the bytes held.
+"""
+
+import sys
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterator, MutableMapping, Optional
+
+from config import Config
+from models import SessionData
+
+logger = logging.getLogger(__name__)
+
+SESSION_OVERHEAD_BYTES = 1200  # SessionData instance, its fields and the store's entry
+
+
+def _activity_time(session: SessionData) -> float:
+    """last_activity (naive local ISO time) as a Unix timestamp; 0 if unparseable"""
+    try:
+        return datetime.fromisoformat(session.last_activity).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def estimate_session_bytes(session: SessionData) -> int:
+    """Rough memory held by one session, dominated by its conversation history"""
+    size = SESSION_OVERHEAD_BYTES
+    for turn in session.conversation_history:
+        size += sys.getsizeof(turn) + sum(sys.getsizeof(value) for value in turn.values())
+    if session.location:
+        size += sys.getsizeof(session.location) + sum(sys.getsizeof(value) for value in session.location.values())
+    return size
+
+
+class SessionStore(MutableMapping[str, SessionData]):
+    """session_id -> SessionData with idle TTL, LRU cap and history cap"""
+
+    def __init__(
+        self,
+        max_sessions: int = Config.SESSION_MAX,
+        idle_ttl_seconds: float = Config.SESSION_IDLE_TTL_SECONDS,
+        max_history_turns: int = Config.SESSION_MAX_HISTORY_TURNS,
+        sweep_interval_seconds: float = Config.SESSION_SWEEP_INTERVAL_SECONDS
+    ):
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_history_turns = max_history_turns
+        self.sweep_interval_seconds = sweep_interval_seconds
+        # session_id -> (session, last lookup as Unix time), least recently used first
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.stats = {"created": 0, "expired": 0, "evicted": 0, "deleted": 0, "history_trimmed": 0, "sweeps": 0}
+
+    def _expired(self, session: SessionData, seen_at: float, now: float) -> bool:
+        return now - max(seen_at, _activity_time(session)) > self.idle_ttl_seconds
+
+    def _trim(self, session: SessionData):
+        history = session.conversation_history
+        if len(history) > self.max_history_turns:
+            self.stats["history_trimmed"] += len(history) - self.max_history_turns
+            del history[:len(history) - self.max_history_turns]
+
+    def __getitem__(self, session_id: str) -> SessionData:
+        entry = self._sessions[session_id]
+        now = time.time()
+        if self._expired(entry[0], entry[1], now):
+            del self._sessions[session_id]
+            self.stats["expired"] += 1
+            raise KeyError(session_id)
+        entry[1] = now
+        self._sessions.move_to_end(session_id)
+        self._trim(entry[0])
+        return entry[0]
+
+    def __setitem__(self, session_id: str, session: SessionData):
+        if session_id in self._sessions:
+            self._sessions.move_to_end(session_id)
+        else:
+            self.stats["created"] += 1
+        self._sessions[session_id] = [session, time.time()]
+        self._trim(session)
+        while len(self._sessions) > self.max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            self.stats["evicted"] += 1
+            logger.debug(f"Session {evicted} evicted (LRU)")
+
+    def __delitem__(self, session_id: str):
+        del self._sessions[session_id]
+        self.stats["deleted"] += 1
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._sessions))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def sweep(self) -> int:
+        """Drop idle sessions and trim histories; returns the number dropped"""
+        now = time.time()
+        expired = [
+            session_id for session_id, (session, seen_at) in self._sessions.items()
+            if self._expired(session, seen_at, now)
+        ]
+        for session_id in expired:
+            del self._sessions[session_id]
+        for session, _ in self._sessions.values():
+            self._trim(session)
+        self.stats["expired"] += len(expired)
+        self.stats["sweeps"] += 1
+        if expired:
+            logger.info(f"🧹 Swept {len(expired)} idle sessions, {len(self._sessions)} left")
+        return len(expired)
+
+    async def _sweep_periodically(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Session sweep failed: {str(e)}")
+
+    def start_sweeper(self):
+        """Start the background sweeper (call on the server's event loop)"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_periodically())
+
+    async def stop_sweeper(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+
+    def get_stats(self) -> Dict:
+        sessions = [session for session, _ in self._sessions.values()]
+        return {
+            **self.stats,
+            "sessions": len(sessions),
+            "max_sessions": self.max_sessions,
+            "history_turns": sum(len(session.conversation_history) for session in sessions),
+            "estimated_bytes": sum(estimate_session_bytes(session) for session in sessions)
+        }
@@ -0,0 +1,366 @@
+"""
+District Soil Health Store
+Columnar store of Soil Health Card sample values (pH, EC, OC, N, P, K and
+micronutrients) keyed by state and district.
+
+Layout: one float32 column per parameter holding every sample, grouped by
+district and sorted within each district, plus an offsets array marking each
+district's slice. Lookups are a dict hit plus array slicing; percentiles are
+read straight from the sorted slice. Saved as a single .npz file.
+
+Ingest bulk CSV exports:
+    python soil_health_store.py ingest shc_mp.csv shc_rj.csv
+"""
+
+import os
+import csv
+import sys
+import logging
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Parameter -> (unit, accepted CSV column names)
+PARAMETERS = {
+    "ph": ("", ["ph", "soil_ph"]),
+    "ec": ("dS/m", ["ec", "electrical_conductivity"]),
+    "oc": ("%", ["oc", "organic_carbon"]),
+    "n": ("kg/ha", ["n", "nitrogen", "available_n"]),
+    "p": ("kg/ha", ["p", "phosphorus", "available_p"]),
+    "k": ("kg/ha", ["k", "potassium", "available_k"]),
+    "s": ("ppm", ["s", "sulphur", "sulfur"]),
+    "zn": ("ppm", ["zn", "zinc"]),
+    "fe": ("ppm", ["fe", "iron"]),
+    "cu": ("ppm", ["cu", "copper"]),
+    "mn": ("ppm", ["mn", "manganese"]),
+    "b": ("ppm", ["b", "boron"]),
+}
+
+# Soil Health Card rating limits: (low below, high above)
+RATING_LIMITS = {
+    "oc": (0.5, 0.75),
+    "n": (280, 560),
+    "p": (10, 25),
+    "k": (110, 280),
+    "s": (10, 20),
+    "zn": (0.6, 1.2),
+    "fe": (4.5, 9.0),
+    "cu": (0.2, 0.4),
+    "mn": (2.0, 4.0),
+    "b": (0.5, 1.0),
+}
+
+PARAMETER_NAMES_HINDI = {
+    "ph": "पीएच", "ec": "विद्युत चालकता", "oc": "जैविक कार्बन", "n": "नाइट्रोजन",
+    "p": "फॉस्फोरस", "k": "पोटाश", "s": "सल्फर", "zn": "जिंक", "fe": "आयरन",
+    "cu": "कॉपर", "mn": "मैंगनीज", "b": "बोरॉन",
+}
+
+RATINGS_HINDI = {"low": "कम", "medium": "मध्यम", "high": "अधिक",
+                 "acidic": "अम्लीय", "neutral": "सामान्य", "alkaline": "क्षारीय",
+                 "normal": "सामान्य", "saline": "लवणीय"}
+
+
+def make_key(state: Optional[str], district: Optional[str]) -> str:
+    """Store key for a state / district pair"""
+    return f"{(state or '').strip().lower()}|{(district or '').strip().lower()}"
+
+
+def rate(parameter: str, value: float) -> str:
+    """Soil Health Card rating for a parameter value"""
+    if parameter == "ph":
+        return "acidic" if value < 6.5 else "alkaline" if value > 7.5 else "neutral"
+    if parameter == "ec":
+        return "saline" if value > 1.0 else "normal"
+    low, high = RATING_LIMITS[parameter]
+    return "low" if value < low else "high" if value > high else "medium"
+
+
+class SoilHealthStore:
+    """Columnar district soil health sample store with percentile queries"""
+
+    def __init__(self, path: str = Config.SOIL_HEALTH_STORE_PATH):
+        self.path = path
+        self.keys: List[str] = []
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.columns: Dict[str, np.ndarray] = {}
+        self._key_index: Dict[str, int] = {}
+        self._district_index: Dict[str, List[int]] = {}
+        self._loaded = False
+        self._missing_logged = False
+        self._failed_mtime: Optional[float] = None
+
+    def load(self) -> bool:
+        """
+        Load the .npz store (once it has been read successfully); returns
+        False if no data is available
+
+        A missing file is checked again on the next call, and a file that
+        failed to load is retried once it has been rewritten.
+        """
+        if self._loaded:
+            return bool(self.keys)
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            if not self._missing_logged:
+                logger.warning(f"Soil health store not found: {self.path}")
+                self._missing_logged = True
+            return False
+        if mtime == self._failed_mtime:
+            return False
+
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                keys = [str(key) for key in data["keys"]]
+                offsets = data["offsets"]
+                columns = {name: data[name] for name in PARAMETERS if name in data.files}
+            self._set(keys, offsets, columns)
+            self._loaded = True
+            logger.info(f"✅ Soil health store loaded: {len(keys)} districts, {int(offsets[-1])} samples")
+            return True
+        except Exception as e:
+            self._failed_mtime = mtime
+            logger.error(f"Error loading soil health store: {str(e)}")
+            return False
+
+    def _set(self, keys: List[str], offsets: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.keys = keys
+        self.offsets = offsets
+        self.columns = columns
+        self._key_index = {key: i for i, key in enumerate(keys)}
+        # District-only lookups for callers without a state
+        district_index: Dict[str, List[int]] = {}
+        for i, key in enumerate(keys):
+            district_index.setdefault(key.split("|", 1)[1], []).append(i)
+        self._district_index = district_index
+
+    def save(self):
+        """Write the store to self.path"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        np.savez(self.path, keys=np.array(self.keys), offsets=self.offsets, **self.columns)
+        logger.info(f"✅ Soil health store saved: {self.path}")
+
+    def _samples_by_key(self) -> Dict[str, Dict[str, List[float]]]:
+        """Expand the current store back to per-district sample lists"""
+        samples = {}
+        for i, key in enumerate(self.keys):
+            start, end = self.offsets[i], self.offsets[i + 1]
+            samples[key] = {
+                name: column[start:end][~np.isnan(column[start:end])].tolist()
+                for name, column in self.columns.items()
+            }
+        return samples
+
+    def build(self, samples: Dict[str, Dict[str, List[float]]]):
+        """
+        Build the columnar layout from per-district sample lists
+
+        Args:
+            samples: {"state|district": {"ph": [...], "n": [...], ...}}
+        """
+        keys = sorted(samples)
+        counts = [max((len(values) for values in samples[key].values()), default=0) for key in keys]
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+
+        columns = {}
+        for name in PARAMETERS:
+            column = np.full(int(offsets[-1]), np.nan, dtype=np.float32)
+            for i, key in enumerate(keys):
+                values = np.asarray(samples[key].get(name, []), dtype=np.float32)
+                # Sorted per district, NaN-padded to the slice length, so
+                # percentile ranks are a searchsorted on the slice
+                column[offsets[i]:offsets[i] + len(values)] = np.sort(values)
+            columns[name] = column
+
+        self._set(keys, offsets, columns)
+        self._loaded = True
+
+    def ingest_csv(self, paths: List[str], append: bool = True) -> Dict:
+        """
+        Load bulk Soil Health Card CSV exports into the store
+
+        Needs state and district columns; parameter columns are matched by
+        the names in PARAMETERS (case-insensitive), blanks are skipped.
+
+        Args:
+            paths: CSV files to ingest
+            append: Keep samples already in the store
+
+        Returns:
+            Ingest summary
+        """
+        if append:
+            self.load()
+        samples = self._samples_by_key() if append and self.keys else {}
+        rows = 0
+        skipped = 0
+
+        for path in paths:
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                reader = csv.DictReader(f)
+                header = {name.strip().lower(): name for name in (reader.fieldnames or [])}
+                column_map = {}
+                for name, (_, aliases) in PARAMETERS.items():
+                    for alias in aliases:
+                        if alias in header:
+                            column_map[name] = header[alias]
+                            break
+
+                for row in reader:
+                    state = row.get(header.get("state", ""), "")
+                    district = row.get(header.get("district", ""), "")
+                    if not district:
+                        skipped += 1
+                        continue
+
+                    district_samples = samples.setdefault(make_key(state, district), {})
+                    for name, column in column_map.items():
+                        try:
+                            value = float(row[column])
+                        except (TypeError, ValueError):
+                            continue
+                        district_samples.setdefault(name, []).append(value)
+                    rows += 1
+
+        self.build(samples)
+        self.save()
+        summary = {"rows": rows, "skipped": skipped, "districts": len(self.keys)}
+        logger.info(f"✅ Soil health CSV ingest: {summary}")
+        return summary
+
+    def _find(self, district: Optional[str], state: Optional[str] = None) -> Optional[int]:
+        if not self.load():
+            return None
+        idx = self._key_index.get(make_key(state, district))
+        if idx is not None:
+            return idx
+        matches = self._district_index.get((district or "").strip().lower(), [])
+        return matches[0] if len(matches) == 1 else None
+
+    def _slice(self, idx: int, parameter: str) -> np.ndarray:
+        values = self.columns[parameter][self.offsets[idx]:self.offsets[idx + 1]]
+        return values[~np.isnan(values)]
+
+    def percentile(
+        self,
+        district: str,
+        parameter: str,
+        q,
+        state: Optional[str] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Percentile(s) of a parameter across a district's samples
+
+        Args:
+            district: District name
+            parameter: Key from PARAMETERS (e.g. "ph", "zn")
+            q: Percentile or list of percentiles (0-100)
+            state: State name (optional)
+
+        Returns:
+            Percentile value(s), or None if there is no data
+        """
+        idx = self._find(district, state)
+        if idx is None or parameter not in self.columns:
+            return None
+        values = self._slice(idx, parameter)
+        if not len(values):
+            return None
+        return np.percentile(values, q)
+
+    def percentile_rank(
+        self,
+        district: str,
+        parameter: str,
+        value: float,
+        state: Optional[str] = None
+    ) -> Optional[float]:
+        """Where a farmer's own test value falls within the district (0-100)"""
+        idx = self._find(district, state)
+        if idx is None or parameter not in self.columns:
+            return None
+        values = self._slice(idx, parameter)
+        if not len(values):
+            return None
+        # Slices are stored sorted
+        return float(100.0 * np.searchsorted(values, value, side="right") / len(values))
+
+    def get_district_summary(self, district: str, state: Optional[str] = None) -> Optional[Dict]:
+        """
+        Median, quartiles, rating and deficiency share per parameter
+
+        Args:
+            district: District name
+            state: State name (optional)
+
+        Returns:
+            Summary dict or None if the district is not in the store
+        """
+        idx = self._find(district, state)
+        if idx is None:
+            return None
+
+        key_state, key_district = self.keys[idx].split("|", 1)
+        parameters = {}
+        for name, (unit, _) in PARAMETERS.items():
+            if name not in self.columns:
+                continue
+            values = self._slice(idx, name)
+            if not len(values):
+                continue
+            p25, median, p75 = np.percentile(values, [25, 50, 75])
+            entry = {
+                "median": round(float(median), 2),
+                "p25": round(float(p25), 2),
+                "p75": round(float(p75), 2),
+                "unit": unit,
+                "samples": int(len(values)),
+                "rating": rate(name, float(median)),
+            }
+            if name in RATING_LIMITS:
+                entry["deficient_pct"] = round(
+                    100.0 * np.searchsorted(values, RATING_LIMITS[name][0]) / len(values), 1
+                )
+            parameters[name] = entry
+
+        return {
+            "district": key_district,
+            "state": key_state,
+            "samples": int(self.offsets[idx + 1] - self.offsets[idx]),
+            "parameters": parameters,
+        }
+
+    def format_summary(self, summary: Optional[Dict], language: str = "hindi") -> str:
+        """Compact one-line-per-parameter text for agent prompts"""
+        if not summary or not summary.get("parameters"):
+            return ""
+        use_hindi = language == "hindi"
+        lines = []
+        for name, entry in summary["parameters"].items():
+            label = PARAMETER_NAMES_HINDI[name] if use_hindi else name.upper()
+            rating = RATINGS_HINDI.get(entry["rating"], entry["rating"]) if use_hindi else entry["rating"]
+            line = f"{label}: {entry['median']} {entry['unit']} ({rating})".replace("  ", " ")
+            if entry.get("deficient_pct"):
+                line += f", {entry['deficient_pct']}% " + ("नमूनों में कमी" if use_hindi else "samples deficient")
+            lines.append(line)
+        return "\n".join(lines)
+
+
+# Global soil health store instance
+soil_health_store = SoilHealthStore()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) > 2 and sys.argv[1] == "ingest":
+        print(soil_health_store.ingest_csv(sys.argv[2:]))
+    else:
+        district = sys.argv[1] if len(sys.argv) > 1 else "indore"
+        print(soil_health_store.get_district_summary(district))
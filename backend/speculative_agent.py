@@ -0,0 +1,216 @@
+"""
+Speculative Query Understanding for /ws/voice
+AssemblyAI marks a transcript final only after its end-of-utterance silence,
+so the graph used to start that much later than the farmer stopped talking.
+SpeculativeRunner starts the work early: once a partial transcript has been
+unchanged for SPECULATION_STABLE_MS it runs query_understanding_agent on it
+and prefetches the data its query type needs (current weather, mandi prices).
+
+When the final transcript arrives:
+    same text (ignoring case and punctuation) -> hit: the classification and
+        prefetched data are merged into the graph state, and the graph's
+        query_understanding step and API fetches are skipped
+    different text -> miss: the speculation is cancelled and the graph runs
+        from scratch
+A speculation whose partial changes before the final is cancelled at once.
+
+The classification calls the LLM synchronously in a worker thread, which a
+cancel cannot interrupt: the call runs to the end and its result is dropped.
+wasted_ms counts speculation time up to the cancel; the time the LLM call
+kept running after it is counted separately as llm_overrun_ms (see
+turn_manager.BlockingWork).
+"""
+
+import time
+import asyncio
+import logging
+import unicodedata
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from config import Config
+from turn_manager import BlockingWork, current_work
+
+logger = logging.getLogger(__name__)
+
+# Speculation counters of all connections in this worker
+speculation_totals = {
+    "started": 0, "hits": 0, "misses": 0, "superseded": 0, "failed": 0,
+    "saved_ms": 0.0, "wasted_ms": 0.0, "llm_overrun_ms": 0.0
+}
+
+
+def normalize_transcript(text: str) -> str:
+    """Compare partials and finals without case, punctuation or spacing differences"""
+    kept = [" " if unicodedata.category(ch).startswith("P") else ch for ch in text.casefold()]
+    return " ".join("".join(kept).split())
+
+
+def _classify(state: Dict) -> Dict:
+    from langgraph_kisaan_agents import query_understanding_agent
+    return query_understanding_agent(state)
+
+
+async def prefetch_for_query(updates: Dict, location: Dict) -> Dict:
+    """
+    Fetch the API data the routed agent will need for this query type
+
+    Returns:
+        Extra graph state fields (weather_data / market_data), possibly empty
+    """
+    from agriculture_apis import agriculture_api_service
+
+    query_type = updates.get("query_type")
+    if query_type == "weather_advisory":
+        if location.get("city"):
+            weather = await agriculture_api_service.get_current_weather(city=location["city"])
+        elif location.get("latitude") and location.get("longitude"):
+            weather = await agriculture_api_service.get_current_weather(
+                latitude=location["latitude"], longitude=location["longitude"]
+            )
+        else:
+            weather = {}
+        return {"weather_data": weather} if weather else {}
+
+    if query_type == "market_price":
+        commodity = (updates.get("parsed_entities") or {}).get("crop")
+        if not commodity:
+            return {}
+        prices = await agriculture_api_service.get_commodity_prices(
+            commodity=commodity, state=location.get("state"), district=location.get("district")
+        )
+        return {"market_data": prices} if prices else {}
+
+    return {}
+
+
+def _record_llm_overrun(ms: float):
+    speculation_totals["llm_overrun_ms"] += ms
+
+
+class SpeculativeRunner:
+    """Runs query understanding on stable partials for one WebSocket connection"""
+
+    def __init__(
+        self,
+        stable_ms: float = Config.SPECULATION_STABLE_MS,
+        classify: Callable[[Dict], Dict] = _classify,
+        prefetch: Callable[[Dict, Dict], Awaitable[Dict]] = prefetch_for_query
+    ):
+        self.stable = stable_ms / 1000
+        self.classify = classify
+        self.prefetch = prefetch
+
+        self._text = ""  # Normalized text of the current partial
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._task: Optional[asyncio.Task] = None
+        self._task_text = ""
+        self._work: Optional[BlockingWork] = None
+        self._started_at = 0.0
+        self.stats = dict.fromkeys(speculation_totals, 0)
+
+    def on_partial(self, text: str, language: str, location: Optional[Dict] = None):
+        """Note a partial transcript; speculation starts once it stays unchanged"""
+        normalized = normalize_transcript(text)
+        if not normalized or normalized == self._text:
+            return
+        self._text = normalized
+        if self._timer:
+            self._timer.cancel()
+        if self._task and self._task_text != normalized:
+            # The farmer kept talking: this speculation can no longer hit
+            self._discard("superseded")
+        self._timer = asyncio.get_running_loop().call_later(
+            self.stable, self._start, text, normalized, language, location or {}
+        )
+
+    def _start(self, text: str, normalized: str, language: str, location: Dict):
+        self._timer = None
+        self._task_text = normalized
+        self._started_at = time.monotonic()
+        self._work = BlockingWork(_record_llm_overrun)
+        self._task = asyncio.create_task(self._speculate(text, language, location, self._work))
+        self.stats["started"] += 1
+        logger.debug(f"🔮 Speculating on: {text}")
+
+    async def _speculate(self, text: str, language: str, location: Dict, work: BlockingWork) -> Tuple[Dict, float]:
+        """Returns (state updates, monotonic finish time)"""
+        # The agent calls the LLM synchronously (tracked through the copied context)
+        current_work.set(work)
+        updates = await asyncio.to_thread(self.classify, {"user_query": text, "language": language})
+        if not updates.get("query_type"):
+            return {}, time.monotonic()
+        prepared = {"query_type": updates["query_type"], "parsed_entities": updates.get("parsed_entities", {})}
+        try:
+            prepared.update(await self.prefetch(prepared, location))
+        except Exception as e:
+            logger.warning(f"Speculative prefetch failed: {str(e)}")
+        return prepared, time.monotonic()
+
+    def _discard(self, outcome: str):
+        task, self._task = self._task, None
+        work, self._work = self._work, None
+        self._task_text = ""
+        if task is None:
+            return
+        if not task.done():
+            task.cancel()
+            work.cancel()
+        self.stats[outcome] += 1
+        self.stats["wasted_ms"] += (time.monotonic() - self._started_at) * 1000
+
+    async def take(self, final_text: str) -> Optional[Dict]:
+        """
+        Resolve the speculation against the final transcript
+
+        Returns:
+            Graph state updates on a hit, None otherwise
+        """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self._text = ""
+
+        task = self._task
+        if task is None:
+            return None
+        if self._task_text != normalize_transcript(final_text):
+            self._discard("misses")
+            return None
+
+        self._task = None
+        self._work = None
+        self._task_text = ""
+        started_at, final_at = self._started_at, time.monotonic()
+        try:
+            prepared, finished_at = await task
+        except Exception as e:
+            logger.warning(f"Speculation failed: {str(e)}")
+            self.stats["failed"] += 1
+            return None
+        if not prepared:
+            self.stats["failed"] += 1
+            return None
+        # Speculative work finished before the final arrived is latency saved
+        self.stats["hits"] += 1
+        self.stats["saved_ms"] += (min(final_at, finished_at) - started_at) * 1000
+        return prepared
+
+    def close(self):
+        """Cancel pending work and add this connection's counters to speculation_totals"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self._discard("superseded")
+        for key, value in self.stats.items():
+            speculation_totals[key] += value
+        self.stats = dict.fromkeys(speculation_totals, 0)
+
+
+def get_speculation_stats() -> Dict:
+    """Hit rate, saved latency and wasted work across closed connections"""
+    resolved = speculation_totals["hits"] + speculation_totals["misses"]
+    return {
+        **{key: round(value, 1) for key, value in speculation_totals.items()},
+        "hit_rate": round(speculation_totals["hits"] / resolved, 3) if resolved else None,
+        "saved_ms_per_hit": round(speculation_totals["saved_ms"] / speculation_totals["hits"]) if speculation_totals["hits"] else None
+    }
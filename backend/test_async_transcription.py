@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Offline test for the async in-memory transcription path against a local
+aiohttp stand-in for the AssemblyAI REST API (conftest.assemblyai_stand_in)
+"""
+
+import asyncio
+import base64
+import time
+
+import pytest
+
+from voice_service import voice_service
+
+
+async def _run(start_stand_in):
+    audio = b"\x1aE\xdf\xa3" + b"\x00" * 4096
+
+    # Successful transcription, loop stays responsive while polling
+    runner, state = await start_stand_in()
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker_task = asyncio.create_task(ticker())
+    result = await voice_service.transcribe_bytes(audio, "hindi")
+    ticker_task.cancel()
+    print(f"  Result: {result['text']} {result['metrics']}")
+    assert result["status"] == "completed"
+    assert result["text"] == "गेहूं का भाव"
+    assert state["uploaded"] == len(audio)
+    assert state["language_code"] == "hi"
+    assert result["metrics"]["upload_bytes"] == len(audio)
+    assert result["metrics"]["processing_ms"] > 0
+    assert ticks > 3, "event loop was blocked during transcription"
+
+    # Base64 wrapper used by the REST endpoints
+    text = await voice_service.transcribe_audio(base64.b64encode(audio).decode(), "hindi")
+    assert text == "गेहूं का भाव"
+    await runner.cleanup()
+    print("  ✅ Non-blocking transcription works")
+
+    # Timeout while the transcript never completes
+    runner, state = await start_stand_in(processing_polls=10 ** 6)
+    started = time.perf_counter()
+    result = await voice_service.transcribe_bytes(audio, "english", timeout=0.3)
+    assert result["status"] == "timeout"
+    assert time.perf_counter() - started < 1.0
+    print("  ✅ Timeout works")
+
+    # Cancelling the caller stops polling
+    task = asyncio.create_task(voice_service.transcribe_bytes(audio, "english"))
+    await asyncio.sleep(0.2)
+    task.cancel()
+    try:
+        await task
+        assert False, "expected cancellation"
+    except asyncio.CancelledError:
+        pass
+    polls = state["polls"]
+    await asyncio.sleep(0.2)
+    assert state["polls"] == polls
+    print("  ✅ Cancellation works")
+
+    await runner.cleanup()
+    await voice_service.close()
+
+
+def test_async_transcription(assemblyai_stand_in):
+    """Test upload-from-memory, polling, timeout and cancellation"""
+    print("🎤 Testing Async Transcription")
+    print("=" * 40)
+
+    asyncio.run(_run(assemblyai_stand_in))
+
+    print("\n✅ Async transcription test completed!")
+
+
+if __name__ == "__main__":
+    # The stand-in comes from a conftest fixture
+    raise SystemExit(pytest.main(["-s", __file__]))
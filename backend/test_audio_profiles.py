@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Offline test for response audio profiles: negotiation and the variant cache
+(ffmpeg replaced by a job that keeps every 4th byte)
+"""
+
+import asyncio
+
+from audio_profiles import AudioVariantCache, select_profile
+from audio_transcoder import AudioTranscoder
+
+
+class ShrinkingTranscoder(AudioTranscoder):
+    """Pool whose 'encode' keeps every 4th byte and counts jobs"""
+
+    def __init__(self):
+        super().__init__(workers=1, queue_size=4)
+        self.ffmpeg_available = True
+        self.calls = 0
+
+    async def _run_ffmpeg(self, args, input_data):
+        self.calls += 1
+        return input_data[::4]
+
+
+async def _run_cache():
+    transcoder = ShrinkingTranscoder()
+    cache = AudioVariantCache(max_bytes=600, transcoder=transcoder)
+    original = bytes(range(256)) * 4
+
+    variant, media_type = await cache.get_variant(original, "opus-12k")
+    assert len(variant) == len(original) // 4
+    assert media_type.startswith("audio/ogg")
+
+    # Same audio and profile again: served from cache
+    again, _ = await cache.get_variant(original, "opus-12k")
+    assert again == variant and transcoder.calls == 1
+
+    # Native profile never transcodes
+    native, media_type = await cache.get_variant(original, "native")
+    assert native == original and media_type == "audio/mpeg"
+
+    # LRU eviction by byte budget
+    await cache.get_variant(original, "mp3-32k")
+    await cache.get_variant(original + b"x", "mp3-32k")
+    stats = cache.get_stats()
+    print(f"  Cache stats: {stats}")
+    assert stats["bytes"] <= 600
+    assert stats["hits"] == 1 and stats["misses"] == 3
+    await cache.get_variant(original, "opus-12k")
+    assert transcoder.calls == 4
+
+    # Without ffmpeg the original is returned
+    transcoder.ffmpeg_available = False
+    fallback, media_type = await cache.get_variant(b"\x00" * 10, "opus-12k")
+    assert fallback == b"\x00" * 10 and media_type == "audio/mpeg"
+
+
+def test_audio_profiles():
+    """Test profile negotiation and variant caching"""
+    print("📶 Testing Audio Profiles")
+    print("=" * 40)
+
+    assert select_profile("mp3-64k", "opus-12k") == "mp3-64k"
+    assert select_profile("bogus", "opus-12k") == "opus-12k"
+    assert select_profile(headers={"save-data": "on"}) == "opus-12k"
+    assert select_profile(headers={"ect": "3g"}) == "mp3-32k"
+    assert select_profile(headers={"ect": "4g"}) == "native"
+    assert select_profile(headers={"downlink": "0.25"}) == "opus-12k"
+    assert select_profile() == "native"
+    print("  ✅ Profile negotiation works")
+
+    asyncio.run(_run_cache())
+    print("  ✅ Variant cache works")
+
+    print("\n✅ Audio profiles test completed!")
+
+
+if __name__ == "__main__":
+    test_audio_profiles()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Offline test for the audio transcoder: in-process WAV downmix / resample and
+the bounded ffmpeg worker pool (ffmpeg replaced by a timed echo job)
+"""
+
+import asyncio
+import io
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from audio_transcoder import AudioTranscoder, wav_to_pcm
+from config import Config
+
+
+class EchoTranscoder(AudioTranscoder):
+    """Pool whose jobs sleep briefly and echo their input"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.running = 0
+        self.max_running = 0
+
+    async def _run_ffmpeg(self, args, input_data):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        return input_data
+
+
+def _stereo_wav(seconds: float, rate: int) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    left = (8000 * np.sin(2 * np.pi * 300 * t)).astype(np.int16)
+    stereo = np.stack([left, left], axis=1)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(stereo.tobytes())
+    return buffer.getvalue()
+
+
+async def _run_pool():
+    pool = EchoTranscoder(workers=2, queue_size=2)
+    pool.ffmpeg_available = True
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[pool.submit(["-i", "pipe:0"], bytes([i])) for i in range(6)])
+    elapsed = time.perf_counter() - started
+
+    print(f"  6 jobs on 2 workers: {elapsed * 1000:.0f} ms, stats {pool.get_stats()}")
+    assert [output for output, _, _ in results] == [bytes([i]) for i in range(6)]
+    assert pool.max_running == 2
+    assert 0.12 < elapsed < 0.5
+    # Later jobs waited in the queue
+    assert max(queue_ms for _, queue_ms, _ in results) > 40
+    assert all(run_ms >= 45 for _, _, run_ms in results)
+
+    # Encode goes through the pool when ffmpeg is available
+    metrics = {}
+    encoded, audio_format = await pool.encode(np.zeros(1600, dtype=np.int16), metrics)
+    assert audio_format == "opus" and len(encoded) == 3200
+    assert "encode_queue_ms" in metrics and metrics["encode_ms"] >= 45
+
+
+async def _run_timeout():
+    # Stands in for an ffmpeg that never finishes
+    with tempfile.NamedTemporaryFile("w", suffix=".sh", delete=False) as script:
+        script.write("#!/bin/sh\nexec sleep 30\n")
+    os.chmod(script.name, 0o755)
+    original_path, Config.FFMPEG_PATH = Config.FFMPEG_PATH, script.name
+    try:
+        pool = AudioTranscoder(workers=1, timeout_seconds=0.2)
+        pool.ffmpeg_available = True
+        started = time.perf_counter()
+        output, _, _ = await pool.submit(["-i", "pipe:0"], b"\x00" * 1024)
+        assert output is None and time.perf_counter() - started < 2
+        assert pool.stats["timeouts"] == 1 and pool.stats["failed"] == 1
+    finally:
+        Config.FFMPEG_PATH = original_path
+        os.remove(script.name)
+
+
+def test_audio_transcoder():
+    """Test WAV normalization and the worker pool"""
+    print("🎚️ Testing Audio Transcoder")
+    print("=" * 40)
+
+    # 44.1 kHz stereo -> 16 kHz mono
+    samples = wav_to_pcm(_stereo_wav(1.0, 44100))
+    print(f"  44.1 kHz stereo -> {len(samples)} mono samples")
+    assert abs(len(samples) - 16000) <= 1
+    assert samples.dtype == np.int16
+    assert wav_to_pcm(b"not a wav") is None
+
+    # Without ffmpeg, encoding falls back to 16 kHz WAV
+    transcoder = AudioTranscoder(workers=1)
+    transcoder.ffmpeg_available = False
+    encoded, audio_format = asyncio.run(transcoder.encode(samples))
+    assert audio_format == "wav"
+    assert np.array_equal(wav_to_pcm(encoded), samples)
+    print("  ✅ Downmix / resample work")
+
+    asyncio.run(_run_pool())
+    print("  ✅ Bounded worker pool works")
+
+    asyncio.run(_run_timeout())
+    print("  ✅ Hung ffmpeg jobs are killed after the timeout")
+
+    print("\n✅ Audio transcoder test completed!")
+
+
+if __name__ == "__main__":
+    test_audio_transcoder()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Offline test for the Azure synthesizer pool (the SDK synthesizer replaced by
+a stand-in whose result future blocks like the real one)
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import azure.cognitiveservices.speech as speechsdk
+
+from azure_tts_pool import AzureSynthesizerPool
+
+
+class StandInSignal:
+    """EventSignal with connect / disconnect_all"""
+
+    def __init__(self):
+        self.handlers = []
+
+    def connect(self, handler):
+        self.handlers.append(handler)
+
+    def disconnect_all(self):
+        self.handlers = []
+
+
+class StandInFuture:
+    """Blocking result future, like speechsdk.ResultFuture; fires synthesizing
+    events with 3 audio chunks while it runs"""
+
+    def __init__(self, result, delay, signal):
+        self.result = result
+        self.delay = delay
+        self.signal = signal
+        self.stopped = False
+        self.finished = False
+
+    def get(self):
+        audio = getattr(self.result, "audio_data", b"")
+        step = max(1, -(-len(audio) // 3))
+        for i in range(0, len(audio), step):
+            time.sleep(self.delay / 3)
+            if self.stopped:
+                break
+            for handler in list(self.signal.handlers):
+                handler(SimpleNamespace(result=SimpleNamespace(audio_data=audio[i:i + step])))
+        if not audio:
+            time.sleep(self.delay)
+        self.finished = True
+        return self.result
+
+
+class StandInSynthesizer:
+    """Synthesizer returning canned results; fails when the SSML says so"""
+
+    def __init__(self, voice_name, output_format, delay=0.05):
+        self.voice_name = voice_name
+        self.output_format = output_format
+        self.delay = delay
+        self.calls = 0
+        self.stops = 0
+        self.future = None
+        self.synthesizing = StandInSignal()
+
+    def speak_ssml_async(self, ssml):
+        self.calls += 1
+        if "connection-error" in ssml:
+            details = SimpleNamespace(reason=speechsdk.CancellationReason.Error, error_details="socket closed")
+            result = SimpleNamespace(reason=speechsdk.ResultReason.Canceled, cancellation_details=details)
+        else:
+            result = SimpleNamespace(reason=speechsdk.ResultReason.SynthesizingAudioCompleted,
+                                     audio_data=ssml.encode("utf-8"))
+        self.future = StandInFuture(result, self.delay, self.synthesizing)
+        return self.future
+
+    def stop_speaking_async(self):
+        self.stops += 1
+        self.future.stopped = True
+
+
+async def _run_pool():
+    created = []
+
+    def factory(voice_name, output_format):
+        synthesizer = StandInSynthesizer(voice_name, output_format)
+        created.append(synthesizer)
+        return synthesizer
+
+    pool = AzureSynthesizerPool(size_per_voice=2, factory=factory)
+    voice = ("hi-IN-SwaraNeural", "Audio16Khz32KBitRateMonoMp3")
+
+    # Warm-up opens the pool's connections ahead of time
+    await pool.warm_up([voice])
+    assert len(created) == 2
+
+    # Sequential requests reuse warmed synthesizers
+    for i in range(4):
+        result = await pool.speak_ssml(*voice, f"<speak>{i}</speak>")
+        assert result.audio_data == f"<speak>{i}</speak>".encode("utf-8")
+    assert len(created) == 2 and pool.stats["reused"] >= 4
+
+    # Concurrent requests beyond the pool size wait instead of creating more,
+    # and the loop keeps running while results are awaited
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    tick_task = asyncio.create_task(ticker())
+    results = await asyncio.gather(*(pool.speak_ssml(*voice, f"<speak>c{i}</speak>") for i in range(6)))
+    tick_task.cancel()
+    assert len(results) == 6 and len(created) == 2
+    assert pool.stats["waits"] > 0
+    assert ticks > 5, "event loop was blocked during synthesis"
+    print(f"  Concurrent: {pool.get_stats()} ticks={ticks}")
+
+    # A connection error discards the synthesizer; a fresh one replaces it
+    result = await pool.speak_ssml(*voice, "<speak>connection-error</speak>")
+    assert result.reason == speechsdk.ResultReason.Canceled
+    assert pool.stats["discarded"] == 1
+    assert pool.get_stats()["voices"][f"{voice[0]}|{voice[1]}"]["total"] == 1
+    await asyncio.gather(*(pool.speak_ssml(*voice, "<speak>ok</speak>") for _ in range(2)))
+    assert len(created) == 3
+
+    # Voices are pooled separately
+    await pool.speak_ssml("en-IN-NeerjaNeural", voice[1], "<speak>hi</speak>")
+    assert created[-1].voice_name == "en-IN-NeerjaNeural"
+
+
+async def _run_cancel():
+    pool = AzureSynthesizerPool(size_per_voice=1, factory=lambda *key: StandInSynthesizer(*key, delay=0.6))
+    voice = ("hi-IN-SwaraNeural", "Audio16Khz32KBitRateMonoMp3")
+
+    # Cancelled mid-synthesis (hedge loser): synthesis is stopped and has
+    # finished before the synthesizer goes back to the pool
+    task = asyncio.create_task(pool.speak_ssml(*voice, "<speak>" + "नमस्ते " * 20 + "</speak>"))
+    await asyncio.sleep(0.1)
+    task.cancel()
+    try:
+        await task
+        assert False, "speak_ssml should be cancelled"
+    except asyncio.CancelledError:
+        pass
+    synthesizer = await pool.checkout(*voice)
+    assert synthesizer.stops == 1 and synthesizer.future.finished
+    assert pool.stats["created"] == 1 and pool.stats["discarded"] == 0
+    await pool.checkin(*voice, synthesizer)
+
+
+async def _run_stream():
+    pool = AzureSynthesizerPool(size_per_voice=1, factory=StandInSynthesizer)
+    voice = ("hi-IN-SwaraNeural", "Audio16Khz32KBitRateMonoMp3")
+    ssml = "<speak>" + "नमस्ते " * 20 + "</speak>"
+
+    # Chunks arrive before synthesis has finished and add up to the full audio
+    start = time.monotonic()
+    chunks, arrivals = [], []
+    async for chunk in pool.stream_ssml(*voice, ssml):
+        chunks.append(chunk)
+        arrivals.append(time.monotonic() - start)
+    assert len(chunks) == 3
+    assert b"".join(chunks) == ssml.encode("utf-8")
+    assert arrivals[0] < arrivals[-1]
+
+    # Abandoning a stream returns the synthesizer with no handlers left attached
+    stream = pool.stream_ssml(*voice, ssml)
+    await stream.__anext__()
+    await stream.aclose()
+    synthesizer = await pool.checkout(*voice)
+    assert synthesizer.synthesizing.handlers == []
+    await pool.checkin(*voice, synthesizer)
+    assert pool.stats["created"] == 1
+
+
+def test_azure_tts_pool():
+    """Test synthesizer reuse, bounded size, discard on error, warm-up and streaming"""
+    print("🔊 Testing Azure Synthesizer Pool")
+    print("=" * 40)
+
+    asyncio.run(_run_pool())
+    print("  ✅ Pooling, warm-up and non-blocking synthesis work")
+
+    asyncio.run(_run_cancel())
+    print("  ✅ Cancelled synthesis is stopped before the synthesizer is reused")
+
+    asyncio.run(_run_stream())
+    print("  ✅ Streaming synthesis yields chunks early")
+
+    print("\n✅ Azure TTS pool test completed!")
+
+
+if __name__ == "__main__":
+    test_azure_tts_pool()
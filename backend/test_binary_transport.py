@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Offline test for the v2 binary audio transport (multipart/mixed framing and
+the /v2/voice/query endpoint with a silence-only clip, so no STT/LLM calls)
+"""
+
+import json
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from audio_transcoder import pcm_to_wav
+from binary_transport import multipart_mixed_response, parse_multipart_mixed
+from config import Config
+from main import app
+from voice_service import voice_service
+
+
+def test_binary_transport():
+    """Test multipart framing, raw and form uploads, and the JSON fallback"""
+    print("📦 Testing Binary Audio Transport")
+    print("=" * 40)
+
+    # Audio containing the boundary-like bytes survives framing untouched
+    audio = b"\xff\xfb\x90\x00--\r\n\r\n" + bytes(range(256))
+    response = multipart_mixed_response({"text_response": "नमस्ते"}, audio, "audio/mpeg")
+    parts = parse_multipart_mixed(response.body, response.headers["content-type"])
+    assert json.loads(parts[0][1]) == {"text_response": "नमस्ते"}
+    assert parts[1][0]["content-type"] == "audio/mpeg"
+    assert parts[1][1] == audio
+    print("  ✅ multipart/mixed round trip")
+
+    # No TTS credentials for Azure here: TTS returns empty audio offline
+    original_provider = voice_service.tts_provider
+    voice_service.tts_provider = "azure"
+    try:
+        client = TestClient(app)
+        silent_wav = pcm_to_wav(np.zeros(16000, dtype=np.int16))
+
+        # Raw body, parameters in the query string
+        response = client.post(
+            "/v2/voice/query?session_id=s-raw&language=english",
+            content=silent_wav,
+            headers={"content-type": "application/octet-stream"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("multipart/mixed")
+        parts = parse_multipart_mixed(response.content, response.headers["content-type"])
+        metadata = json.loads(parts[0][1])
+        print(f"  Raw upload: {metadata['text_response']} {metadata['stt_metrics']}")
+        assert metadata["session_id"] == "s-raw"
+        assert metadata["user_text"] == ""
+        assert metadata["stt_metrics"]["upload_bytes"] == 0
+        assert metadata["audio_size"] == len(parts[1][1])
+
+        # Multipart form upload with the JSON fallback
+        response = client.post(
+            "/v2/voice/query",
+            files={"audio": ("clip.wav", silent_wav, "audio/wav")},
+            data={"session_id": "s-form", "language": "hindi"},
+            headers={"accept": "application/json"}
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["session_id"] == "s-form"
+        assert "audio_base64" in body
+        print("  ✅ Raw and multipart uploads work")
+    finally:
+        voice_service.tts_provider = original_provider
+
+    # Oversized raw body is rejected
+    limit = Config.MAX_AUDIO_UPLOAD_BYTES
+    response = client.post(
+        "/v2/voice/query",
+        content=b"\x00" * (limit + 1),
+        headers={"content-type": "application/octet-stream"}
+    )
+    assert response.status_code == 413
+    print("  ✅ Upload size limit enforced")
+
+    print("\n✅ Binary transport test completed!")
+
+
+if __name__ == "__main__":
+    test_binary_transport()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Offline test for district / state broadcasts: two workers' hubs on one local
+broker, thousands of stand-in connections, TTS replaced by a stand-in
+"""
+
+import time
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from broadcast_hub import BroadcastHub, LocalBroker
+from config import Config
+
+DISTRICTS = [("Madhya Pradesh", "Indore"), ("Madhya Pradesh", "Bhopal"), ("Punjab", "Ludhiana"), ("Maharashtra", "Nashik")]
+
+
+class StandInConnection:
+    def __init__(self, slow=False):
+        self.frames = []
+        self.slow = slow
+
+    async def send_json(self, message):
+        if self.slow:
+            await asyncio.sleep(10)
+        self.frames.append(message)
+
+    async def send_bytes(self, data):
+        self.frames.append(data)
+
+
+async def _run_fanout():
+    synthesized = []
+
+    async def stand_in_synthesize(text, language, profile):
+        synthesized.append(language)
+        await asyncio.sleep(0.02)
+        return f"{language}-clip".encode(), "mp3"
+
+    broker = LocalBroker()
+    workers = [BroadcastHub(broker, synthesize=stand_in_synthesize) for _ in range(2)]
+    connections = []
+    for i in range(4000):
+        state, district = DISTRICTS[i % len(DISTRICTS)]
+        connection = StandInConnection()
+        language = "english" if i % 5 == 0 else "hindi"
+        workers[i % 2].subscribe(
+            f"s{i}", connection.send_json, connection.send_bytes,
+            location={"state": state, "city": district}, language=language, binary_audio=i % 3 == 0
+        )
+        connections.append((state, district, connection))
+
+    start = time.monotonic()
+    result = await workers[0].broadcast(
+        {"hindi": "इंदौर में ओलावृष्टि की चेतावनी", "english": "Hailstorm warning for Indore"},
+        title="Hailstorm", scope="district", state="madhya pradesh", district="INDORE"
+    )
+    await asyncio.sleep(0.05)
+    elapsed = time.monotonic() - start
+
+    assert result["workers"] == 2 and result["audio_languages"] == ["english", "hindi"]
+    assert sorted(synthesized) == ["english", "hindi"], "one clip per language for all workers"
+    for state, district, connection in connections:
+        if district == "Indore":
+            assert connection.frames and connection.frames[0]["type"] == "broadcast"
+        else:
+            assert not connection.frames
+    indore = [c for _, d, c in connections if d == "Indore"]
+    # Frames are rendered once and shared
+    hindi_json = [c.frames[0] for c in indore if c.frames[0]["language"] == "hindi" and "audio" in c.frames[0]]
+    assert all(frame is hindi_json[0] for frame in hindi_json)
+    binary = [c for c in indore if len(c.frames) == 2]
+    assert binary and binary[0].frames[1] == f"{binary[0].frames[0]['language']}-clip".encode()
+
+    delivered = sum(hub.stats["delivered"] for hub in workers)
+    print(f"  Delivered to {delivered} connections on 2 workers in {elapsed * 1000:.1f} ms")
+    print(f"  Worker stats: {workers[0].get_stats()}")
+    assert delivered == len(indore) == 1000
+
+    # State broadcast reaches both Madhya Pradesh districts
+    await workers[1].broadcast({"hindi": "लू की चेतावनी"}, scope="state", state="Madhya Pradesh", synthesize_audio=False)
+    await asyncio.sleep(0.05)
+    assert sum(hub.stats["delivered"] for hub in workers) == 3000
+
+
+async def _run_slow_client_and_moves():
+    hub = BroadcastHub(LocalBroker(), queue_size=2)
+    slow, fast = StandInConnection(slow=True), StandInConnection()
+    hub.subscribe("slow", slow.send_json, location={"state": "Punjab", "district": "Ludhiana"})
+    moving = hub.subscribe("fast", fast.send_json, location={"state": "Punjab", "district": "Ludhiana"})
+
+    for i in range(5):
+        await hub.broadcast({"hindi": f"चेतावनी {i}"}, scope="district", district="Ludhiana", synthesize_audio=False)
+        await asyncio.sleep(0.01)
+    # The slow connection drops its own broadcasts; the fast one gets all of them
+    assert len(fast.frames) == 5 and hub.stats["dropped"] == 2
+
+    hub.update(moving, {"state": "Haryana", "district": "Hisar"})
+    await hub.broadcast({"hindi": "पाला"}, scope="district", district="Ludhiana", synthesize_audio=False)
+    await asyncio.sleep(0.01)
+    assert len(fast.frames) == 5
+    hub.unsubscribe(moving)
+    assert hub.get_stats()["subscribers"] == 1 and hub.get_stats()["districts"] == 1
+
+    try:
+        await hub.broadcast({"hindi": "x"}, scope="district")
+        raise AssertionError("district broadcast without a district")
+    except ValueError:
+        pass
+
+
+def test_broadcast_hub():
+    """Test location-indexed fan-out, shared rendering, per-connection queues and workers"""
+    print("📢 Testing Broadcast Hub")
+    print("=" * 40)
+
+    asyncio.run(_run_fanout())
+    print("  ✅ One broadcast, one clip per language, delivered to the district on every worker")
+
+    asyncio.run(_run_slow_client_and_moves())
+    print("  ✅ Slow connections drop only their own broadcasts; re-indexing on moves")
+
+    # POST /broadcast needs the admin token
+    from main import app
+    client = TestClient(app)
+    alert = {"messages": {"hindi": "पाला"}, "scope": "state", "state": "Punjab", "synthesize_audio": False}
+    original_key = Config.BROADCAST_API_KEY
+    try:
+        Config.BROADCAST_API_KEY = None
+        assert client.post("/broadcast", json=alert, headers={"X-Admin-Token": "anything"}).status_code == 403
+        Config.BROADCAST_API_KEY = "admin-secret"
+        assert client.post("/broadcast", json=alert).status_code == 401
+        assert client.post("/broadcast", json=alert, headers={"X-Admin-Token": "wrong"}).status_code == 401
+        assert client.post("/broadcast", json=alert, headers={"X-Admin-Token": "admin-secret"}).status_code == 200
+    finally:
+        Config.BROADCAST_API_KEY = original_key
+    print("  ✅ Broadcast endpoint rejects requests without the admin token")
+
+    print("\n✅ Broadcast hub test completed!")
+
+
+if __name__ == "__main__":
+    test_broadcast_hub()
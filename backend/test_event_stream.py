@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Offline test for the Server-Sent Events variant of /voice/query (event
+framing, sentence segments, audio segment store, and the endpoint with a
+silence-only clip and with a stand-in graph and STT, so no STT/LLM calls)
+"""
+
+import json
+import time
+import base64
+import asyncio
+from typing import Dict, List, TypedDict
+
+import numpy as np
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import StateGraph
+
+import main
+from audio_transcoder import pcm_to_wav
+from event_stream import AudioSegmentStore, audio_segments, sse_event, split_sentences
+from main import app
+from voice_service import voice_service
+
+ANSWER = "Wheat is selling at 2275 rupees per quintal in Indore today. Rain is likely tomorrow, so sell early."
+
+
+class StandInState(TypedDict, total=False):
+    user_query: str
+    query_type: str
+    recommendations: List[str]
+    final_response: str
+    parsed_entities: Dict
+
+
+def build_stand_in_graph():
+    """Classifier and answering agent calling chat models that stream tokens"""
+    def classify(state):
+        llm = GenericFakeChatModel(messages=iter([AIMessage(content='{"query_type": "market_price"}')]))
+        return {"query_type": json.loads(llm.invoke([HumanMessage(content=state["user_query"])]).content)["query_type"]}
+
+    def answer(state):
+        llm = GenericFakeChatModel(messages=iter([AIMessage(content=ANSWER)]))
+        return {"recommendations": [llm.invoke([HumanMessage(content=state["user_query"])]).content]}
+
+    builder = StateGraph(StandInState)
+    builder.add_node("query_understanding", classify)
+    builder.add_node("market_price", answer)
+    builder.add_node("response_generation", lambda state: {"final_response": state["recommendations"][0]})
+    builder.set_entry_point("query_understanding")
+    builder.add_edge("query_understanding", "market_price")
+    builder.add_edge("market_price", "response_generation")
+    builder.set_finish_point("response_generation")
+    return builder.compile()
+
+
+def parse_events(body):
+    """(event, data) pairs of a text/event-stream body"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+async def _run_segment_store():
+    async def stand_in_synthesize(text, delay):
+        await asyncio.sleep(delay)
+        return text.encode(), "audio/mpeg"
+
+    store = AudioSegmentStore(max_segments=2, ttl_seconds=0.2)
+    first, _ = store.add(stand_in_synthesize("पहला", 0.05))
+    start = time.monotonic()
+    # Fetching waits for a segment still being synthesized
+    assert await store.get(first) == ("पहला".encode(), "audio/mpeg")
+    assert time.monotonic() - start >= 0.04
+
+    second, _ = store.add(stand_in_synthesize("दूसरा", 0))
+    third, _ = store.add(stand_in_synthesize("तीसरा", 0))
+    assert await store.get(first) is None, "oldest segment evicted"
+    await asyncio.sleep(0.25)
+    assert await store.get(third) is None and len(store) == 0, "expired"
+
+
+def test_event_stream():
+    """Test SSE framing, sentence splitting, segment store and the streaming endpoint"""
+    print("📡 Testing Server-Sent Events Stream")
+    print("=" * 40)
+
+    assert sse_event("text", {"delta": "नमस्ते"}) == 'event: text\ndata: {"delta": "नमस्ते"}\n\n'
+    text = "गेहूं का भाव आज 2275 रुपये प्रति क्विंटल है। कल बारिश हो सकती है। ठीक है।\nकटाई दो दिन बाद करें!"
+    segments = split_sentences(text, min_chars=30)
+    assert " ".join(segments) == " ".join(text.split())
+    # Short sentences are joined with the next one
+    assert segments[1] == "कल बारिश हो सकती है। ठीक है। कटाई दो दिन बाद करें!", segments
+    print(f"  ✅ Events framed, answer split into {len(segments)} segments")
+
+    asyncio.run(_run_segment_store())
+    print("  ✅ Audio segments wait for synthesis, evict and expire")
+
+    # No TTS credentials for Azure here: TTS returns empty audio offline
+    original_provider = voice_service.tts_provider
+    original_transcribe, original_graph = voice_service.transcribe_audio, main.build_kisaan_graph
+    voice_service.tts_provider = "azure"
+    try:
+        client = TestClient(app)
+        silent_wav = pcm_to_wav(np.zeros(16000, dtype=np.int16))
+        request = {
+            "audio_base64": base64.b64encode(silent_wav).decode("utf-8"),
+            "session_id": "s-sse",
+            "language": "hindi"
+        }
+        response = client.post("/voice/query/stream", json=request)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.text)
+        names = [event for event, _ in events]
+        print(f"  Events: {names}")
+        assert names == ["session", "transcript", "sentence", "audio", "done"]
+        assert events[0][1]["session_id"] == "s-sse" and events[1][1]["text"] == ""
+        assert events[2][1]["text"] == events[4][1]["text_response"]
+        assert events[3][1]["url"] is None and events[3][1]["audio_size"] == 0
+        print("  ✅ Stage events streamed in order")
+
+        # A question: the answering agent's tokens stream before the final sentences
+        async def stand_in_transcribe(audio_base64, language="hindi"):
+            return "What is the wheat price in Indore?"
+
+        voice_service.transcribe_audio = stand_in_transcribe
+        main.build_kisaan_graph = build_stand_in_graph
+        response = client.post("/voice/query/stream", json={**request, "session_id": "s-sse-tokens", "language": "english"})
+        events = parse_events(response.text)
+        names = [event for event, _ in events]
+        tokens = [data["delta"] for event, data in events if event == "token"]
+        sentences = [data["text"] for event, data in events if event == "sentence"]
+        print(f"  {len(tokens)} token events, {len(sentences)} sentences")
+        assert names[:3] == ["session", "transcript", "query_type"] and names[-1] == "done"
+        assert len(tokens) > 2 and "".join(tokens) == ANSWER, "classifier JSON is not streamed"
+        assert names.index("token") < names.index("sentence")
+        assert " ".join(sentences) == events[-1][1]["text_response"] == ANSWER
+        print("  ✅ LLM tokens streamed live, final answer split into sentences")
+    finally:
+        voice_service.tts_provider = original_provider
+        voice_service.transcribe_audio, main.build_kisaan_graph = original_transcribe, original_graph
+
+    response = client.get("/voice/audio/unknown")
+    assert response.status_code == 404
+    print(f"  ✅ Unknown segment is 404 ({len(audio_segments)} segments stored)")
+
+    print("\n✅ Event stream test completed!")
+
+
+if __name__ == "__main__":
+    test_event_stream()
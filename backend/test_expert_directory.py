@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Offline test for the expert directory (bundled dataset, no network)
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+from config import Config
+from expert_directory import ExpertDirectory
+
+
+def test_expert_directory():
+    """Test versioned loading, multilingual lookup and nearest-office search"""
+    print("👨‍🌾 Testing Expert Directory")
+    print("=" * 40)
+
+    directory = ExpertDirectory(Config.EXPERT_DIRECTORY_DIR)
+    print(f"  Version {directory.version}, {len(directory.entries)} entries")
+    assert directory.version >= 1
+    assert directory.helplines()
+
+    # English and Hindi district names resolve to the same offices
+    english = {e["id"] for e in directory.find_by_district("Indore")}
+    hindi = {e["id"] for e in directory.find_by_district("इंदौर")}
+    print(f"  Indore offices: {sorted(english)}")
+    assert english and english == hindi
+    assert directory.find_by_state("मध्य प्रदेश")
+
+    # Point near Dewas: Dewas KVK first, Indore next
+    nearest = directory.nearest(22.95, 76.05, k=2, entry_type="kvk")
+    print(f"  Nearest KVKs: {[(e['id'], e['distance_km']) for e in nearest]}")
+    assert nearest[0]["id"] == "kvk_dewas"
+    assert nearest[1]["id"] == "kvk_indore"
+    assert nearest[0]["distance_km"] < nearest[1]["distance_km"]
+
+    # First hit two rings out: the next ring is still searched for a closer office
+    temp_dir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(temp_dir, "v001_rings.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "upserts": [
+                {"id": "north", "type": "kvk", "name": "North", "district": "North", "latitude": 22.95, "longitude": 70.5},
+                {"id": "east", "type": "kvk", "name": "East", "district": "East", "latitude": 20.05, "longitude": 73.05}
+            ]}, f)
+        rings = ExpertDirectory(temp_dir)
+        assert rings.nearest(20.05, 70.5, k=1)[0]["id"] == "east"
+    finally:
+        shutil.rmtree(temp_dir)
+
+    # Location dict without a district falls back to coordinates
+    offices = directory.lookup({"city": "Unknown", "latitude": 22.72, "longitude": 75.86})
+    assert any(e["id"] == "kvk_indore" for e in offices)
+    assert directory.lookup({"city": "Atlantis"}) == []
+
+    message = directory.format_contacts(offices, "hindi")
+    assert "1800-180-1551" in message
+    print("  ✅ Lookup and formatting work")
+
+    # Incremental update: newer version applies, older one is skipped
+    temp_dir = tempfile.mkdtemp()
+    try:
+        for name in os.listdir(Config.EXPERT_DIRECTORY_DIR):
+            shutil.copy(os.path.join(Config.EXPERT_DIRECTORY_DIR, name), temp_dir)
+        update_path = os.path.join(temp_dir, "v999_test.json")
+        with open(update_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": 999,
+                "upserts": [{"id": "kvk_indore", "phone": "0731-0000000"}],
+                "deletes": ["dao_dewas"]
+            }, f)
+
+        updated = ExpertDirectory(temp_dir)
+        assert updated.version == 999
+        assert updated.entries["kvk_indore"]["phone"] == "0731-0000000"
+        assert updated.entries["kvk_indore"]["district"] == "Indore"
+        assert "dao_dewas" not in updated.entries
+        assert not updated.apply_version(update_path)
+        print("  ✅ Incremental versions applied")
+    finally:
+        shutil.rmtree(temp_dir)
+
+    print("\n✅ Expert directory test completed!")
+
+
+def test_expert_agent_answers_from_directory():
+    """The expert agent answers a known district without calling the LLM"""
+    print("📞 Testing Expert Agent Directory Answer")
+    print("=" * 40)
+
+    import langgraph_kisaan_agents as agents
+
+    class NoLLM:
+        def invoke(self, *args, **kwargs):
+            raise AssertionError("llm.invoke should not be called")
+
+    original_llm = agents.llm
+    agents.llm = NoLLM()
+    try:
+        result = agents.expert_connection_agent({
+            "query_type": "expert_connection",
+            "language": "hindi",
+            "location": {"district": "Indore", "state": "Madhya Pradesh"},
+            "user_query": "मुझे कृषि विशेषज्ञ से बात करनी है",
+        })
+    finally:
+        agents.llm = original_llm
+
+    info = result["expert_contact_info"]
+    print(f"  {len(info['offices'])} offices, directory v{info['directory_version']}")
+    assert info["offices"]
+    assert "1800-180-1551" in info["resources"]
+    assert result["recommendations"] == [info["resources"]]
+    print("  ✅ Directory contacts returned without the LLM")
+
+
+if __name__ == "__main__":
+    test_expert_directory()
+    test_expert_agent_answers_from_directory()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Offline test for the knowledge retrieval index (lexical mode, no model download)
+"""
+
+from knowledge_index import KnowledgeIndex
+
+
+def test_knowledge_index():
+    """Test chunking and top-k retrieval over the bundled documents"""
+    index = KnowledgeIndex(index_dir="/nonexistent-index-dir")
+    index._model_failed = True  # force lexical retrieval
+
+    chunks = index.chunk_documents()
+    topics = {chunk["topic"] for chunk in chunks}
+
+    print("📚 Testing Knowledge Index")
+    print("=" * 40)
+    print(f"  {len(chunks)} chunks across topics: {sorted(topics)}")
+    assert {"schemes", "soil_health", "crop_selection", "crop_diseases"} <= topics
+    assert all(len(chunk["text"]) < 1200 for chunk in chunks)
+    assert any(chunk["language"] == "hindi" for chunk in chunks)
+
+    test_cases = [
+        ("Kisan credit card loan interest", "schemes", "Kisan Credit Card"),
+        ("acidic soil pH lime", "soil_health", "Understanding Soil Test Report"),
+        ("किसान क्रेडिट कार्ड ऋण", "schemes", "किसान क्रेडिट कार्ड"),
+        ("late blight potato", "crop_diseases", "Late Blight"),
+    ]
+    for query, topic, expected_title in test_cases:
+        passages = index.search(query, topic=topic, k=3)
+        titles = [p["title"] for p in passages]
+        status = "✅" if any(expected_title in t for t in titles) else "❌"
+        print(f"{status} '{query}' -> {titles}")
+        assert any(expected_title in t for t in titles)
+
+    # Passages are much smaller than the full reference document
+    reference = index.format_passages(index.search("soil pH", topic="soil_health", k=3))
+    full = "\n".join(c["text"] for c in chunks if c["topic"] == "soil_health")
+    print(f"  Prompt reference: {len(reference)} chars vs full document {len(full)} chars")
+    assert len(reference) < len(full) / 2
+
+    print("\n✅ Knowledge index tests passed!")
+
+
+if __name__ == "__main__":
+    test_knowledge_index()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Offline test for local speech recognition (whisper.cpp replaced by a
+stand-in executable, AssemblyAI by the aiohttp stand-in)
+"""
+
+import os
+import sys
+import stat
+import asyncio
+import tempfile
+
+import numpy as np
+import pytest
+
+from audio_transcoder import pcm_to_wav
+from local_stt import LocalSTTEngine, local_stt
+from voice_service import voice_service
+from test_voice_activity import _clip
+
+STAND_IN_WHISPER = f"""#!{sys.executable}
+import sys, wave
+args = sys.argv[1:]
+language = args[args.index("-l") + 1]
+with wave.open(args[args.index("-f") + 1]) as wav_file:
+    seconds = wav_file.getnframes() / wav_file.getframerate()
+print(f"[{{language}}] local {{seconds:.1f}}s")
+"""
+
+
+def make_stand_in(directory):
+    path = os.path.join(directory, "whisper-cli")
+    with open(path, "w") as f:
+        f.write(STAND_IN_WHISPER)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    model = os.path.join(directory, "ggml-small.bin")
+    open(model, "wb").close()
+    return path, model
+
+
+async def _run_engine(cli_path, model):
+    engine = LocalSTTEngine(cli_path=cli_path, cli_model=model, workers=2)
+    if engine.backend != "whisper.cpp":
+        print(f"  (faster-whisper installed, stand-in CLI not used: {engine.backend})")
+        return
+    await engine.warm_up()
+    text = await engine.transcribe(np.zeros(16000, dtype=np.int16), "hindi")
+    assert text == "[hi] local 1.0s"
+    texts = await asyncio.gather(*(engine.transcribe(np.zeros(8000, dtype=np.int16), "tamil") for _ in range(4)))
+    assert texts == ["[ta] local 0.5s"] * 4
+    print(f"  Engine stats: {engine.get_stats()}")
+    engine.close()
+
+
+async def _run_voice_service(start_stand_in):
+    runner, state = await start_stand_in(text="मौसम कैसा है")
+
+    # Short utterance: transcribed locally, nothing uploaded
+    result = await voice_service.transcribe_bytes(pcm_to_wav(_clip(0.5, 1.5, 0.5)), "marathi")
+    print(f"  Short clip: {result['text']!r} {result['metrics']}")
+    assert result["metrics"]["stt_backend"] == "local"
+    assert result["text"].startswith("[mr] local")
+    assert state["uploaded"] == 0
+    print("  ✅ Short utterances skip the network")
+
+    # Longer speech goes to the hosted service
+    long_clip = pcm_to_wav(_clip(0.5, 6.0, 0.5))
+    result = await voice_service.transcribe_bytes(long_clip, "hindi")
+    assert result["metrics"]["stt_backend"] == "assemblyai"
+    assert result["text"] == "मौसम कैसा है" and state["uploaded"] > 0
+
+    # Hosted service unreachable: local fallback keeps voice queries working
+    await runner.cleanup()
+    result = await voice_service.transcribe_bytes(long_clip, "hindi")
+    print(f"  Offline: {result['status']} {result['text']!r}")
+    assert result["status"] == "completed" and result["metrics"]["stt_backend"] == "local"
+    assert result["text"].startswith("[hi] local")
+    print("  ✅ Local fallback when AssemblyAI is unreachable")
+
+    await voice_service.close()
+
+
+def test_local_stt(assemblyai_stand_in, monkeypatch):
+    """Test the local STT pool and its routing in transcribe_bytes"""
+    print("🎙️ Testing Local STT")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cli_path, model = make_stand_in(tmp)
+        asyncio.run(_run_engine(cli_path, model))
+        print("  ✅ Process-pool transcription with language hints")
+        monkeypatch.setattr(local_stt, "backend", "whisper.cpp")
+        monkeypatch.setattr(local_stt, "cli_path", cli_path)
+        monkeypatch.setattr(local_stt, "cli_model", model)
+        asyncio.run(_run_voice_service(assemblyai_stand_in))
+
+    print("\n✅ Local STT test completed!")
+
+
+if __name__ == "__main__":
+    # The AssemblyAI stand-in comes from a conftest fixture
+    raise SystemExit(pytest.main(["-s", __file__]))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Offline test for the pest/disease risk engine (no database or API calls;
+weather_cache lookups run against an in-memory SQLite table)
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+from pest_risk_engine import PestRiskEngine
+
+
+def make_forecast(temperature, humidity, rain=0, steps=40):
+    """Build a constant forecast list in the OpenWeather 3-hour format"""
+    return [
+        {"temperature": temperature, "humidity": humidity, "rain": rain}
+        for _ in range(steps)
+    ]
+
+
+def test_pest_risk_engine():
+    """Test vectorized rule evaluation and advisory generation"""
+    engine = PestRiskEngine()
+
+    district_forecasts = {
+        ("madhya pradesh", "indore"): make_forecast(15, 95),     # cool & wet -> rust / blight
+        ("madhya pradesh", "dewas"): make_forecast(26, 95),      # warm & wet -> blast
+        ("madhya pradesh", "khandwa"): make_forecast(35, 40),    # hot & dry -> nothing
+    }
+    district_crops = {
+        ("madhya pradesh", "indore"): [
+            {"crop_id": 1, "crop_name": "गेहूं", "district": "इंदौर", "state": "मध्य प्रदेश"},
+            {"crop_id": 2, "crop_name": "Potato", "district": "इंदौर", "state": "मध्य प्रदेश"},
+        ],
+        ("madhya pradesh", "dewas"): [
+            {"crop_id": 3, "crop_name": "धान", "district": "देवास", "state": "मध्य प्रदेश"},
+        ],
+        ("madhya pradesh", "khandwa"): [
+            {"crop_id": 4, "crop_name": "wheat", "district": "खंडवा", "state": "मध्य प्रदेश"},
+        ],
+    }
+
+    print("🦠 Testing Pest Risk Engine")
+    print("=" * 40)
+
+    risks, advisories = engine.evaluate(district_forecasts, district_crops)
+    for risk in risks:
+        print(f"  {risk['district']}: {risk['disease']} -> {risk['severity']} ({risk['favourable_hours']}h)")
+
+    diseases = {(r["district"], r["disease"]): r["severity"] for r in risks}
+    assert diseases[("इंदौर", "wheat_rust")] == "critical"
+    assert diseases[("इंदौर", "late_blight")] == "critical"
+    assert diseases[("देवास", "rice_blast")] == "critical"
+    assert not any(r["district"] == "खंडवा" for r in risks)
+    assert {a["crop_id"] for a in advisories} == {1, 2, 3}
+
+    # Longest continuous run, not total hours: alternating wet/dry stays low
+    broken = [{"temperature": 15, "humidity": 95 if i % 2 else 50, "rain": 0} for i in range(40)]
+    results = engine.compute_risk(engine.build_forecast_arrays([broken]))
+    assert int(results["wheat_rust"]["hours"][0]) == 3
+    assert int(results["wheat_rust"]["level"][0]) == 1
+
+    # In-memory lookup
+    engine._index_risks(risks)
+    engine.last_run = "test"
+    assert engine.get_district_risk("इंदौर", crop="गेहूं")[0]["disease"] == "wheat_rust"
+    assert engine.get_district_risk("Unknown District") == []
+    print(engine.format_risk_summary(engine.get_district_risk("इंदौर"), "hindi"))
+
+    # Cached forecasts are keyed by state too: same district name, two states
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE weather_cache (location TEXT, forecast_data TEXT, fetched_at TIMESTAMP, valid_until TIMESTAMP)")
+    now = datetime.now()
+    for location, temperature, valid in [
+        ("Aurangabad, Maharashtra", 30, 1), ("Aurangabad, Bihar", 15, 1), ("Indore", 20, -1)
+    ]:
+        db.execute("INSERT INTO weather_cache VALUES (?, ?, ?, ?)", (
+            location, json.dumps({"forecasts": make_forecast(temperature, 95, steps=2)}), now, now + timedelta(hours=valid)
+        ))
+    keys = [("maharashtra", "aurangabad"), ("bihar", "aurangabad"), ("madhya pradesh", "indore")]
+    cached = engine._fetch_cached_forecasts(db.cursor(), keys)
+    assert cached[keys[0]][0]["temperature"] == 30 and cached[keys[1]][0]["temperature"] == 15
+    assert keys[2] in cached, "bare district rows are a fallback"
+    assert keys[2] not in engine._fetch_cached_forecasts(db.cursor(), keys, fresh_only=True)
+
+    # A rerun replaces today's advisories of every evaluated crop, even with no risk left
+    db.execute("""CREATE TABLE crop_advisories (crop_id INTEGER, advisory_date DATE, advisory_type TEXT,
+                  description TEXT, severity TEXT, action_required TEXT)""")
+    engine._write_advisories(db.cursor(), [1, 2, 3], advisories)
+    assert db.execute("SELECT COUNT(*) FROM crop_advisories").fetchone()[0] == len(advisories)
+    engine._write_advisories(db.cursor(), [1, 2, 3], [])
+    assert db.execute("SELECT COUNT(*) FROM crop_advisories").fetchone()[0] == 0
+
+    # Before the first batch, stored risks are cached per date and state; empty results are not
+    engine = PestRiskEngine()
+    loads = []
+
+    def stand_in_load(district, state=None):
+        loads.append(state)
+        return [{"district": district, "state": state, "crops": ["wheat"], "severity": "high"}] if state == "Punjab" else []
+
+    engine._load_from_db = stand_in_load
+    assert engine.get_district_risk("Ludhiana", "Haryana") == engine.get_district_risk("Ludhiana", "Haryana") == []
+    assert engine.get_district_risk("Ludhiana", "Punjab") == engine.get_district_risk("Ludhiana", "Punjab")
+    assert loads == ["Haryana", "Haryana", "Punjab"]
+
+    print("\n✅ Pest risk engine tests passed!")
+
+
+if __name__ == "__main__":
+    test_pest_risk_engine()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Offline test for per-connection realtime transcribers (the AssemblyAI
+realtime transcriber replaced by a stand-in with a blocking handshake)
+"""
+
+import time
+import asyncio
+from types import SimpleNamespace
+
+import assemblyai as aai
+
+from realtime_voice_service import RealtimeSessionManager, RealtimeCapacityError
+
+
+class StandInTranscriber:
+    """RealtimeTranscriber with connect / stream / force_end_utterance / close"""
+
+    def __init__(self, service, handshake=0.01, fail=False):
+        self.service = service
+        self.handshake = handshake
+        self.fail = fail
+        self.audio = []
+        self.end_utterances = 0
+        self.closed = False
+
+    def connect(self):
+        time.sleep(self.handshake)
+        if self.fail:
+            # Like the SDK: handshake errors go to on_error, connect() returns
+            self.service._on_error("Could not connect to the real-time service")
+
+    def stream(self, data):
+        self.audio.append(data)
+
+    def force_end_utterance(self):
+        self.end_utterances += 1
+
+    def close(self):
+        self.closed = True
+        self.service._on_close()
+
+    def emit(self, text, is_final=False):
+        transcript = aai.RealtimeFinalTranscript.construct(text=text) if is_final else SimpleNamespace(text=text)
+        self.service._on_data(transcript)
+
+
+def _collector():
+    received = []
+
+    async def on_transcript(text, is_final):
+        received.append((text, is_final))
+
+    return received, on_transcript
+
+
+async def _run_isolation():
+    manager = RealtimeSessionManager(max_sessions=10, pool_size=0, factory=StandInTranscriber)
+    received_a, on_a = _collector()
+    received_b, on_b = _collector()
+    a = await manager.acquire("hindi", on_a)
+    b = await manager.acquire("tamil", on_b)
+    assert a is not b and a.language == "hi" and b.language == "ta"
+
+    await a.send_audio(b"\x01\x02")
+    a.transcriber.emit("गेहूं का भाव", is_final=True)
+    b.transcriber.emit("நெல்")
+    await asyncio.sleep(0.01)
+    assert a.transcriber.audio == [b"\x01\x02"] and b.transcriber.audio == []
+    assert received_a == [("गेहूं का भाव", True)] and received_b == [("நெல்", False)]
+
+    # Closing one connection leaves the other running
+    await manager.release(b)
+    assert a.is_active and not b.is_active
+    await manager.close()
+
+
+async def _run_capacity():
+    manager = RealtimeSessionManager(max_sessions=3, pool_size=0, factory=StandInTranscriber)
+    _, on_transcript = _collector()
+    services = [await manager.acquire("hindi", on_transcript) for _ in range(3)]
+    try:
+        await manager.acquire("hindi", on_transcript)
+        raise AssertionError("capacity not enforced")
+    except RealtimeCapacityError:
+        pass
+    await manager.release(services[0])
+    await manager.acquire("hindi", on_transcript)
+    assert manager.get_stats()["rejected"] == 1
+
+    # A failed handshake raises and frees its slot
+    failing = RealtimeSessionManager(max_sessions=1, pool_size=0,
+                                     factory=lambda service: StandInTranscriber(service, fail=True))
+    try:
+        await failing.acquire("hindi", on_transcript)
+        raise AssertionError("connect failure not raised")
+    except RuntimeError:
+        pass
+    assert failing.get_stats()["failed"] == 1 and failing.get_stats()["active"] == 0
+    await manager.close()
+
+
+async def _run_pool():
+    manager = RealtimeSessionManager(max_sessions=10, pool_size=2, reuse_grace_seconds=0.1,
+                                     factory=lambda service: StandInTranscriber(service, handshake=0.05))
+    await manager.warm_up(["hindi"])
+    assert manager.get_stats()["idle"] == {"hindi": 2}
+
+    # Pre-opened connection: no handshake on the request path
+    received, on_transcript = _collector()
+    start = time.monotonic()
+    first = await manager.acquire("hindi", on_transcript)
+    assert time.monotonic() - start < 0.03
+    await asyncio.sleep(0.15)
+    assert manager.get_stats()["idle"] == {"hindi": 2}, "pool not replenished"
+
+    # The warm pool is full, so a released connection is closed
+    await manager.release(first)
+    assert first.transcriber is None and manager.get_stats()["idle"] == {"hindi": 2}
+
+    # Released connections flush the utterance and drop late transcripts...
+    tamil = await manager.acquire("tamil", on_transcript)
+    await manager.release(tamil)
+    tamil.transcriber.emit("late text", is_final=True)
+    await asyncio.sleep(0.01)
+    assert tamil.transcriber.end_utterances == 1 and received == []
+
+    # ...and are reused only once the grace period has passed; a ready
+    # connection queued behind one still in its grace period is taken instead
+    ready = await manager._open("tamil")
+    manager._idle["tamil"].append(ready)
+    assert await manager.acquire("tamil", on_transcript) is ready
+    assert await manager.acquire("tamil", on_transcript) is not tamil
+    await asyncio.sleep(0.15)
+    assert await manager.acquire("tamil", on_transcript) is tamil
+
+    stats = manager.get_stats()
+    print(f"  Pool stats: {stats}")
+    assert stats["reused"] == 1 and stats["closed"] == 1
+    await manager.close()
+    assert tamil.transcriber is None and not tamil.is_active
+
+
+async def _run_concurrency(sessions=200):
+    manager = RealtimeSessionManager(max_sessions=sessions, pool_size=0, factory=StandInTranscriber)
+    _, on_transcript = _collector()
+    start = time.monotonic()
+    services = await asyncio.gather(*(manager.acquire("hindi", on_transcript) for _ in range(sessions)))
+    elapsed = time.monotonic() - start
+    assert len({id(service) for service in services}) == sessions
+    assert manager.get_stats()["peak_active"] == sessions
+    await asyncio.gather(*(manager.release(service) for service in services))
+    assert manager.get_stats()["active"] == 0
+    print(f"  {sessions} concurrent sessions opened in {elapsed * 1000:.0f} ms")
+
+
+def test_realtime_sessions():
+    """Test per-connection transcribers, capacity limits and the connection pool"""
+    print("🎧 Testing Realtime Sessions")
+    print("=" * 40)
+
+    asyncio.run(_run_isolation())
+    print("  ✅ Callbacks, language and audio are per connection")
+
+    asyncio.run(_run_capacity())
+    print("  ✅ Capacity limit and failed handshakes")
+
+    asyncio.run(_run_pool())
+    print("  ✅ Pre-opened connections are pooled and reused")
+
+    asyncio.run(_run_concurrency())
+    print("  ✅ Hundreds of concurrent sessions")
+
+    print("\n✅ Realtime sessions test completed!")
+
+
+if __name__ == "__main__":
+    test_realtime_sessions()
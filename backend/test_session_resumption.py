@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Offline test for resumable /ws/voice sessions: an answer finished while the
+client was offline is replayed after it reconnects (stand-in WebSockets)
+"""
+
+import json
+import asyncio
+
+from session_resumption import ResumableChannel, ResumableSessionRegistry
+from turn_manager import TurnManager
+
+
+class StandInWebSocket:
+    """Records frames; raises like a dead connection once dropped"""
+
+    def __init__(self):
+        self.frames = []
+        self.dropped = False
+
+    async def send_text(self, text):
+        if self.dropped:
+            raise RuntimeError("Cannot call send once a close message has been sent")
+        self.frames.append(json.loads(text))
+
+    async def send_bytes(self, data):
+        if self.dropped:
+            raise RuntimeError("Cannot call send once a close message has been sent")
+        self.frames.append(data)
+
+    def last_seq(self):
+        return max(frame["seq"] for frame in self.frames if isinstance(frame, dict))
+
+
+async def _run_resume():
+    registry = ResumableSessionRegistry(ttl_seconds=5)
+    first = StandInWebSocket()
+    channel, resumed = await registry.open("farmer-1")
+    assert not resumed
+    channel.turns = TurnManager()
+    await registry.attach(channel, first)
+
+    async def answer(turn):
+        # Stands in for graph.ainvoke + TTS of the final transcript
+        await asyncio.sleep(0.05)
+        await channel.send_json({"type": "response", "text": "गेहूं का भाव 2275 रुपये", "turn": turn})
+        await channel.send_bytes(b"mp3-audio")
+        await channel.send_json({"type": "audio_end", "audio_size": 9, "turn": turn})
+
+    await channel.send_json({"type": "started", "session_id": "farmer-1"})
+    await channel.send_json({"type": "transcript", "text": "गेहूं का भाव", "is_final": True})
+    await channel.turns.start(answer)
+
+    # Connection drops mid-answer; the answer keeps running into the buffer
+    await asyncio.sleep(0.01)
+    first.dropped = True
+    channel.detach(first)
+    await asyncio.sleep(0.08)
+    last_seen = first.last_seq()
+    assert last_seen == 2 and channel.stats["buffered_while_detached"] == 3
+
+    # Reconnect with the last frame seen: only the missed frames come back, in order
+    second = StandInWebSocket()
+    channel2, resumed = await registry.open("farmer-1", resume=True)
+    assert resumed and channel2 is channel
+    replayed, gap = await registry.attach(channel, second, last_seen)
+    assert (replayed, gap) == (3, False)
+    assert second.frames[0] == {"type": "response", "text": "गेहूं का भाव 2275 रुपये", "turn": 1, "seq": 3}
+    assert second.frames[1] == b"mp3-audio" and second.frames[2]["seq"] == 5
+
+    # Live frames continue the numbering; acks free the buffer
+    await channel.send_json({"type": "started", "session_id": "farmer-1", "resumed": True})
+    assert second.frames[-1]["seq"] == 6
+    channel.ack(6)
+    assert channel.buffered_frames == 0 and channel.buffered_bytes == 0
+    stats = registry.get_stats()
+    print(f"  Resumption stats: {stats}")
+    assert stats["resumed"] == 1 and stats["replayed_frames"] == 3
+
+
+async def _run_limits_and_expiry():
+    # Frames evicted before the client saw them are reported as a gap
+    channel = ResumableChannel("farmer-2", max_frames=3, max_bytes=10_000)
+    for i in range(5):
+        await channel.send_json({"type": "transcript", "text": str(i), "is_final": False})
+    websocket = StandInWebSocket()
+    replayed, gap = await channel.attach(websocket, 0)
+    assert replayed == 3 and gap and websocket.frames[0]["seq"] == 3
+
+    # A connected client that never acks keeps only a short tail of delivered frames
+    channel = ResumableChannel("farmer-v1", max_bytes=100_000, max_unacked_bytes=3_000)
+    await channel.attach(StandInWebSocket())
+    for _ in range(20):
+        await channel.send_bytes(b"\x00" * 1_000)
+    assert channel.buffered_bytes <= 3_000
+    # Its first ack opts in to the full buffer
+    channel.ack(channel.seq)
+    for _ in range(20):
+        await channel.send_bytes(b"\x00" * 1_000)
+    assert channel.buffered_bytes == 20_000
+
+    # A session gone longer than the TTL is dropped and its answer cancelled
+    registry = ResumableSessionRegistry(ttl_seconds=0.05)
+    cancelled = []
+
+    async def on_cancel(turn, reason):
+        cancelled.append(reason)
+
+    channel, _ = await registry.open("farmer-3")
+    channel.turns = TurnManager(on_cancel=on_cancel)
+    await channel.turns.start(lambda turn: asyncio.sleep(10))
+    await asyncio.sleep(0.1)
+    channel, resumed = await registry.open("farmer-3", resume=True)
+    assert not resumed and cancelled == ["expired"]
+    assert registry.get_stats()["resume_misses"] == 1
+
+    # The background sweeper expires it without waiting for another connection
+    registry = ResumableSessionRegistry(ttl_seconds=0.05, sweep_interval_seconds=0.02)
+    channel, _ = await registry.open("farmer-4")
+    channel.turns = TurnManager(on_cancel=on_cancel)
+    await channel.turns.start(lambda turn: asyncio.sleep(10))
+    registry.start_sweeper()
+    await asyncio.sleep(0.15)
+    await registry.stop_sweeper()
+    assert registry.get_stats()["sessions"] == 0 and cancelled == ["expired", "expired"]
+
+
+def test_session_resumption():
+    """Test sequence numbering, replay after reconnect, acks, limits and expiry"""
+    print("🔁 Testing Session Resumption")
+    print("=" * 40)
+
+    asyncio.run(_run_resume())
+    print("  ✅ Answer finished while offline is replayed after reconnect")
+
+    asyncio.run(_run_limits_and_expiry())
+    print("  ✅ Replay buffer limits report gaps, non-acking clients keep a short tail;"
+          " expired sessions are swept and cancel their answer")
+
+    print("\n✅ Session resumption test completed!")
+
+
+if __name__ == "__main__":
+    test_session_resumption()
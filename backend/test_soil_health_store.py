@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Offline test for the district soil health store (temporary CSV, no APIs)
+"""
+
+import asyncio
+import os
+import tempfile
+
+from soil_health_store import SoilHealthStore
+
+
+def _write_csv(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("State,District,pH,EC,OC,N,P,K,Zn\n")
+        for row in rows:
+            f.write(",".join(str(v) for v in row) + "\n")
+
+
+def test_soil_health_store():
+    """Test CSV ingest, columnar lookup and percentile queries"""
+    print("🌍 Testing Soil Health Store")
+    print("=" * 40)
+
+    temp_dir = tempfile.mkdtemp()
+    store_path = os.path.join(temp_dir, "store.npz")
+    csv_a = os.path.join(temp_dir, "mp.csv")
+    csv_b = os.path.join(temp_dir, "rj.csv")
+
+    # Indore: pH 7.0..7.9, zinc deficient in 4 of 10 samples
+    _write_csv(csv_a, [
+        ("Madhya Pradesh", "Indore", 7.0 + i / 10, 0.3, 0.45, 250, 12, 300, 0.4 if i < 4 else 0.9)
+        for i in range(10)
+    ] + [("Madhya Pradesh", "", 7.0, 0.3, 0.4, 200, 10, 200, 1.0)])
+    _write_csv(csv_b, [
+        ("Rajasthan", "Jaipur", 8.2, 1.4, 0.3, 180, "", 220, 0.5),
+        ("Rajasthan", "Jaipur", 8.4, 1.6, 0.35, 190, 8, 240, 0.55),
+    ])
+
+    # A store asked before the file exists picks it up once it is written
+    early = SoilHealthStore(store_path)
+    assert not early.load()
+
+    store = SoilHealthStore(store_path)
+    summary = store.ingest_csv([csv_a])
+    print(f"  Ingest: {summary}")
+    assert summary == {"rows": 10, "skipped": 1, "districts": 1}
+
+    # Appending a second file keeps earlier districts
+    store.ingest_csv([csv_b])
+
+    reloaded = SoilHealthStore(store_path)
+    assert reloaded.load()
+    assert len(reloaded.keys) == 2
+    assert early.load() and early.keys == reloaded.keys
+
+    indore = reloaded.get_district_summary("Indore", "Madhya Pradesh")
+    print(f"  Indore pH: {indore['parameters']['ph']}")
+    assert indore["samples"] == 10
+    assert abs(indore["parameters"]["ph"]["median"] - 7.45) < 0.01
+    assert indore["parameters"]["n"]["rating"] == "low"
+    assert indore["parameters"]["zn"]["deficient_pct"] == 40.0
+
+    # Lookup without state, blank cells skipped
+    jaipur = reloaded.get_district_summary("jaipur")
+    assert jaipur["parameters"]["p"]["samples"] == 1
+    assert jaipur["parameters"]["ec"]["rating"] == "saline"
+    assert reloaded.get_district_summary("Nowhere") is None
+
+    p90 = reloaded.percentile("Indore", "ph", 90, "Madhya Pradesh")
+    rank = reloaded.percentile_rank("Indore", "ph", 7.25, "Madhya Pradesh")
+    print(f"  Indore pH p90={float(p90):.2f}, rank of 7.25={rank:.0f}")
+    assert 7.7 < float(p90) < 7.9
+    assert rank == 30.0
+
+    text = reloaded.format_summary(indore, "english")
+    assert "PH: 7.45" in text and "samples deficient" in text
+    assert "जिंक" in reloaded.format_summary(indore, "hindi")
+    print("  ✅ Lookup and percentiles work")
+
+    # Service layer returns the store summary
+    from agriculture_apis import agriculture_api_service
+    from soil_health_store import soil_health_store
+    soil_health_store.__init__(store_path)
+    info = asyncio.run(agriculture_api_service.get_soil_health_info("Indore", "Madhya Pradesh"))
+    assert info["parameters"]["ph"]["samples"] == 10
+    print("  ✅ get_soil_health_info uses the store")
+
+    print("\n✅ Soil health store test completed!")
+
+
+if __name__ == "__main__":
+    test_soil_health_store()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Offline test for partial-transcript coalescing and delta encoding
+"""
+
+import asyncio
+
+from transcript_coalescer import TranscriptCoalescer, caption_totals, get_caption_stats
+
+UTTERANCE = "गेहूं का आज का मंडी भाव क्या है"
+
+
+def _partials(text, repeats=3):
+    """AssemblyAI-like partials: every word appears, is revised once, and repeats"""
+    words = text.split()
+    partials = []
+    for i in range(1, len(words) + 1):
+        draft = words[:i - 1] + [words[i - 1][:-1] or words[i - 1]]
+        partials.append(" ".join(draft))
+        partials.extend([" ".join(words[:i])] * repeats)
+    return partials
+
+
+class Client:
+    """Applies caption frames the way a delta-aware client would"""
+
+    def __init__(self):
+        self.frames = []
+        self.caption = ""
+        self.finals = []
+
+    async def send(self, frame):
+        self.frames.append(frame)
+        if frame["is_final"]:
+            self.finals.append(frame["text"])
+            self.caption = ""
+        elif "keep" in frame:
+            words = self.caption.split()[:frame["keep"]]
+            self.caption = " ".join(words + frame["append"].split())
+        else:
+            self.caption = frame["text"]
+
+
+async def _run_deltas():
+    client = Client()
+    coalescer = TranscriptCoalescer(client.send, deltas=True, min_interval_ms=100, min_words=1, max_hold_ms=300)
+
+    for partial in _partials(UTTERANCE):
+        await coalescer.partial(partial)
+        await asyncio.sleep(0.02)
+    # The latest partial is flushed once the interval has run out
+    await asyncio.sleep(0.15)
+    assert client.caption == UTTERANCE, client.caption
+
+    await coalescer.final(UTTERANCE)
+    assert client.finals == [UTTERANCE] and client.frames[-1]["text"] == UTTERANCE
+
+    # The next utterance starts from an empty caption
+    await coalescer.partial("धान")
+    assert client.frames[-1] == {"type": "transcript", "is_final": False, "keep": 0, "append": "धान"}
+
+    stats = coalescer.stats
+    print(f"  Delta stats: {stats}")
+    assert stats["partial_frames"] + stats["final_frames"] < stats["partials_in"] / 3
+    assert stats["bytes"] < stats["naive_bytes"] / 3
+    coalescer.close()
+
+
+async def _run_thresholds():
+    client = Client()
+    coalescer = TranscriptCoalescer(client.send, deltas=False, min_interval_ms=50, min_words=2, max_hold_ms=200)
+
+    await coalescer.partial("गेहूं का")
+    assert client.caption == "गेहूं का"
+    await asyncio.sleep(0.06)
+
+    # One changed word: below the threshold, held until max_hold
+    await coalescer.partial("गेहूं का भाव")
+    assert client.caption == "गेहूं का"
+    await asyncio.sleep(0.1)
+    assert client.caption == "गेहूं का"
+    await asyncio.sleep(0.15)
+    assert client.caption == "गेहूं का भाव"
+    assert "keep" not in client.frames[-1]
+
+    # Unchanged text is never resent; a final cancels the held partial
+    frames = len(client.frames)
+    await coalescer.partial("गेहूं का भाव")
+    assert len(client.frames) == frames
+    await coalescer.partial("गेहूं का भाव बताओ")
+    await coalescer.final("गेहूं का भाव बताओ")
+    await asyncio.sleep(0.25)
+    assert client.frames[-1]["is_final"] and len(client.frames) == frames + 1
+    coalescer.close()
+
+
+def test_transcript_coalescer():
+    """Test partial throttling, word thresholds and delta-encoded captions"""
+    print("💬 Testing Transcript Coalescer")
+    print("=" * 40)
+
+    # Counters are per worker and shared with other tests: compare deltas
+    before = caption_totals["utterances"]
+    asyncio.run(_run_deltas())
+    print("  ✅ Delta captions rebuild the full text with fewer, smaller frames")
+
+    asyncio.run(_run_thresholds())
+    print("  ✅ Interval, word threshold and final flush")
+
+    stats = get_caption_stats()
+    print(f"  Caption totals: {stats}")
+    assert caption_totals["utterances"] - before == 2
+
+    print("\n✅ Transcript coalescer test completed!")
+
+
+if __name__ == "__main__":
+    test_transcript_coalescer()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Offline test for latency-aware TTS routing (local stand-in providers with
+configurable latency and failures, and the gTTS / ElevenLabs providers with
+their blocking SDK calls replaced by stand-ins)
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import voice_service as voice_service_module
+from tts_router import CircuitBreaker, TTSRouter
+from voice_service import voice_service
+
+
+class StandInProvider:
+    """TTS provider answering after `latency` seconds, or failing"""
+
+    def __init__(self, name, latency, fail=False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    async def __call__(self, text, language, profile):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.fail == "raise":
+            raise ConnectionError(f"{self.name} unreachable")
+        if self.fail:
+            return b"", ""
+        return f"{self.name}:{text}".encode("utf-8"), "audio/mpeg"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def _run_routing():
+    fast = StandInProvider("fast", 0.01)
+    slow = StandInProvider("slow", 0.08)
+    router = TTSRouter({"slow": slow, "fast": fast}, hedge_min_ms=20, hedge_max_ms=200)
+
+    # Unmeasured providers keep preference order behind measured ones
+    audio, _, provider = await router.synthesize("a", "hindi", "native", ["slow", "fast"])
+    assert provider == "slow" and audio == b"slow:a"
+    assert router.rank("hindi", ["fast", "slow"]) == ["slow", "fast"]
+    # Once both are measured, the faster provider wins
+    await router.synthesize("b", "hindi", "native", ["fast"])
+    assert router.rank("hindi", ["slow", "fast"]) == ["fast", "slow"]
+    # Stats are per language
+    assert router.rank("tamil", ["slow", "fast"]) == ["slow", "fast"]
+    print("  ✅ Fastest measured provider ranked first")
+
+    # Hedging: once the primary's p95 is known, a stall past it hedges
+    for _ in range(5):
+        await router.synthesize("warm", "english", "native", ["fast", "slow"])
+    fast.latency = 0.5
+    start = time.monotonic()
+    audio, _, provider = await router.synthesize("stall", "english", "native", ["fast", "slow"])
+    elapsed = time.monotonic() - start
+    print(f"  Hedged request: {provider} in {elapsed * 1000:.0f} ms, {router.counters}")
+    assert provider == "slow" and elapsed < 0.3
+    assert router.counters["hedges"] == 1 and router.counters["hedge_wins"] == 1
+    print("  ✅ Slow primary hedged after its p95")
+
+
+async def _run_failover():
+    clock = FakeClock()
+    broken = StandInProvider("broken", 0.0, fail=True)
+    flaky = StandInProvider("flaky", 0.0, fail="raise")
+    backup = StandInProvider("backup", 0.01)
+    router = TTSRouter(
+        {"broken": broken, "flaky": flaky, "backup": backup},
+        breaker_factory=lambda: CircuitBreaker(failure_threshold=2, cooldown_seconds=30, clock=clock)
+    )
+
+    # Empty audio and exceptions both fail over; the client always gets audio
+    for i in range(3):
+        audio, _, provider = await router.synthesize(f"q{i}", "hindi", "native", ["broken", "flaky", "backup"])
+        assert audio and provider == "backup"
+    assert router.counters["failovers"] == 2 and router.counters["empty"] == 0
+    # Providers with high error rates drop behind healthy ones
+    assert router.rank("hindi", ["broken", "flaky", "backup"])[0] == "backup"
+
+    # Consecutive failures open the breaker: no traffic until the cooldown ends
+    await router.synthesize("q", "hindi", "native", ["broken"])
+    stats = router.get_stats()
+    assert stats["providers"]["broken"]["circuit"] == "open"
+    assert stats["providers"]["broken"]["languages"]["hindi"]["error_rate"] == 1.0
+    assert router.rank("hindi", ["broken", "backup"]) == ["backup"]
+    calls = broken.calls
+    await router.synthesize("q", "hindi", "native", ["broken", "backup"])
+    assert broken.calls == calls
+    print("  ✅ Failover and circuit breakers work")
+
+    # Half-open after the cooldown: one success closes the circuit again
+    clock.now = 31
+    broken.fail = False
+    assert "broken" in router.rank("hindi", ["broken", "backup"])
+    audio, _, provider = await router.synthesize("q", "hindi", "native", ["broken"])
+    assert provider == "broken"
+    assert router.breakers["broken"].state == CircuitBreaker.CLOSED
+
+    # Nothing healthy at all: empty audio, counted
+    flaky.fail = True
+    clock.now = 100
+    audio, _, provider = await router.synthesize("q", "hindi", "native", ["flaky"])
+    assert audio == b"" and provider is None and router.counters["empty"] == 2
+    print("  ✅ Half-open recovery works")
+
+
+class BlockingGTTS:
+    """gTTS stand-in whose write_to_fp blocks like the real HTTP requests"""
+
+    latency = 0.01
+
+    def __init__(self, text, lang, slow=False):
+        self.text = text
+
+    def write_to_fp(self, fp):
+        time.sleep(BlockingGTTS.latency)
+        fp.write(f"gtts:{self.text}".encode("utf-8"))
+
+
+def _blocking_convert(text, voice_id, model_id):
+    """ElevenLabs convert stand-in: blocks, then the connection drops"""
+    time.sleep(0.5)
+    raise ConnectionError("elevenlabs unreachable")
+
+
+async def _run_blocking_providers():
+    fast = StandInProvider("fast", 0.05)
+    router = TTSRouter(
+        {"gtts": voice_service._gtts_provider, "elevenlabs": voice_service._elevenlabs_provider, "fast": fast},
+        hedge_min_ms=20, hedge_max_ms=200
+    )
+    original_gtts, original_client = voice_service_module.gTTS, voice_service.elevenlabs_client
+    voice_service_module.gTTS = BlockingGTTS
+    voice_service.elevenlabs_client = SimpleNamespace(text_to_speech=SimpleNamespace(convert=_blocking_convert))
+    try:
+        for _ in range(5):
+            await router.synthesize("warm", "hindi", "native", ["gtts", "fast"])
+
+        # A stalled blocking SDK call must not stall the loop: the hedge still fires
+        BlockingGTTS.latency = 0.5
+        start = time.monotonic()
+        audio, _, provider = await router.synthesize("stall", "hindi", "native", ["gtts", "fast"])
+        elapsed = time.monotonic() - start
+        print(f"  Blocking gTTS hedged: {provider} in {elapsed * 1000:.0f} ms")
+        assert provider == "fast" and elapsed < 0.3
+        assert router.counters["hedge_wins"] == 1
+
+        # ElevenLabs blocking and then failing: the fast provider still answers in time
+        start = time.monotonic()
+        audio, _, provider = await router.synthesize("q", "hindi", "native", ["elevenlabs", "fast"])
+        assert provider == "fast" and audio == b"fast:q"
+        assert time.monotonic() - start < 0.3
+    finally:
+        voice_service_module.gTTS, voice_service.elevenlabs_client = original_gtts, original_client
+        BlockingGTTS.latency = 0.01
+        # Let the abandoned SDK threads finish before the loop closes
+        await asyncio.sleep(0.6)
+    print("  ✅ Blocking SDK providers run off the event loop")
+
+
+def test_tts_router():
+    """Test ranking, hedging, failover and circuit breaking"""
+    print("🔀 Testing TTS Router")
+    print("=" * 40)
+
+    asyncio.run(_run_routing())
+    asyncio.run(_run_failover())
+    asyncio.run(_run_blocking_providers())
+
+    print("\n✅ TTS router test completed!")
+
+
+if __name__ == "__main__":
+    test_tts_router()
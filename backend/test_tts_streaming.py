@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Offline test for streaming TTS: thread-to-loop chunk forwarding and the
+chunked /v2/voice/query response (Azure synthesizers replaced by the
+stand-in from test_azure_tts_pool)
+"""
+
+import asyncio
+import json
+import time
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from audio_transcoder import pcm_to_wav
+from azure_tts_pool import azure_synthesizer_pool
+from binary_transport import parse_multipart_mixed
+from config import Config
+from main import app
+from test_azure_tts_pool import StandInSynthesizer
+from tts_router import TTSRouter
+from voice_service import iterate_in_thread, voice_service
+
+
+def slow_chunks():
+    """Blocking provider iterator: one chunk every 50 ms"""
+    for i in range(4):
+        time.sleep(0.05)
+        yield bytes([i]) * 10
+
+
+async def _run_iterate():
+    start = time.monotonic()
+    chunks = []
+    async for chunk in iterate_in_thread(slow_chunks):
+        chunks.append((chunk, time.monotonic() - start))
+    assert [c for c, _ in chunks] == [bytes([i]) * 10 for i in range(4)]
+    assert chunks[0][1] < 0.15, "first chunk held back until the iterator finished"
+
+    # Provider errors surface to the consumer
+    def failing():
+        yield b"ok"
+        raise RuntimeError("stream dropped")
+
+    try:
+        async for _ in iterate_in_thread(failing):
+            pass
+        raise AssertionError("error not raised")
+    except RuntimeError as e:
+        assert "stream dropped" in str(e)
+
+
+async def _run_stream_outcomes():
+    async def provider_stream(fail):
+        for i in range(3):
+            await asyncio.sleep(0.01)
+            yield bytes([i]) * 10
+        if fail:
+            raise RuntimeError("connection reset")
+
+    async def unused(text, language, profile):
+        return b"", ""
+
+    router = TTSRouter({"azure": unused})
+    original_router, voice_service.tts_router = voice_service.tts_router, router
+    try:
+        # Dropped mid-stream: the audio sent so far does not make it a success
+        chunks = [c async for c in voice_service._timed_stream(provider_stream(True), "azure", "text", "hindi", "native", [])]
+        assert len(chunks) == 3
+        stats = router._stats_for("azure", "hindi")
+        assert list(stats.outcomes) == [False] and router.breakers["azure"].failures == 1
+
+        # Time to first chunk is kept apart from the full-synthesis latencies behind the hedge delay
+        async for _ in voice_service._timed_stream(provider_stream(False), "azure", "text", "hindi", "native", []):
+            pass
+        assert list(stats.outcomes) == [False, True]
+        assert not stats.latencies and len(stats.first_chunks) == 1
+        print(f"  Stream stats: {stats.summary()}")
+    finally:
+        voice_service.tts_router = original_router
+
+
+def test_tts_streaming():
+    """Test chunk forwarding and the streamed v2 voice response"""
+    print("🌊 Testing Streaming TTS")
+    print("=" * 40)
+
+    asyncio.run(_run_iterate())
+    print("  ✅ Blocking iterators stream into the event loop")
+
+    asyncio.run(_run_stream_outcomes())
+    print("  ✅ Streams failing mid-way count as failures; first-chunk times kept apart")
+
+    original = (voice_service.tts_provider, Config.AZURE_SPEECH_KEY, Config.AZURE_SPEECH_REGION, azure_synthesizer_pool.factory)
+    try:
+        voice_service.tts_provider = "azure"
+        Config.AZURE_SPEECH_KEY, Config.AZURE_SPEECH_REGION = "offline", "offline"
+        azure_synthesizer_pool.factory = StandInSynthesizer
+        client = TestClient(app)
+        silent_wav = pcm_to_wav(np.zeros(16000, dtype=np.int16))
+
+        response = client.post(
+            "/v2/voice/query?session_id=s-stream&language=english&stream=1",
+            content=silent_wav,
+            headers={"content-type": "application/octet-stream"}
+        )
+        assert response.status_code == 200
+        assert "content-length" not in response.headers
+        parts = parse_multipart_mixed(response.content, response.headers["content-type"])
+        metadata = json.loads(parts[0][1])
+        audio = parts[1][1]
+        print(f"  Streamed: {metadata['text_response']!r} -> {len(audio)} bytes")
+        assert metadata["audio_streaming"] is True and "audio_size" not in metadata
+        assert metadata["text_response"] in audio.decode("utf-8")
+        print("  ✅ Chunked multipart/mixed response carries the streamed audio")
+    finally:
+        voice_service.tts_provider, Config.AZURE_SPEECH_KEY, Config.AZURE_SPEECH_REGION, azure_synthesizer_pool.factory = original
+        # Drop the pooled stand-in synthesizers along with their factory
+        for pooled in (azure_synthesizer_pool._idle, azure_synthesizer_pool._total, azure_synthesizer_pool._available):
+            pooled.clear()
+
+    print("\n✅ Streaming TTS test completed!")
+
+
+if __name__ == "__main__":
+    test_tts_streaming()
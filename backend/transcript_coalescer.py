@@ -0,0 +1,170 @@
+"""
+Partial Transcript Coalescing for /ws/voice
+AssemblyAI sends a partial for nearly every audio chunk, each repeating the
+whole utterance so far. TranscriptCoalescer sits between the session's
+transcript bridge and the socket and sends fewer, smaller caption frames:
+
+- a partial is sent only if TRANSCRIPT_PARTIAL_INTERVAL_MS have passed since
+  the previous caption frame and at least TRANSCRIPT_PARTIAL_MIN_WORDS words
+  changed; otherwise it is held, and the latest held partial is flushed when
+  the interval (or, below the word threshold, TRANSCRIPT_PARTIAL_MAX_HOLD_MS)
+  runs out, so captions never go stale
+- partials with unchanged text are never sent
+- the final transcript is always sent at once with the full text
+
+With "transcript_deltas": true in the start message, partials are encoded
+against the previous caption frame of the utterance:
+
+    {"type": "transcript", "is_final": false, "keep": 3, "append": "का भाव"}
+
+meaning: keep the first 3 words of the previous partial text (split on
+whitespace) and append the given words. Finals carry "text" as before.
+"""
+
+import json
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Caption counters of all closed connections in this worker
+caption_totals = {"utterances": 0, "partials_in": 0, "partial_frames": 0, "final_frames": 0, "bytes": 0, "naive_bytes": 0}
+
+
+def _frame_size(frame: Dict) -> int:
+    # Same encoding as starlette's send_json
+    return len(json.dumps(frame, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def _common_prefix(old: List[str], new: List[str]) -> int:
+    common = 0
+    for a, b in zip(old, new):
+        if a != b:
+            break
+        common += 1
+    return common
+
+
+class TranscriptCoalescer:
+    """Throttles and delta-encodes caption frames for one WebSocket connection"""
+
+    def __init__(
+        self,
+        send: Callable[[Dict], Awaitable[None]],
+        deltas: bool = False,
+        min_interval_ms: float = Config.TRANSCRIPT_PARTIAL_INTERVAL_MS,
+        min_words: int = Config.TRANSCRIPT_PARTIAL_MIN_WORDS,
+        max_hold_ms: float = Config.TRANSCRIPT_PARTIAL_MAX_HOLD_MS
+    ):
+        self.send = send
+        self.deltas = deltas
+        self.min_interval = min_interval_ms / 1000
+        self.min_words = min_words
+        self.max_hold = max(max_hold_ms, min_interval_ms) / 1000
+
+        self._sent_words: List[str] = []  # Words of the last caption frame of this utterance
+        self._pending: Optional[List[str]] = None
+        self._last_sent = float("-inf")
+        self._flush_at: Optional[float] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.stats = dict.fromkeys(caption_totals, 0)
+
+    async def partial(self, text: str):
+        """Offer a partial transcript; it is sent now, later or not at all"""
+        self.stats["partials_in"] += 1
+        self.stats["naive_bytes"] += _frame_size({"type": "transcript", "text": text, "is_final": False})
+
+        words = text.split()
+        common = _common_prefix(self._sent_words, words)
+        changed = max(len(self._sent_words), len(words)) - common
+        if changed == 0:
+            self._pending = None
+            return
+
+        loop = asyncio.get_running_loop()
+        if changed >= self.min_words and loop.time() - self._last_sent >= self.min_interval:
+            self._pending = None
+            await self._send_partial(words)
+            return
+
+        self._pending = words
+        hold = self.min_interval if changed >= self.min_words else self.max_hold
+        self._schedule_flush(self._last_sent + hold)
+
+    async def final(self, text: str):
+        """Send the final transcript (full text) and start a new utterance"""
+        self._cancel_flush()
+        self._pending = None
+        frame = {"type": "transcript", "text": text, "is_final": True}
+        size = _frame_size(frame)
+        self.stats["naive_bytes"] += size
+        async with self._lock:
+            await self.send(frame)
+            self._sent_words = []
+            self._last_sent = float("-inf")
+        self.stats["final_frames"] += 1
+        self.stats["utterances"] += 1
+        self.stats["bytes"] += size
+
+    async def _send_partial(self, words: List[str]):
+        async with self._lock:
+            # Encode under the lock: the delta base is whatever was sent last
+            if self.deltas:
+                keep = _common_prefix(self._sent_words, words)
+                frame = {"type": "transcript", "is_final": False, "keep": keep, "append": " ".join(words[keep:])}
+            else:
+                frame = {"type": "transcript", "text": " ".join(words), "is_final": False}
+            await self.send(frame)
+            self._sent_words = words
+            self._last_sent = asyncio.get_running_loop().time()
+        self.stats["partial_frames"] += 1
+        self.stats["bytes"] += _frame_size(frame)
+
+    def _schedule_flush(self, flush_at: float):
+        if self._flush_task and not self._flush_task.done() and self._flush_at is not None:
+            # Still sleeping: keep it if it fires early enough, else replace it
+            if self._flush_at <= flush_at:
+                return
+            self._flush_task.cancel()
+        self._flush_at = flush_at
+        self._flush_task = asyncio.create_task(self._flush_later(flush_at))
+
+    async def _flush_later(self, flush_at: float):
+        await asyncio.sleep(max(0.0, flush_at - asyncio.get_running_loop().time()))
+        self._flush_at = None
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            try:
+                await self._send_partial(pending)
+            except Exception as e:
+                logger.warning(f"Could not send caption: {str(e)}")
+
+    def _cancel_flush(self):
+        # A flush already sending finishes first (the send lock orders it before the final)
+        if self._flush_task and not self._flush_task.done() and self._flush_at is not None:
+            self._flush_task.cancel()
+        self._flush_task = None
+        self._flush_at = None
+
+    def close(self):
+        """Drop held partials and add this connection's counters to caption_totals"""
+        self._cancel_flush()
+        self._pending = None
+        for key, value in self.stats.items():
+            caption_totals[key] += value
+        self.stats = dict.fromkeys(caption_totals, 0)
+
+
+def get_caption_stats() -> Dict:
+    """Caption frames and bytes per utterance, against one full frame per partial"""
+    utterances = caption_totals["utterances"] or 1
+    return {
+        **caption_totals,
+        "frames_per_utterance": round((caption_totals["partial_frames"] + caption_totals["final_frames"]) / utterances, 2),
+        "bytes_per_utterance": round(caption_totals["bytes"] / utterances),
+        "naive_bytes_per_utterance": round(caption_totals["naive_bytes"] / utterances)
+    }
@@ -0,0 +1,265 @@
+"""
+TTS Provider Router
+Sends each synthesis request to the fastest healthy TTS provider instead of
+the single provider fixed by Config.TTS_PROVIDER.
+
+- Rolling latency / error stats are kept per (provider, language)
+- A circuit breaker per provider stops traffic to a failing provider for a
+  cooldown period, then lets a trial request through (half-open)
+- If the chosen provider has not answered after its p95 latency, a hedged
+  request goes to the next provider; the first non-empty audio wins
+- Empty audio or an exception counts as a failure and fails over at once
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# (text, language, profile) -> (audio bytes, media type)
+ProviderFn = Callable[[str, str, str], Awaitable[Tuple[bytes, str]]]
+
+
+class ProviderStats:
+    """Rolling window of latencies and outcomes for one provider / language"""
+
+    def __init__(self, window: int = Config.TTS_STATS_WINDOW):
+        self.latencies: Deque[float] = deque(maxlen=window)  # Full synthesis (ranking, hedging)
+        self.first_chunks: Deque[float] = deque(maxlen=window)  # Streaming time to first chunk
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+
+    def record(self, latency_ms: float, ok: bool):
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency_ms)
+
+    def record_stream(self, first_chunk_ms: Optional[float], ok: bool):
+        self.outcomes.append(ok)
+        if ok and first_chunk_ms is not None:
+            self.first_chunks.append(first_chunk_ms)
+
+    def percentile(self, q: float, samples: Optional[Deque[float]] = None) -> Optional[float]:
+        samples = self.latencies if samples is None else samples
+        if not samples:
+            return None
+        return float(np.percentile(np.fromiter(samples, dtype=np.float64), q))
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+    def summary(self) -> Dict:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        first_chunk_p50 = self.percentile(50, self.first_chunks)
+        return {
+            "samples": len(self.outcomes),
+            "p50_ms": round(p50, 1) if p50 is not None else None,
+            "p95_ms": round(p95, 1) if p95 is not None else None,
+            "first_chunk_p50_ms": round(first_chunk_p50, 1) if first_chunk_p50 is not None else None,
+            "error_rate": round(self.error_rate, 3)
+        }
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open after cooldown"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = Config.TTS_BREAKER_FAILURES,
+        cooldown_seconds: float = Config.TTS_BREAKER_COOLDOWN_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def available(self) -> bool:
+        """Whether a request may be sent (moves open -> half-open after the cooldown)"""
+        if self.state == self.OPEN and self.clock() - self.opened_at >= self.cooldown_seconds:
+            self.state = self.HALF_OPEN
+        return self.state != self.OPEN
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"⚠️ TTS circuit opened after {self.failures} failures")
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+
+class TTSRouter:
+    """Latency-aware TTS routing with hedging and per-provider circuit breakers"""
+
+    def __init__(
+        self,
+        providers: Dict[str, ProviderFn],
+        hedge_min_ms: float = Config.TTS_HEDGE_MIN_MS,
+        hedge_max_ms: float = Config.TTS_HEDGE_MAX_MS,
+        min_samples: int = 5,
+        breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker
+    ):
+        self.providers = providers
+        self.hedge_min_ms = hedge_min_ms
+        self.hedge_max_ms = hedge_max_ms
+        self.min_samples = min_samples
+        self.breakers = {name: breaker_factory() for name in providers}
+        self._stats: Dict[Tuple[str, str], ProviderStats] = {}
+        self.counters = {"requests": 0, "hedges": 0, "hedge_wins": 0, "failovers": 0, "empty": 0}
+
+    def _stats_for(self, provider: str, language: str) -> ProviderStats:
+        key = (provider, language)
+        if key not in self._stats:
+            self._stats[key] = ProviderStats()
+        return self._stats[key]
+
+    def rank(self, language: str, candidates: List[str]) -> List[str]:
+        """
+        Order candidate providers for a language: healthy before open
+        circuits, then by p50 latency, then by the given preference order.
+        Providers without samples keep their preference position after
+        measured ones.
+        """
+        candidates = [name for name in candidates if name in self.providers]
+
+        def key(item):
+            index, name = item
+            stats = self._stats_for(name, language)
+            p50 = stats.percentile(50)
+            return (not self.breakers[name].available(), stats.error_rate >= 0.5,
+                    p50 if p50 is not None else float("inf"), index)
+
+        ranked = [name for _, name in sorted(enumerate(candidates), key=key)]
+        healthy = [name for name in ranked if self.breakers[name].state != CircuitBreaker.OPEN]
+        # Every circuit open: still try them, in order, rather than return silence
+        return healthy or ranked
+
+    def hedge_delay(self, provider: str, language: str) -> float:
+        """Seconds to wait on a provider before hedging: its p95, clamped"""
+        stats = self._stats_for(provider, language)
+        p95 = stats.percentile(95) if len(stats.latencies) >= self.min_samples else None
+        delay_ms = self.hedge_max_ms if p95 is None else min(max(p95, self.hedge_min_ms), self.hedge_max_ms)
+        return delay_ms / 1000
+
+    def record(self, provider: str, language: str, latency_ms: float, ok: bool):
+        """Record the outcome and full synthesis latency of a call"""
+        self._stats_for(provider, language).record(latency_ms, ok)
+        self._record_breaker(provider, ok)
+
+    def record_stream(self, provider: str, language: str, first_chunk_ms: Optional[float], ok: bool):
+        """
+        Record a streaming call that bypassed synthesize
+
+        Its time to first chunk is kept apart from the full synthesis
+        latencies that ranking and the hedge delay use.
+        """
+        self._stats_for(provider, language).record_stream(first_chunk_ms, ok)
+        self._record_breaker(provider, ok)
+
+    def _record_breaker(self, provider: str, ok: bool):
+        if ok:
+            self.breakers[provider].record_success()
+        else:
+            self.breakers[provider].record_failure()
+
+    async def _call(self, provider: str, text: str, language: str, profile: str) -> Tuple[bytes, str]:
+        start = time.monotonic()
+        try:
+            audio, media_type = await self.providers[provider](text, language, profile)
+        except Exception as e:
+            logger.error(f"Error in TTS ({provider}): {str(e)}")
+            audio, media_type = b"", ""
+        self.record(provider, language, (time.monotonic() - start) * 1000, bool(audio))
+        return audio, media_type
+
+    async def synthesize(
+        self,
+        text: str,
+        language: str,
+        profile: str,
+        candidates: List[str]
+    ) -> Tuple[bytes, str, Optional[str]]:
+        """
+        Synthesize on the best provider, hedging and failing over as needed
+
+        Args:
+            text: Text to convert to speech
+            language: Language for TTS
+            profile: Audio profile passed through to the provider
+            candidates: Enabled providers in preference order
+
+        Returns:
+            (audio bytes, media type, provider that produced it); empty
+            audio and None only if every provider failed
+        """
+        self.counters["requests"] += 1
+        queue = self.rank(language, candidates)
+        pending: Dict[asyncio.Task, str] = {}
+        hedged = False
+
+        def launch():
+            provider = queue.pop(0)
+            pending[asyncio.create_task(self._call(provider, text, language, profile))] = provider
+            return provider
+
+        primary = launch()
+        try:
+            while pending:
+                # Hedge at most once per request, after the primary's p95
+                timeout = self.hedge_delay(primary, language) if queue and not hedged else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    self.counters["hedges"] += 1
+                    logger.info(f"TTS {primary} slower than p95, hedging on {launch()}")
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    audio, media_type = task.result()
+                    if audio:
+                        if provider != primary and hedged:
+                            self.counters["hedge_wins"] += 1
+                        return audio, media_type, provider
+
+                if not pending and queue:
+                    self.counters["failovers"] += 1
+                    logger.warning(f"⚠️ TTS failed on {provider}, failing over to {queue[0]}")
+                    primary = launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.counters["empty"] += 1
+        return b"", "", None
+
+    def get_stats(self) -> Dict:
+        """Router counters, breaker states and per-language latency stats"""
+        providers = {
+            name: {"circuit": breaker.state, "languages": {}}
+            for name, breaker in self.breakers.items()
+        }
+        for (provider, language), stats in self._stats.items():
+            if stats.outcomes:
+                providers[provider]["languages"][language] = stats.summary()
+        return {**self.counters, "providers": providers}
@@ -0,0 +1,198 @@
+"""
+Conversation Turn Management for /ws/voice
+Each final transcript starts a turn: the graph run, TTS and the response
+frames for that utterance. A connection has at most one turn in flight; when
+the farmer speaks again (barge-in), the new final transcript cancels the old
+turn's task - the pending graph.ainvoke and LLM await, and any TTS stream -
+before the new turn starts, and the client gets
+
+    {"type": "cancelled", "turn": n, "reason": "barge_in"}
+
+Response frames carry the same "turn" number so clients can drop anything
+late from a cancelled turn. Cancellation latency (cancel request to the old
+task having unwound) is recorded per worker.
+
+Limit: the agents call the LLM synchronously (llm.invoke), and LangGraph runs
+them in executor threads. Cancelling a turn unwinds its task at once, but a
+thread already inside llm.invoke cannot be interrupted and runs the call to
+the end; its result is dropped. That wasted LLM time is measured separately
+from the cancellation latency: llm_call_tracker (a callback on the agents'
+chat model) counts the LLM calls each turn has in flight, and a cancelled
+turn records how long its last call kept running (llm_overrun_ms).
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+# Turn counters of all connections in this worker
+turn_totals = {"turns": 0, "completed": 0, "cancelled": 0, "failed": 0, "llm_overruns": 0}
+_cancel_ms: Deque[float] = deque(maxlen=500)
+_llm_overrun_ms: Deque[float] = deque(maxlen=500)
+
+
+class BlockingWork:
+    """
+    LLM calls of one turn (or speculation) running in executor threads
+
+    Args:
+        on_overrun: Called with the ms the calls kept running after cancel()
+            (from the executor thread that finished last)
+    """
+
+    def __init__(self, on_overrun: Callable[[float], None]):
+        self.on_overrun = on_overrun
+        self.in_flight = 0
+        self.cancelled_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def call_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def call_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+            overrun = self.in_flight == 0 and self.cancelled_at is not None
+        if overrun:
+            self.on_overrun((time.monotonic() - self.cancelled_at) * 1000)
+
+    def cancel(self) -> int:
+        """Mark the owner cancelled; returns the LLM calls still running"""
+        with self._lock:
+            self.cancelled_at = time.monotonic()
+            return self.in_flight
+
+
+# Work of the turn / speculation this code runs for (copied into executor threads)
+current_work: ContextVar[Optional[BlockingWork]] = ContextVar("current_work", default=None)
+
+
+class LLMCallTracker(BaseCallbackHandler):
+    """Counts LLM calls against current_work (a callback on the agents' chat model)"""
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        work = current_work.get()
+        if work:
+            work.call_started()
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.on_llm_start(serialized, [], **kwargs)
+
+    def on_llm_end(self, response, **kwargs):
+        work = current_work.get()
+        if work:
+            work.call_finished()
+
+    def on_llm_error(self, error, **kwargs):
+        self.on_llm_end(None, **kwargs)
+
+
+llm_call_tracker = LLMCallTracker()
+
+
+def _record_llm_overrun(ms: float):
+    _llm_overrun_ms.append(ms)
+    turn_totals["llm_overruns"] += 1
+
+
+class TurnManager:
+    """Runs one turn at a time for a connection; a new turn cancels the previous one"""
+
+    def __init__(self, on_cancel: Optional[Callable[[int, str], Awaitable[None]]] = None):
+        self.on_cancel = on_cancel
+        self.turn = 0
+        self._task: Optional[asyncio.Task] = None
+        self._task_turn = 0
+        self._work: Optional[BlockingWork] = None
+
+    @property
+    def busy(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, run: Callable[[int], Awaitable[None]]) -> int:
+        """
+        Cancel the turn in flight (if any) and start a new one
+
+        Args:
+            run: Coroutine function taking the turn number
+
+        Returns:
+            The new turn number
+        """
+        await self.cancel("barge_in")
+        self.turn += 1
+        self._task_turn = self.turn
+        self._work = BlockingWork(_record_llm_overrun)
+        self._task = asyncio.create_task(self._run(run, self.turn, self._work))
+        self._task.add_done_callback(self._finished)
+        turn_totals["turns"] += 1
+        return self.turn
+
+    @staticmethod
+    async def _run(run: Callable[[int], Awaitable[None]], turn: int, work: BlockingWork):
+        current_work.set(work)
+        await run(turn)
+
+    def _finished(self, task: asyncio.Task):
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            turn_totals["failed"] += 1
+            logger.error(f"Turn failed: {task.exception()}")
+        else:
+            turn_totals["completed"] += 1
+
+    async def cancel(self, reason: str = "cancelled") -> Optional[float]:
+        """
+        Cancel the turn in flight and wait for it to unwind
+
+        The task unwinds at its next await; a sync llm.invoke already running
+        in an executor thread is not interrupted (see llm_overrun_ms).
+
+        Returns:
+            Cancellation latency in ms, or None if nothing was running
+        """
+        task, turn, work = self._task, self._task_turn, self._work
+        self._task = self._work = None
+        if task is None or task.done():
+            return None
+
+        started = time.monotonic()
+        task.cancel()
+        running_calls = work.cancel()
+        await asyncio.wait([task])
+        latency_ms = (time.monotonic() - started) * 1000
+        _cancel_ms.append(latency_ms)
+        turn_totals["cancelled"] += 1
+        logger.info(f"✋ Turn {turn} cancelled ({reason}) in {latency_ms:.1f} ms"
+                    + (f", {running_calls} LLM call(s) left running" if running_calls else ""))
+
+        if self.on_cancel:
+            try:
+                await self.on_cancel(turn, reason)
+            except Exception as e:
+                logger.warning(f"Could not report cancelled turn: {str(e)}")
+        return latency_ms
+
+
+def get_turn_stats() -> Dict:
+    """Turn outcomes, cancellation latency and LLM time wasted by cancelled turns"""
+    cancel_ms = sorted(_cancel_ms)
+    overrun_ms = sorted(_llm_overrun_ms)
+    return {
+        **turn_totals,
+        "cancel_ms_p50": round(cancel_ms[len(cancel_ms) // 2], 2) if cancel_ms else None,
+        "cancel_ms_p95": round(cancel_ms[int(len(cancel_ms) * 0.95)], 2) if cancel_ms else None,
+        "cancel_ms_max": round(cancel_ms[-1], 2) if cancel_ms else None,
+        "llm_overrun_ms_p50": round(overrun_ms[len(overrun_ms) // 2], 1) if overrun_ms else None,
+        "llm_overrun_ms_max": round(overrun_ms[-1], 1) if overrun_ms else None
+    }
@@ -1,40 +1,175 @@
-import os
+import time
 import base64
 import asyncio
+import threading
 import aiohttp
-import tempfile
-from typing import Optional
-import assemblyai as aai
+import numpy as np
+from typing import AsyncIterator, Callable, Iterable, Optional, Dict, List, Tuple
 from elevenlabs import ElevenLabs, Voice, VoiceSettings
 from gtts import gTTS
 import io
 from config import Config
+from audio_transcoder import audio_transcoder, SAMPLE_RATE
+from audio_profiles import AUDIO_PROFILES, NATIVE_PROFILE, audio_variant_cache
+from azure_tts_pool import azure_synthesizer_pool
+from tts_router import TTSRouter
+from local_tts import local_tts
+from local_stt import local_stt
 import logging
 import azure.cognitiveservices.speech as speechsdk
 
 logger = logging.getLogger(__name__)
 
-# Initialize API keys
-aai.settings.api_key = Config.ASSEMBLYAI_API_KEY
+# Audio is decoded once to 16 kHz mono 16-bit PCM for VAD and re-encoding
+VAD_SAMPLE_RATE = SAMPLE_RATE
+VAD_FRAME_MS = 30
+# Speech kept around each detected segment, and the longest pause kept inside
+VAD_PADDING_MS = 200
+VAD_MAX_PAUSE_MS = 600
+
+
+async def iterate_in_thread(make_iterator: Callable[[], Iterable[bytes]]) -> AsyncIterator[bytes]:
+    """
+    Consume a blocking chunk iterator (SDK streaming call) in a worker thread
+    
+    Chunks are handed to the event loop as soon as the provider yields them.
+    If the consumer stops early the worker stops at the next chunk.
+    """
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue()
+    stopped = threading.Event()
+    
+    def pump():
+        try:
+            for chunk in make_iterator():
+                if stopped.is_set():
+                    return
+                loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+            loop.call_soon_threadsafe(chunks.put_nowait, None)
+        except Exception as e:
+            loop.call_soon_threadsafe(chunks.put_nowait, e)
+    
+    loop.run_in_executor(None, pump)
+    try:
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            if chunk:
+                yield bytes(chunk)
+    finally:
+        stopped.set()
+
+
+async def _single_chunk(audio: bytes) -> AsyncIterator[bytes]:
+    if audio:
+        yield audio
+
+
+class VoiceActivityDetector:
+    """Energy / zero-crossing-rate voice activity detector over PCM frames"""
+    
+    def __init__(
+        self,
+        sample_rate: int = VAD_SAMPLE_RATE,
+        frame_ms: int = VAD_FRAME_MS,
+        min_speech_ms: int = Config.VAD_MIN_SPEECH_MS
+    ):
+        self.sample_rate = sample_rate
+        self.frame_len = sample_rate * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+    
+    def speech_frames(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Classify frames as speech
+        
+        Args:
+            samples: int16 mono PCM
+            
+        Returns:
+            Boolean array, one entry per frame
+        """
+        n_frames = len(samples) // self.frame_len
+        if n_frames == 0:
+            return np.zeros(0, dtype=bool)
+        
+        frames = samples[:n_frames * self.frame_len].astype(np.float32).reshape(n_frames, self.frame_len) / 32768.0
+        energy = np.sqrt(np.mean(frames ** 2, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_len
+        
+        # Adaptive threshold over the clip's noise floor, with an absolute minimum
+        noise_floor = np.percentile(energy, 10)
+        threshold = max(noise_floor * 3.0, 0.01)
+        
+        voiced = energy > threshold
+        # Fricatives: weaker but with a high zero-crossing rate
+        unvoiced = (energy > threshold * 0.5) & (zcr > 0.25) & (zcr < 0.6)
+        return voiced | unvoiced
+    
+    def segments(self, samples: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Speech segments as (start, end) sample offsets, padded and with short
+        pauses merged
+        """
+        speech = self.speech_frames(samples)
+        if not speech.any():
+            return []
+        
+        # Run boundaries of the speech mask
+        edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        
+        pad = VAD_PADDING_MS // self.frame_ms
+        max_pause = VAD_MAX_PAUSE_MS // self.frame_ms
+        merged = []
+        for start, end in zip(starts, ends):
+            if merged and start - merged[-1][1] <= max_pause:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        
+        n_frames = len(speech)
+        return [
+            (int(max(0, start - pad)) * self.frame_len, int(min(n_frames, end + pad)) * self.frame_len)
+            for start, end in merged
+            if end - start >= self.min_speech_frames
+        ]
+    
+    def trim(self, samples: np.ndarray) -> np.ndarray:
+        """Keep only speech segments; empty array for a silence-only clip"""
+        segments = self.segments(samples)
+        if not segments:
+            return samples[:0]
+        return np.concatenate([samples[start:end] for start, end in segments])
 
-# Initialize Azure Speech SDK if using Azure
-if Config.TTS_PROVIDER == "azure" and Config.AZURE_SPEECH_KEY and Config.AZURE_SPEECH_REGION:
-    speech_config = speechsdk.SpeechConfig(
-        subscription=Config.AZURE_SPEECH_KEY, 
-        region=Config.AZURE_SPEECH_REGION
-    )
 
 class VoiceService:
     def __init__(self):
-        self.transcriber = aai.Transcriber()
         self.tts_provider = Config.TTS_PROVIDER
         
-        # Initialize ElevenLabs client if using ElevenLabs
-        if Config.TTS_PROVIDER == "elevenlabs":
+        # Shared HTTP session for the AssemblyAI REST API (created lazily on the loop)
+        self._stt_session: Optional[aiohttp.ClientSession] = None
+        self.vad = VoiceActivityDetector()
+        
+        # Initialize ElevenLabs client if using ElevenLabs (or it is configured as a fallback)
+        if Config.TTS_PROVIDER == "elevenlabs" or Config.ELEVENLABS_API_KEY:
             self.elevenlabs_client = ElevenLabs(api_key=Config.ELEVENLABS_API_KEY)
         else:
             self.elevenlabs_client = None
         
+        # Routes each request to the fastest healthy provider (see tts_router)
+        self.tts_router = TTSRouter({
+            "azure": self._azure_provider,
+            "elevenlabs": self._elevenlabs_provider,
+            "gtts": self._gtts_provider,
+            "local": self._local_provider
+        })
+        
         logger.info(f"🎤 Voice Service initialized with TTS provider: {self.tts_provider}")
         
         # Language-specific voice configurations for ElevenLabs
@@ -90,6 +225,19 @@ class VoiceService:
             'bengali': 'bn'
         }
         
+        # Language codes for AssemblyAI
+        self.assembly_lang_codes = {
+            'hindi': 'hi',
+            'english': 'en',
+            'punjabi': 'pa',
+            'marathi': 'mr',
+            'gujarati': 'gu',
+            'tamil': 'ta',
+            'telugu': 'te',
+            'kannada': 'kn',
+            'bengali': 'bn'
+        }
+        
         # Azure Speech Service voice configurations
         self.azure_voice_configs = {
             'hindi': {
@@ -139,6 +287,244 @@ class VoiceService:
             }
         }
     
+    async def _get_stt_session(self) -> aiohttp.ClientSession:
+        """Get (or create) the shared HTTP session for STT requests"""
+        if self._stt_session is None or self._stt_session.closed:
+            self._stt_session = aiohttp.ClientSession(
+                headers={"authorization": Config.ASSEMBLYAI_API_KEY or ""}
+            )
+        return self._stt_session
+    
+    async def warm_up(self):
+        """Open TTS connections and load local voices / STT models ahead of the first request"""
+        candidates = self.tts_candidates()
+        if "local" in candidates:
+            await local_tts.warm_up()
+        await local_stt.warm_up()
+        if "azure" not in candidates:
+            return
+        voices = []
+        for language in Config.AZURE_TTS_WARM_LANGUAGES:
+            voice_config = self.azure_voice_configs.get(language.strip())
+            if voice_config:
+                voices.append((voice_config['voice_name'], AUDIO_PROFILES[NATIVE_PROFILE]["azure_format"]))
+        await azure_synthesizer_pool.warm_up(voices)
+    
+    async def close(self):
+        """Close the shared HTTP session and the local TTS / STT workers"""
+        if self._stt_session and not self._stt_session.closed:
+            await self._stt_session.close()
+        local_tts.close()
+        local_stt.close()
+    
+    async def transcribe_bytes(
+        self,
+        audio_data: bytes,
+        language: str = "hindi",
+        timeout: Optional[float] = None,
+        vad: bool = True
+    ) -> Dict:
+        """
+        Transcribe in-memory audio without blocking the event loop
+        
+        Audio is decoded and silence-trimmed once. Short utterances (and all
+        audio when STT_PROVIDER is "local") go to the local Whisper engine
+        if one is installed; everything else is uploaded to the AssemblyAI
+        REST API straight from memory, with the transcript polled via
+        asyncio.sleep. If AssemblyAI fails or times out, the local engine is
+        tried before giving up. Cancelling the calling task cancels the
+        upload / polling immediately.
+        
+        Args:
+            audio_data: Raw audio bytes (any container AssemblyAI accepts)
+            language: Session language (also the local Whisper language hint)
+            timeout: Seconds before giving up (default Config.STT_TIMEOUT_SECONDS)
+            vad: Trim silence first and skip STT for silence-only clips
+            
+        Returns:
+            Dict with text, status ("completed", "silence", "timeout" or
+            "error"), error and metrics (stt_backend, input_bytes,
+            upload_bytes, upload_format, input_seconds, speech_seconds,
+            decode_ms, vad_ms, encode_ms, upload_ms, queue_ms,
+            processing_ms, local_ms, total_ms)
+        """
+        timeout = timeout or Config.STT_TIMEOUT_SECONDS
+        metrics = {"stt_backend": "assemblyai", "input_bytes": len(audio_data), "upload_bytes": len(audio_data),
+                   "upload_ms": 0.0, "queue_ms": 0.0, "processing_ms": 0.0, "total_ms": 0.0}
+        result = {"text": "", "status": "error", "error": None, "metrics": metrics}
+        started = time.perf_counter()
+        
+        use_vad = vad and Config.VAD_ENABLED
+        speech = None
+        if use_vad or Config.TRANSCODE_ENABLED or local_stt.available:
+            speech = await self.decode_speech(audio_data, metrics, vad=use_vad)
+            if speech is not None and not len(speech):
+                # Silence only: no STT round trip
+                result["status"] = "silence"
+                metrics["upload_bytes"] = 0
+                metrics["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                logger.info(f"🔇 Silence-only audio rejected before STT: {metrics}")
+                return result
+        
+        local_ready = local_stt.available and speech is not None
+        local_first = local_ready and (Config.STT_PROVIDER == "local" or
+                                       metrics["speech_seconds"] <= Config.LOCAL_STT_MAX_SECONDS)
+        try:
+            if local_first:
+                # Short utterance (or kiosk mode): no network round trip at all
+                metrics["upload_bytes"] = 0
+                await self._run_local_transcription(speech, language, result)
+            
+            if result["status"] != "completed":
+                await self._run_hosted_transcription(audio_data, speech, language, timeout, result,
+                                                     encode=use_vad or Config.TRANSCODE_ENABLED)
+            
+            if result["status"] != "completed" and local_ready and not local_first:
+                logger.warning("⚠️ AssemblyAI unavailable, transcribing locally")
+                await self._run_local_transcription(speech, language, result)
+        except asyncio.CancelledError:
+            logger.warning("⚠️ Transcription cancelled")
+            raise
+        finally:
+            metrics["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        
+        logger.info(f"STT metrics: {metrics}")
+        return result
+    
+    async def _run_hosted_transcription(
+        self,
+        audio_data: bytes,
+        speech: Optional[np.ndarray],
+        language: str,
+        timeout: float,
+        result: Dict,
+        encode: bool = True
+    ):
+        """Encode decoded speech for upload and transcribe it on AssemblyAI, filling in result"""
+        metrics = result["metrics"]
+        metrics["stt_backend"] = "assemblyai"
+        if speech is not None and encode:
+            audio_data = await self.encode_speech(audio_data, speech, metrics)
+        metrics["upload_bytes"] = len(audio_data)
+        
+        try:
+            await asyncio.wait_for(self._run_transcription(audio_data, language, result), timeout)
+        except asyncio.TimeoutError:
+            result["status"] = "timeout"
+            result["error"] = f"Transcription timed out after {timeout}s"
+            logger.error(f"❌ {result['error']}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = str(e)
+            logger.error(f"Error in transcription: {str(e)}")
+    
+    async def _run_local_transcription(self, speech: np.ndarray, language: str, result: Dict):
+        """Transcribe decoded speech on the local engine, filling in result"""
+        metrics = result["metrics"]
+        metrics["stt_backend"] = "local"
+        local_started = time.perf_counter()
+        try:
+            result["text"] = await local_stt.transcribe(speech, language)
+            result["status"] = "completed"
+            result["error"] = None
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = str(e)
+            logger.error(f"Error in local transcription: {str(e)}")
+        metrics["local_ms"] = round((time.perf_counter() - local_started) * 1000, 1)
+    
+    async def decode_speech(self, audio_data: bytes, metrics: Dict, vad: bool = True) -> Optional[np.ndarray]:
+        """
+        Decode to 16 kHz mono PCM and optionally trim non-speech
+        
+        Returns:
+            Speech samples, an empty array for a silence-only clip, or None
+            if the audio cannot be decoded here
+        """
+        try:
+            samples = await audio_transcoder.decode(audio_data, metrics)
+        except Exception as e:
+            logger.warning(f"⚠️ Audio decode failed, sending original: {str(e)}")
+            samples = None
+        
+        if samples is None:
+            logger.info("Audio preprocessing skipped (format needs ffmpeg)")
+            return None
+        
+        metrics["input_seconds"] = round(len(samples) / VAD_SAMPLE_RATE, 2)
+        speech = samples
+        if vad:
+            vad_started = time.perf_counter()
+            speech = self.vad.trim(samples)
+            metrics["vad_ms"] = round((time.perf_counter() - vad_started) * 1000, 1)
+        metrics["speech_seconds"] = round(len(speech) / VAD_SAMPLE_RATE, 2)
+        return speech
+    
+    async def encode_speech(self, audio_data: bytes, speech: np.ndarray, metrics: Dict) -> bytes:
+        """Encode decoded speech for upload, keeping the original if that is smaller"""
+        encoded, audio_format = await audio_transcoder.encode(speech, metrics)
+        metrics["upload_format"] = audio_format
+        
+        # Keep the original if re-encoding would not make it smaller
+        if len(encoded) >= len(audio_data) and metrics["speech_seconds"] >= metrics["input_seconds"]:
+            metrics["upload_format"] = "original"
+            return audio_data
+        logger.info(f"Audio preprocessed {metrics['input_seconds']}s -> {metrics['speech_seconds']}s "
+                    f"({len(audio_data)} -> {len(encoded)} bytes {audio_format})")
+        return encoded
+    
+    async def _run_transcription(self, audio_data: bytes, language: str, result: Dict):
+        """Upload, submit and poll one transcript, filling in result"""
+        base_url = Config.ASSEMBLYAI_BASE_URL.rstrip("/")
+        metrics = result["metrics"]
+        session = await self._get_stt_session()
+        
+        upload_started = time.perf_counter()
+        async with session.post(f"{base_url}/upload", data=audio_data) as response:
+            response.raise_for_status()
+            upload_url = (await response.json())["upload_url"]
+        metrics["upload_ms"] = round((time.perf_counter() - upload_started) * 1000, 1)
+        
+        submitted = time.perf_counter()
+        payload = {
+            "audio_url": upload_url,
+            "language_code": self.assembly_lang_codes.get(language, 'hi')
+        }
+        async with session.post(f"{base_url}/transcript", json=payload) as response:
+            response.raise_for_status()
+            transcript = await response.json()
+        
+        processing_started = None
+        interval = Config.STT_POLL_INTERVAL_SECONDS
+        while transcript.get("status") not in ("completed", "error"):
+            if transcript.get("status") == "processing" and processing_started is None:
+                processing_started = time.perf_counter()
+                metrics["queue_ms"] = round((processing_started - submitted) * 1000, 1)
+            
+            await asyncio.sleep(interval)
+            # Back off gently for long recordings
+            interval = min(interval * 1.5, 3.0)
+            
+            async with session.get(f"{base_url}/transcript/{transcript['id']}") as response:
+                response.raise_for_status()
+                transcript = await response.json()
+        
+        finished = time.perf_counter()
+        if processing_started is None:
+            # Never observed "processing": count it all as processing time
+            processing_started = submitted
+        metrics["processing_ms"] = round((finished - processing_started) * 1000, 1)
+        
+        if transcript["status"] == "error":
+            result["error"] = transcript.get("error")
+            logger.error(f"Transcription error: {result['error']}")
+            return
+        
+        result["status"] = "completed"
+        result["text"] = transcript.get("text") or ""
+    
     async def transcribe_audio(self, audio_base64: str, language: str = "hindi") -> str:
         """
         Transcribe audio from base64 encoded data using AssemblyAI
@@ -151,61 +537,17 @@ class VoiceService:
             Transcribed text
         """
         try:
-            # Decode base64 audio
             audio_data = base64.b64decode(audio_base64)
-            
-            # Create temporary file (works on Windows and Linux)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as temp_file:
-                temp_audio_path = temp_file.name
-                temp_file.write(audio_data)
-            
-            logger.info(f"Transcribing audio file: {temp_audio_path}")
-            
-            # Map language to AssemblyAI language code
-            lang_map = {
-                'hindi': 'hi',
-                'english': 'en',
-                'punjabi': 'pa',
-                'marathi': 'mr',
-                'gujarati': 'gu',
-                'tamil': 'ta',
-                'telugu': 'te',
-                'kannada': 'kn',
-                'bengali': 'bn'
-            }
-            
-            assembly_lang = lang_map.get(language, 'hi')
-            
-            # Transcribe using AssemblyAI
-            config = aai.TranscriptionConfig(language_code=assembly_lang)
-            transcript = self.transcriber.transcribe(temp_audio_path, config=config)
-            
-            # Clean up temp file
-            try:
-                os.remove(temp_audio_path)
-            except Exception as e:
-                logger.warning(f"Could not delete temp file: {e}")
-            
-            if transcript.status == aai.TranscriptStatus.error:
-                logger.error(f"Transcription error: {transcript.error}")
-                return ""
-            
-            logger.info(f"✅ Transcription successful: {transcript.text}")
-            return transcript.text
-            
-        except Exception as e:
-            logger.error(f"Error in transcription: {str(e)}")
-            return ""
-            
-            if transcript.status == aai.TranscriptStatus.error:
-                logger.error(f"Transcription error: {transcript.error}")
-                return ""
-            
-            return transcript.text
-            
         except Exception as e:
-            logger.error(f"Error in transcription: {str(e)}")
+            logger.error(f"Error decoding audio: {str(e)}")
             return ""
+        
+        logger.info(f"Transcribing {len(audio_data)} bytes of audio")
+        result = await self.transcribe_bytes(audio_data, language)
+        
+        if result["status"] == "completed":
+            logger.info(f"✅ Transcription successful: {result['text']}")
+        return result["text"]
     
     async def text_to_speech(self, text: str, language: str = "hindi") -> str:
         """
@@ -218,18 +560,210 @@ class VoiceService:
         Returns:
             Base64 encoded audio data
         """
-        try:
-            if self.tts_provider == "gtts":
-                return await self._gtts_text_to_speech(text, language)
-            elif self.tts_provider == "azure":
-                return await self._azure_text_to_speech(text, language)
+        audio = await self.text_to_speech_bytes(text, language)
+        return base64.b64encode(audio).decode('utf-8') if audio else ""
+    
+    async def text_to_speech_bytes(self, text: str, language: str = "hindi") -> bytes:
+        """
+        Convert text to speech on the best available TTS provider
+        
+        Args:
+            text: Text to convert to speech
+            language: Language for TTS
+            
+        Returns:
+            Raw audio bytes (MP3, or WAV from local TTS), empty if every provider failed
+        """
+        audio, _ = await self.synthesize(text, language, NATIVE_PROFILE)
+        return audio
+    
+    def tts_candidates(self) -> List[str]:
+        """Configured provider first, then fallbacks that have credentials"""
+        configured = {
+            "gtts": True,
+            "azure": bool(Config.AZURE_SPEECH_KEY and Config.AZURE_SPEECH_REGION),
+            "elevenlabs": bool(self.elevenlabs_client and Config.ELEVENLABS_API_KEY),
+            "local": local_tts.available
+        }
+        candidates = [self.tts_provider] + [p for p in Config.TTS_FALLBACK_PROVIDERS if p != self.tts_provider]
+        enabled = [p for p in candidates if configured.get(p)]
+        return enabled or [self.tts_provider]
+    
+    async def synthesize(
+        self,
+        text: str,
+        language: str = "hindi",
+        profile: str = NATIVE_PROFILE
+    ) -> Tuple[bytes, str]:
+        """
+        Convert text to speech in a response audio profile
+        
+        The router picks the fastest healthy provider, hedges slow requests
+        and fails over on errors. Azure synthesizes the profile's format
+        directly; other providers' MP3 is transcoded through the variant cache.
+        
+        Args:
+            text: Text to convert to speech
+            language: Language for TTS
+            profile: Key of AUDIO_PROFILES (see audio_profiles)
+            
+        Returns:
+            (audio bytes, media type)
+        """
+        audio, media_type, _ = await self.tts_router.synthesize(text, language, profile, self.tts_candidates())
+        if not audio:
+            spec = AUDIO_PROFILES.get(profile, AUDIO_PROFILES[NATIVE_PROFILE])
+            return b"", spec["media_type"]
+        return audio, media_type
+    
+    async def _azure_provider(self, text: str, language: str, profile: str) -> Tuple[bytes, str]:
+        spec = AUDIO_PROFILES.get(profile, AUDIO_PROFILES[NATIVE_PROFILE])
+        audio = await self._azure_text_to_speech(text, language, spec["azure_format"])
+        return audio, spec["media_type"]
+    
+    async def _elevenlabs_provider(self, text: str, language: str, profile: str) -> Tuple[bytes, str]:
+        audio = await self._elevenlabs_text_to_speech(text, language)
+        return await audio_variant_cache.get_variant(audio, profile)
+    
+    async def _gtts_provider(self, text: str, language: str, profile: str) -> Tuple[bytes, str]:
+        audio = await self._gtts_text_to_speech(text, language)
+        return await audio_variant_cache.get_variant(audio, profile)
+    
+    async def _local_provider(self, text: str, language: str, profile: str) -> Tuple[bytes, str]:
+        audio = await self._local_text_to_speech(text, language)
+        return await audio_variant_cache.get_variant(audio, profile, local_tts.media_type)
+    
+    async def stream_speech(
+        self,
+        text: str,
+        language: str = "hindi",
+        profile: str = NATIVE_PROFILE
+    ) -> Tuple[AsyncIterator[bytes], str]:
+        """
+        Convert text to speech, yielding audio chunks as the provider produces them
+        
+        Native-profile audio (and every Azure profile) streams straight from
+        the provider; profiles that need transcoding are synthesized whole
+        and sent as a single chunk.
+        
+        Args:
+            text: Text to convert to speech
+            language: Language for TTS
+            profile: Key of AUDIO_PROFILES
+            
+        Returns:
+            (async iterator of audio chunks, media type)
+        """
+        spec = AUDIO_PROFILES.get(profile, AUDIO_PROFILES[NATIVE_PROFILE])
+        candidates = self.tts_candidates()
+        provider = self.tts_router.rank(language, candidates)[0]
+        if provider == "local":
+            # Local synthesis is fast and whole-clip (WAV): one chunk, no stream
+            audio, media_type = await self.synthesize(text, language, profile)
+            return _single_chunk(audio), media_type
+        if provider == "azure":
+            stream = self._azure_stream(text, language, spec["azure_format"])
+        elif not spec.get("ffmpeg_args"):
+            if provider == "gtts":
+                stream = self._gtts_stream(text, language)
             else:
-                return await self._elevenlabs_text_to_speech(text, language)
+                stream = self._elevenlabs_stream(text, language)
+        else:
+            audio, media_type = await self.synthesize(text, language, profile)
+            return _single_chunk(audio), media_type
+        
+        fallback = [p for p in candidates if p != provider]
+        return self._timed_stream(stream, provider, text, language, profile, fallback), spec["media_type"]
+    
+    async def _timed_stream(
+        self,
+        stream: AsyncIterator[bytes],
+        provider: str,
+        text: str,
+        language: str,
+        profile: str,
+        fallback: List[str]
+    ) -> AsyncIterator[bytes]:
+        """
+        Pass chunks through, recording the outcome and time to first chunk
+        with the router; if the provider fails before any audio, synthesize
+        on the others
+        """
+        start = time.monotonic()
+        first_chunk_ms = None
+        total = 0
+        failed = False
+        try:
+            async for chunk in stream:
+                if first_chunk_ms is None:
+                    first_chunk_ms = (time.monotonic() - start) * 1000
+                total += len(chunk)
+                yield chunk
         except Exception as e:
-            logger.error(f"Error in TTS ({self.tts_provider}): {str(e)}")
-            return ""
+            # Counts as a failure even if some audio was already sent
+            failed = True
+            logger.error(f"Error in TTS stream ({provider}): {str(e)}")
+        finally:
+            # Closed early (turn cancelled): stop the provider stream now, not at GC
+            await stream.aclose()
+        
+        self.tts_router.record_stream(provider, language, first_chunk_ms, total > 0 and not failed)
+        if first_chunk_ms is not None:
+            logger.info(f"✅ {provider} audio streamed ({total} bytes, first chunk {first_chunk_ms:.0f} ms, "
+                        f"total {(time.monotonic() - start) * 1000:.0f} ms)")
+        elif fallback:
+            logger.warning(f"⚠️ TTS stream failed on {provider}, falling back to {fallback}")
+            audio, media_type, _ = await self.tts_router.synthesize(text, language, profile, fallback)
+            if audio and media_type == AUDIO_PROFILES.get(profile, AUDIO_PROFILES[NATIVE_PROFILE])["media_type"]:
+                yield audio
+    
+    def _gtts_stream(self, text: str, language: str = "hindi") -> AsyncIterator[bytes]:
+        """gTTS per-sentence MP3 chunks (gTTS splits long text into requests)"""
+        lang_code = self.gtts_lang_codes.get(language, 'hi')
+        return iterate_in_thread(lambda: gTTS(text=text, lang=lang_code, slow=False).stream())
+    
+    def _elevenlabs_stream(self, text: str, language: str = "hindi") -> AsyncIterator[bytes]:
+        """ElevenLabs streaming endpoint chunks"""
+        if not self.elevenlabs_client:
+            logger.error("ElevenLabs client not initialized")
+            return _single_chunk(b"")
+        
+        voice_config = self.voice_configs.get(language, self.voice_configs['hindi'])
+        return iterate_in_thread(lambda: self.elevenlabs_client.text_to_speech.stream(
+            voice_id=voice_config['voice_id'],
+            text=text,
+            model_id=voice_config['model']
+        ))
+    
+    def _azure_stream(
+        self,
+        text: str,
+        language: str = "hindi",
+        output_format: str = AUDIO_PROFILES[NATIVE_PROFILE]["azure_format"]
+    ) -> AsyncIterator[bytes]:
+        """Azure synthesizing-event chunks from a pooled synthesizer"""
+        if not Config.AZURE_SPEECH_KEY or not Config.AZURE_SPEECH_REGION:
+            logger.error("Azure Speech Service credentials not configured")
+            return _single_chunk(b"")
+        
+        voice_config = self.azure_voice_configs.get(language, self.azure_voice_configs['hindi'])
+        return azure_synthesizer_pool.stream_ssml(
+            voice_config['voice_name'], output_format, self._azure_ssml(text, voice_config)
+        )
     
-    async def _gtts_text_to_speech(self, text: str, language: str = "hindi") -> str:
+    def _azure_ssml(self, text: str, voice_config: Dict) -> str:
+        """SSML for a text in one of azure_voice_configs"""
+        return f"""
+            <speak version='1.0' xml:lang='{voice_config['language']}'>
+                <voice name='{voice_config['voice_name']}'>
+                    <prosody rate='medium' pitch='medium'>
+                        {text}
+                    </prosody>
+                </voice>
+            </speak>
+            """
+    
+    async def _gtts_text_to_speech(self, text: str, language: str = "hindi") -> bytes:
         """
         Convert text to speech using gTTS (free, no credits needed)
         
@@ -238,7 +772,7 @@ class VoiceService:
             language: Language for TTS
             
         Returns:
-            Base64 encoded audio data
+            MP3 audio bytes
         """
         try:
             # Get gTTS language code
@@ -247,22 +781,45 @@ class VoiceService:
             # Create gTTS object
             tts = gTTS(text=text, lang=lang_code, slow=False)
             
-            # Save to BytesIO object instead of file
+            # Save to BytesIO object instead of file (gTTS makes blocking
+            # HTTP requests, so keep them off the event loop)
             audio_fp = io.BytesIO()
-            tts.write_to_fp(audio_fp)
+            await asyncio.to_thread(tts.write_to_fp, audio_fp)
             audio_fp.seek(0)
             
-            # Convert to base64
-            audio_base64 = base64.b64encode(audio_fp.read()).decode('utf-8')
+            audio = audio_fp.getvalue()
             
-            logger.info(f"✅ gTTS audio generated ({len(audio_base64)} chars)")
-            return audio_base64
+            logger.info(f"✅ gTTS audio generated ({len(audio)} bytes)")
+            return audio
             
         except Exception as e:
             logger.error(f"Error in gTTS: {str(e)}")
-            return ""
+            return b""
     
-    async def _elevenlabs_text_to_speech(self, text: str, language: str = "hindi") -> str:
+    async def _local_text_to_speech(self, text: str, language: str = "hindi") -> bytes:
+        """
+        Convert text to speech offline (Piper / espeak-ng, see local_tts)
+        
+        Args:
+            text: Text to convert to speech
+            language: Language for TTS
+            
+        Returns:
+            WAV audio bytes
+        """
+        try:
+            audio = await local_tts.synthesize(text, language)
+            if audio:
+                logger.info(f"✅ Local TTS audio generated ({len(audio)} bytes, {local_tts.engine_for(language)})")
+            else:
+                logger.error(f"No local TTS voice for {language}")
+            return audio
+            
+        except Exception as e:
+            logger.error(f"Error in local TTS: {str(e)}")
+            return b""
+    
+    async def _elevenlabs_text_to_speech(self, text: str, language: str = "hindi") -> bytes:
         """
         Convert text to speech using ElevenLabs (paid, uses credits)
         
@@ -271,94 +828,85 @@ class VoiceService:
             language: Language for TTS
             
         Returns:
-            Base64 encoded audio data
+            MP3 audio bytes
         """
         try:
             if not self.elevenlabs_client:
                 logger.error("ElevenLabs client not initialized")
-                return ""
+                return b""
                 
             voice_config = self.voice_configs.get(language, self.voice_configs['hindi'])
             
-            # Generate audio using ElevenLabs new API
-            audio = self.elevenlabs_client.text_to_speech.convert(
-                text=text,
-                voice_id=voice_config['voice_id'],
-                model_id=voice_config['model']
-            )
-            
-            # Convert to base64
-            audio_base64 = base64.b64encode(audio).decode('utf-8')
-            
-            logger.info(f"✅ ElevenLabs audio generated ({len(audio_base64)} chars)")
-            return audio_base64
+            def convert() -> bytes:
+                # Generate audio using ElevenLabs new API
+                audio = self.elevenlabs_client.text_to_speech.convert(
+                    text=text,
+                    voice_id=voice_config['voice_id'],
+                    model_id=voice_config['model']
+                )
+                # Newer SDKs return an iterator of chunks (fetched while iterating)
+                if not isinstance(audio, (bytes, bytearray)):
+                    audio = b"".join(audio)
+                return bytes(audio)
+            
+            # The SDK is synchronous: run it in a thread so the event loop
+            # (and the router's hedge timer) keeps running
+            audio = await asyncio.to_thread(convert)
+            
+            logger.info(f"✅ ElevenLabs audio generated ({len(audio)} bytes)")
+            return audio
             
         except Exception as e:
             logger.error(f"Error in ElevenLabs TTS: {str(e)}")
-            return ""
+            return b""
     
-    async def _azure_text_to_speech(self, text: str, language: str = "hindi") -> str:
+    async def _azure_text_to_speech(
+        self,
+        text: str,
+        language: str = "hindi",
+        output_format: str = AUDIO_PROFILES[NATIVE_PROFILE]["azure_format"]
+    ) -> bytes:
         """
         Convert text to speech using Azure Speech Service (high quality, pay-per-use)
         
         Args:
             text: Text to convert to speech
             language: Language for TTS
+            output_format: SpeechSynthesisOutputFormat member name
             
         Returns:
-            Base64 encoded audio data
+            Audio bytes in output_format
         """
         try:
             if not Config.AZURE_SPEECH_KEY or not Config.AZURE_SPEECH_REGION:
                 logger.error("Azure Speech Service credentials not configured")
-                return ""
+                return b""
                 
             # Get voice configuration for the language
             voice_config = self.azure_voice_configs.get(language, self.azure_voice_configs['hindi'])
             
-            # Configure Speech SDK
-            speech_config = speechsdk.SpeechConfig(
-                subscription=Config.AZURE_SPEECH_KEY, 
-                region=Config.AZURE_SPEECH_REGION
-            )
-            speech_config.speech_synthesis_voice_name = voice_config['voice_name']
-            speech_config.set_speech_synthesis_output_format(speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3)
-            
-            # Create synthesizer with memory stream output
-            synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
-            
             # Create SSML for better control
-            ssml = f"""
-            <speak version='1.0' xml:lang='{voice_config['language']}'>
-                <voice name='{voice_config['voice_name']}'>
-                    <prosody rate='medium' pitch='medium'>
-                        {text}
-                    </prosody>
-                </voice>
-            </speak>
-            """
+            ssml = self._azure_ssml(text, voice_config)
             
-            # Synthesize speech
-            result = synthesizer.speak_ssml_async(ssml).get()
+            # Synthesize on a pooled, pre-connected synthesizer without blocking the loop
+            result = await azure_synthesizer_pool.speak_ssml(voice_config['voice_name'], output_format, ssml)
             
             if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                # Convert audio data to base64
-                audio_base64 = base64.b64encode(result.audio_data).decode('utf-8')
-                logger.info(f"✅ Azure Speech audio generated ({len(audio_base64)} chars)")
-                return audio_base64
+                logger.info(f"✅ Azure Speech audio generated ({len(result.audio_data)} bytes)")
+                return result.audio_data
             elif result.reason == speechsdk.ResultReason.Canceled:
                 cancellation_details = result.cancellation_details
                 logger.error(f"Azure Speech synthesis canceled: {cancellation_details.reason}")
                 if cancellation_details.error_details:
                     logger.error(f"Error details: {cancellation_details.error_details}")
-                return ""
+                return b""
             else:
                 logger.error(f"Azure Speech synthesis failed: {result.reason}")
-                return ""
+                return b""
                 
         except Exception as e:
             logger.error(f"Error in Azure Speech TTS: {str(e)}")
-            return ""
+            return b""
     
     def get_greeting_message(self, language: str = "hindi") -> str:
         """